@@ -0,0 +1,526 @@
+import bisect
+import hashlib
+import itertools
+import json
+import random
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pyntelope import types
+
+CHAIN_ID = "1064487b3cd1a897ce03ae5b6a865651747e2e152090f99c1d19d44e01aea5a4"
+BLOCK_ID = "0ee3d4ae9ec2a8d4d29f8e6c8ef7e8e2b4e0e7e7a2a0f2f6a4b9c9e7d1f3a5b7"
+FIRST_ASSET_ID = 1099500000000
+FIRST_BLOCK = 250000000
+FIRST_BLOCK_TIME = datetime(2024, 1, 1)
+# WAX produces a block every half a second
+BLOCK_INTERVAL = 0.5
+# Resources of accounts in microseconds and bytes
+ACCOUNT_CPU = 10000000
+ACCOUNT_NET = 10000000
+
+
+def _read_varuint(buffer: bytes, position: int):
+    """
+    :return: decoded varuint32, position after it
+    """
+    value = shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def _read_name(buffer: bytes, position: int) -> str:
+    return types.Name.from_bytes(buffer[position : position + 8]).value
+
+
+def decode_actions(packed_trx: str) -> list:
+    """
+    Decodes actions of a transaction packed by pyntelope
+    :param packed_trx: hex of the serialized transaction
+    :return: list of (contract, action name, serialized action data) tuples
+    """
+    buffer = bytes.fromhex(packed_trx)
+    # expiration, ref_block_num, ref_block_prefix
+    position = 10
+    _, position = _read_varuint(buffer, position)  # max_net_usage_words
+    position += 1  # max_cpu_usage_ms
+    _, position = _read_varuint(buffer, position)  # delay_sec
+    _, position = _read_varuint(buffer, position)  # context_free_actions
+    actions_count, position = _read_varuint(buffer, position)
+    actions = []
+    for _ in range(actions_count):
+        account = _read_name(buffer, position)
+        name = _read_name(buffer, position + 8)
+        position += 16
+        authorizations_count, position = _read_varuint(buffer, position)
+        position += 16 * authorizations_count
+        data_size, position = _read_varuint(buffer, position)
+        actions.append((account, name, buffer[position : position + data_size]))
+        position += data_size
+    return actions
+
+
+def _decode_transfer_asset_ids(data: bytes) -> list:
+    # from, to, asset_ids
+    count, position = _read_varuint(data, 16)
+    return [
+        str(asset_id) for asset_id in struct.unpack_from(f"<{count}Q", data, position)
+    ]
+
+
+def _assert_error(message: str) -> dict:
+    return {
+        "code": 500,
+        "error": {
+            "name": "eosio_assert_message_exception",
+            "details": [{"message": message}],
+        },
+    }
+
+
+class MockNode:
+    def __init__(
+        self,
+        owner: str,
+        templates: dict,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        push_error_rate: float = 0.0,
+        api_error_rate: float = 0.0,
+        logmint_in_traces: bool = True,
+        irreversible_blocks: int = 6,
+        schema: str = "benchschema",
+        max_supply: int = 0,
+        accounts_cpu: dict = None,
+        seed: int = 0,
+    ):
+        """
+        Stand-in for a WAX node, AtomicAssets API and history API which keeps its state in memory
+        :param owner: wallet which holds the inventory
+        :param templates: template IDs and how many assets of each template the owner holds
+        :param latency: seconds every reply is delayed for
+        :param jitter: up to so many seconds are randomly added to the latency
+        :param push_error_rate: share of pushed transactions rejected with "tx_cpu_usage_exceeded"
+        :param api_error_rate: share of API requests answered with HTTP 500
+        :param logmint_in_traces: if False, traces of minting actions come without the logmint action,
+                so IDs of minted assets have to be requested from the history API
+        :param irreversible_blocks: how many blocks the last irreversible block is behind the head block
+        :param schema: schema all templates belong to
+        :param max_supply: max supply of every template, 0 for unlimited
+        :param accounts_cpu: available CPU of accounts in microseconds. Accounts which aren't in it
+                have ACCOUNT_CPU.
+        :param seed: seed of the random latency and errors
+        """
+        self.owner = owner
+        self.latency = latency
+        self.jitter = jitter
+        self.push_error_rate = push_error_rate
+        self.api_error_rate = api_error_rate
+        self.logmint_in_traces = logmint_in_traces
+        self.irreversible_blocks = irreversible_blocks
+        self.schema = schema
+        self.max_supply = max_supply
+        self.accounts_cpu = accounts_cpu or {}
+        self._random = random.Random(seed)
+        self._asset_ids = itertools.count(FIRST_ASSET_ID)
+        self.inventory = {
+            template_id: [str(next(self._asset_ids)) for _ in range(quantity)]
+            for template_id, quantity in templates.items()
+        }
+        self.sent = set()
+        self.issued = {
+            template_id: quantity for template_id, quantity in templates.items()
+        }
+        self.minted = {}
+        self.pushed = set()
+        # Actions of all pushed transactions in the order of blocks like the history API indexes them
+        self.history = []
+        self._history_timestamps = []
+        self._global_sequence = itertools.count(1)
+        self._started = time.monotonic()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _delay(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _fails(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+    def head_block_num(self) -> int:
+        return FIRST_BLOCK + int((time.monotonic() - self._started) / BLOCK_INTERVAL)
+
+    @staticmethod
+    def block_time(block_num: int) -> str:
+        """
+        :return: time of the block like nodes and the history API return it
+        """
+        block_time = FIRST_BLOCK_TIME + timedelta(
+            seconds=(block_num - FIRST_BLOCK) * BLOCK_INTERVAL
+        )
+        return block_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+    def get_info(self) -> dict:
+        head_block_num = self.head_block_num()
+        return {
+            "chain_id": CHAIN_ID,
+            "head_block_num": head_block_num,
+            "head_block_time": self.block_time(head_block_num),
+            "last_irreversible_block_num": head_block_num - self.irreversible_blocks,
+            "last_irreversible_block_id": BLOCK_ID,
+        }
+
+    def get_account(self, payload: dict) -> dict:
+        account_name = payload.get("account_name")
+        cpu_available = self.accounts_cpu.get(account_name, ACCOUNT_CPU)
+        return {
+            "account_name": account_name,
+            "cpu_limit": {"used": 0, "available": cpu_available, "max": ACCOUNT_CPU},
+            "net_limit": {"used": 0, "available": ACCOUNT_NET, "max": ACCOUNT_NET},
+        }
+
+    def _asset(self, asset_id: int, template_id: str) -> dict:
+        """
+        :return: asset with the metadata AtomicAssets API returns along with it
+        """
+        data = {"name": f"Asset {asset_id}", "img": "Qm" + "x" * 44, "rarity": "common"}
+        return {
+            "contract": "atomicassets",
+            "asset_id": str(asset_id),
+            "owner": self.owner,
+            "is_transferable": True,
+            "is_burnable": True,
+            "collection": {"collection_name": "benchcollect", "author": self.owner},
+            "schema": {
+                "schema_name": self.schema,
+                "format": [{"name": key, "type": "string"} for key in data],
+            },
+            "template": {
+                "template_id": template_id,
+                "max_supply": str(self.max_supply),
+                "immutable_data": data,
+            },
+            "mutable_data": {},
+            "immutable_data": {},
+            "template_mint": str(asset_id - FIRST_ASSET_ID + 1),
+            "backed_tokens": [],
+            "data": data,
+        }
+
+    def get_assets(self, params: dict) -> dict:
+        """
+        :param params: query parameters of /atomicassets/v1/assets
+        :return: one page of assets of the owner
+        """
+        templates = params.get("template_whitelist", "").split(",")
+        page = int(params.get("page", 1))
+        limit = int(params.get("limit", 100))
+        assets = []
+        with self._lock:
+            if params.get("owner") == self.owner:
+                for template_id in templates:
+                    assets += [
+                        (int(asset_id), template_id)
+                        for asset_id in self.inventory.get(template_id, [])
+                        if asset_id not in self.sent
+                    ]
+        assets.sort(reverse=params.get("order", "desc") == "desc")
+        return {
+            "success": True,
+            "data": [
+                self._asset(asset_id, template_id)
+                for asset_id, template_id in assets[(page - 1) * limit : page * limit]
+            ],
+        }
+
+    def push_transaction(self, payload: dict) -> dict:
+        """
+        :param payload: body of /v1/chain/push_transaction
+        :return: reply with action traces like the ones of a real node
+        """
+        if self._fails(self.push_error_rate):
+            return {
+                "code": 500,
+                "error": {
+                    "name": "tx_cpu_usage_exceeded",
+                    "details": [{"message": "transaction was executing for too long"}],
+                },
+            }
+        actions = decode_actions(payload["packed_trx"])
+        transaction_id = hashlib.sha256(
+            bytes.fromhex(payload["packed_trx"])
+        ).hexdigest()
+        with self._lock:
+            if transaction_id in self.pushed:
+                return {
+                    "code": 500,
+                    "error": {
+                        "name": "tx_duplicate",
+                        "details": [
+                            {"message": f"duplicate transaction {transaction_id}"}
+                        ],
+                    },
+                }
+            minted = [
+                # authorized_minter, collection_name, schema_name, template_id
+                str(struct.unpack_from("<i", data, 24)[0])
+                for _, name, data in actions
+                if name == "mintasset"
+            ]
+            for template_id in minted:
+                if template_id not in self.issued:
+                    return _assert_error(
+                        "assertion failure with message: No template with this id exists"
+                    )
+                self.issued[template_id] += 1
+                if self.max_supply and self.issued[template_id] > self.max_supply:
+                    for rolled_back in minted[: minted.index(template_id) + 1]:
+                        self.issued[rolled_back] -= 1
+                    return _assert_error(
+                        "assertion failure with message: The template's maxsupply has already been reached"
+                    )
+            self.pushed.add(transaction_id)
+        block_num = self.head_block_num()
+        history = []
+        action_traces = []
+        for account, name, data in actions:
+            act = {
+                "account": account,
+                "name": name,
+                "authorization": [{"actor": self.owner, "permission": "active"}],
+                "data": {},
+            }
+            inline_traces = []
+            # Accounts notified of the action and inline actions with their notified accounts
+            notified = [account]
+            inline_actions = []
+            if name == "transfer":
+                asset_ids = _decode_transfer_asset_ids(data)
+                with self._lock:
+                    self.sent.update(asset_ids)
+                act["data"] = {"asset_ids": asset_ids}
+                notified += [self.owner, _read_name(data, 8)]
+                # Notifications of the sender and the recipient come before logtransfer
+                inline_traces = [{"act": {"name": "transfer"}}] * 2 + [
+                    {"act": {"name": "logtransfer", "data": {"asset_ids": asset_ids}}}
+                ]
+            elif name == "mintasset":
+                asset_id = str(next(self._asset_ids))
+                with self._lock:
+                    self.minted[transaction_id] = asset_id
+                new_asset_owner = _read_name(data, 28)
+                # Like atomicassets, only the owner of the new asset is notified of logmint, not the minter
+                logmint = {
+                    "account": account,
+                    "name": "logmint",
+                    "authorization": [{"actor": account, "permission": "active"}],
+                    "data": {
+                        "asset_id": asset_id,
+                        "authorized_minter": self.owner,
+                        "new_asset_owner": new_asset_owner,
+                    },
+                }
+                inline_actions = [(logmint, [account, new_asset_owner])]
+                if self.logmint_in_traces:
+                    inline_traces = [
+                        {"act": {"name": "logmint", "data": {"asset_id": asset_id}}}
+                    ]
+            history += [(act, notified)] + inline_actions
+            action_traces.append({"act": act, "inline_traces": inline_traces})
+        timestamp = self.block_time(block_num)
+        with self._lock:
+            for act, notified in history:
+                self.history.append(
+                    {
+                        "@timestamp": timestamp,
+                        "trx_id": transaction_id,
+                        "block_num": block_num,
+                        "global_sequence": next(self._global_sequence),
+                        "act": act,
+                        "notified": list(dict.fromkeys(notified)),
+                    }
+                )
+                self._history_timestamps.append(timestamp)
+        return {
+            "transaction_id": transaction_id,
+            "processed": {
+                "id": transaction_id,
+                "receipt": {
+                    "status": "executed",
+                    "cpu_usage_us": 200 * len(action_traces),
+                    "net_usage_words": 20 * len(action_traces),
+                },
+                "action_traces": action_traces,
+            },
+        }
+
+    def get_transaction(self, params: dict):
+        """
+        :param params: query parameters of /v2/history/get_transaction
+        :return: minting transaction like the history API returns it or None if it's unknown
+        """
+        with self._lock:
+            asset_id = self.minted.get(params.get("id"))
+        if asset_id is None:
+            return None
+        return {
+            "executed": True,
+            "actions": [
+                {"act": {"name": "mintasset", "data": {}}},
+                {"act": {"name": "logmint", "data": {"asset_id": asset_id}}},
+            ],
+        }
+
+    def get_templates(self, params: dict) -> dict:
+        """
+        :param params: query parameters of /atomicassets/v1/templates
+        :return: one page of templates of the collection
+        """
+        page = int(params.get("page", 1))
+        limit = int(params.get("limit", 100))
+        with self._lock:
+            templates = sorted(self.issued.items())
+        return {
+            "success": True,
+            "data": [
+                {
+                    "template_id": template_id,
+                    "schema": {"schema_name": self.schema},
+                    "max_supply": str(self.max_supply),
+                    "issued_supply": str(issued_supply),
+                }
+                for template_id, issued_supply in templates[
+                    (page - 1) * limit : page * limit
+                ]
+            ],
+        }
+
+    def get_schemas(self, params: dict) -> dict:
+        """
+        :param params: query parameters of /atomicassets/v1/schemas
+        :return: schemas of the collection
+        """
+        data = [{"schema_name": self.schema}] if int(params.get("page", 1)) == 1 else []
+        return {"success": True, "data": data}
+
+    def get_actions(self, params: dict) -> dict:
+        """
+        :param params: query parameters of /v2/history/get_actions. Supports account, filter,
+                after (ISO 8601), skip and limit. Actions are always sorted in ascending order.
+        :return: matching actions after the given time sorted by blocks
+        """
+        skip = int(params.get("skip", 0))
+        limit = int(params.get("limit", 10))
+        account = params.get("account")
+        filters = [
+            tuple(code_name.split(":"))
+            for code_name in params.get("filter", "").split(",")
+            if code_name
+        ]
+
+        def matches(action: dict) -> bool:
+            act = action["act"]
+            if account and not (
+                account in action["notified"]
+                or any(auth["actor"] == account for auth in act["authorization"])
+            ):
+                return False
+            return not filters or any(
+                code == act["account"] and name in ("*", act["name"])
+                for code, name in filters
+            )
+
+        with self._lock:
+            start = bisect.bisect_left(
+                self._history_timestamps, params.get("after", "")
+            )
+            found = [action for action in self.history[start:] if matches(action)]
+        return {
+            "lib": self.head_block_num() - self.irreversible_blocks,
+            "actions": found[skip : skip + limit],
+        }
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Serves the API in a background thread
+        :return: base URL of the server
+        """
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, so Nagle's algorithm would delay every reply
+            disable_nagle_algorithm = True
+
+            def _reply(self, status: int, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                node._delay()
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if node._fails(node.api_error_rate):
+                    self._reply(500, {"success": False, "message": "Injected error"})
+                elif url.path == "/atomicassets/v1/assets":
+                    self._reply(200, node.get_assets(params))
+                elif url.path == "/atomicassets/v1/templates":
+                    self._reply(200, node.get_templates(params))
+                elif url.path == "/atomicassets/v1/schemas":
+                    self._reply(200, node.get_schemas(params))
+                elif url.path == "/v2/history/get_actions":
+                    self._reply(200, node.get_actions(params))
+                elif url.path == "/v2/history/get_transaction":
+                    transaction = node.get_transaction(params)
+                    if transaction is None:
+                        self._reply(404, {"message": "transaction not found"})
+                    else:
+                        self._reply(200, transaction)
+                else:
+                    self._reply(404, {"message": "not found"})
+
+            def do_POST(self):
+                node._delay()
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/v1/chain/get_info":
+                    self._reply(200, node.get_info())
+                elif self.path == "/v1/chain/get_account":
+                    self._reply(200, node.get_account(payload))
+                elif self.path == "/v1/chain/push_transaction":
+                    resp = node.push_transaction(payload)
+                    self._reply(500 if "error" in resp else 202, resp)
+                else:
+                    self._reply(404, {"message": "not found"})
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,249 @@
+"""
+Measures throughput of AssetSender against a local stand-in of the WAX node and AtomicAssets API.
+Nothing is sent to mainnet or testnet.
+
+    python -m benchmarks.run --operations 200 --latency 0.02 --push-error-rate 0.05
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from waxnftdispatcher import AssetSender
+
+from .mock_node import MockNode
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COLLECTION = "benchcollect"
+COLLECTION_WALLET = "bench.wam"
+RECIPIENT = "buyer.wam"
+SCHEMA = "benchschema"
+# Well-known development key. Signatures are never checked by the stand-in node.
+PRIVATE_KEY = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+SCENARIOS = (
+    "send_assets",
+    "mint_assets",
+    "mint_assets_and_get_ids",
+    "send_or_mint_assets",
+)
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(max_rss / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(latencies: list, percent: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(int(percent * len(latencies)), len(latencies) - 1)]
+
+
+def _operation(scenario: str, sender: AssetSender, node: MockNode, args):
+    """
+    :return: function which runs one operation of the scenario and returns False if it failed
+    """
+    templates = list(node.inventory)
+    assets = itertools.chain.from_iterable(node.inventory.values())
+    lock = threading.Lock()
+
+    def send_assets(number: int) -> bool:
+        with lock:
+            asset_ids = list(itertools.islice(assets, args.assets_per_operation))
+        if not asset_ids:
+            raise RuntimeError("Inventory is exhausted. Increase --inventory.")
+        return bool(sender.send_assets(asset_ids, RECIPIENT)[1])
+
+    def mint_assets(number: int) -> bool:
+        results = sender.mint_assets(
+            SCHEMA,
+            templates[number % len(templates)],
+            RECIPIENT,
+            args.assets_per_operation,
+            args.batch_size,
+        )
+        return all(tx_id for _, tx_id in results)
+
+    def mint_assets_and_get_ids(number: int) -> bool:
+        results = sender.mint_assets_and_get_ids(
+            SCHEMA,
+            templates[number % len(templates)],
+            RECIPIENT,
+            args.assets_per_operation,
+        )
+        return all(tx_id for _, tx_id in results)
+
+    def send_or_mint_assets(number: int) -> bool:
+        order = [
+            (SCHEMA, templates[(number + asset_number) % len(templates)])
+            for asset_number in range(args.assets_per_operation)
+        ]
+        results = sender.send_or_mint_assets(order, RECIPIENT)
+        return all(tx_id for _, tx_id in results)
+
+    return {
+        "send_assets": send_assets,
+        "mint_assets": mint_assets,
+        "mint_assets_and_get_ids": mint_assets_and_get_ids,
+        "send_or_mint_assets": send_or_mint_assets,
+    }[scenario]
+
+
+def run_scenario(scenario: str, args) -> dict:
+    """
+    Starts a fresh stand-in node and runs the operations of the scenario against it
+    :param scenario: name of the AssetSender method
+    :param args: parsed command line arguments
+    :return: throughput, latency and memory of the scenario
+    """
+    node = MockNode(
+        COLLECTION_WALLET,
+        {str(100000 + number): args.inventory for number in range(args.templates)},
+        latency=args.latency,
+        jitter=args.jitter,
+        push_error_rate=args.push_error_rate,
+        api_error_rate=args.api_error_rate,
+        logmint_in_traces=not args.no_logmint,
+        seed=args.seed,
+    )
+    url = node.start()
+    sender = AssetSender(
+        COLLECTION,
+        COLLECTION_WALLET,
+        PRIVATE_KEY,
+        api_endpoint=url,
+        history_endpoints=[url],
+        push_endpoints=[url],
+        use_inventory_cache=args.inventory_cache,
+        sign_workers=args.sign_workers,
+    )
+    operation = _operation(scenario, sender, node, args)
+    latencies = []
+    failures = 0
+
+    def timed(number: int):
+        started = time.perf_counter()
+        try:
+            succeeded = operation(number)
+        except Exception as error:
+            logger.warning(f"{scenario} failed: {error!r}")
+            succeeded = False
+        return time.perf_counter() - started, succeeded
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for latency, succeeded in executor.map(timed, range(args.operations)):
+            latencies.append(latency)
+            failures += not succeeded
+    elapsed = time.perf_counter() - started
+    traced_peak = None
+    if args.trace_memory:
+        traced_peak = round(tracemalloc.get_traced_memory()[1] / 1024**2, 1)
+        tracemalloc.stop()
+    sender.close()
+    node.stop()
+    return {
+        "scenario": scenario,
+        "operations": args.operations,
+        "failures": failures,
+        "ops_per_sec": round(args.operations / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "node_requests": node.requests,
+        "max_rss_mb": _max_rss_mb(),
+        "traced_peak_mb": traced_peak,
+    }
+
+
+def print_report(results: list):
+    columns = list(results[0])
+    widths = [
+        max(len(column), *(len(str(result[column])) for result in results))
+        for column in columns
+    ]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print(
+            "  ".join(
+                str(result[column]).ljust(width)
+                for column, width in zip(columns, widths)
+            )
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="scenario to run, can be repeated. All of them by default",
+    )
+    parser.add_argument("--operations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--assets-per-operation",
+        type=int,
+        default=1,
+        help="assets sent or minted by one operation",
+    )
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--templates", type=int, default=4)
+    parser.add_argument(
+        "--inventory", type=int, default=5000, help="assets of every template"
+    )
+    parser.add_argument("--inventory-cache", action="store_true")
+    parser.add_argument(
+        "--sign-workers",
+        type=int,
+        default=0,
+        help="sign transactions in so many processes while others are pushed",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every reply"
+    )
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--push-error-rate", type=float, default=0.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-logmint",
+        action="store_true",
+        help="don't return logmint traces, so IDs are requested from the history API",
+    )
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="ERROR")
+    results = [run_scenario(scenario, args) for scenario in args.scenario or SCENARIOS]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from typing import Callable, Tuple
+
+import pytest
+
+from benchmarks.mock_node import MockNode
+from waxnftdispatcher import AssetSender
+
+# Key of the examples of pyntelope, never used on a real network
+PRIVATE_KEY = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+COLLECTION = "benchcollect"
+COLLECTION_WALLET = "bench.wam"
+RECIPIENT = "buyer.wam"
+SCHEMA = "benchschema"
+
+
+@pytest.fixture
+def start_node() -> Callable[..., Tuple[MockNode, dict]]:
+    """
+    Starts stand-in nodes which are stopped after the test
+    :return: function which takes templates and other arguments of MockNode and returns the node
+             and the endpoint arguments of AssetSender pointing to it
+    """
+    nodes = []
+
+    def start(templates: dict = None, **kwargs) -> Tuple[MockNode, dict]:
+        node = MockNode(COLLECTION_WALLET, templates or {}, **kwargs)
+        url = node.start()
+        nodes.append(node)
+        return node, {
+            "api_endpoints": [url],
+            "history_endpoints": [url],
+            "push_endpoints": [url],
+        }
+
+    yield start
+    for node in nodes:
+        node.stop()
+
+
+@pytest.fixture
+def start_sender(start_node) -> Callable[..., Tuple[MockNode, AssetSender]]:
+    """
+    Starts stand-in nodes with an AssetSender of the collection wallet, which are closed after the test
+    :return: function which takes templates, arguments of MockNode as node_kwargs and arguments
+             of AssetSender and returns the node and the sender
+    """
+    senders = []
+
+    def start(
+        templates: dict = None, node_kwargs: dict = None, **kwargs
+    ) -> Tuple[MockNode, AssetSender]:
+        node, endpoints = start_node(templates, **(node_kwargs or {}))
+        sender = AssetSender(
+            COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, **endpoints, **kwargs
+        )
+        senders.append(sender)
+        return node, sender
+
+    yield start
+    for sender in senders:
+        sender.close()
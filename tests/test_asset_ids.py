@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+import requests
+
+from waxnftdispatcher.asyncsender import AsyncAssetSender
+from waxnftdispatcher.ratecontrol import RateController
+
+from .conftest import COLLECTION, COLLECTION_WALLET, PRIVATE_KEY
+
+NO_BACKOFF = {"network": 0.0}
+
+
+def not_indexed_until(attempts: int, error: Exception):
+    """
+    :return: stand-in of _get_right_asset_id() which fails the first attempts and the list of its calls
+    """
+    calls = []
+
+    def get_right_asset_id(tx_id):
+        calls.append(tx_id)
+        if len(calls) <= attempts:
+            raise error
+        return "1099500000000"
+
+    return get_right_asset_id, calls
+
+
+def test_asset_id_lookup_is_retried(start_sender, monkeypatch):
+    _, sender = start_sender(rate_controller=RateController(backoff=NO_BACKOFF))
+    lookup, calls = not_indexed_until(2, requests.ConnectionError("refused"))
+    monkeypatch.setattr(sender, "_get_right_asset_id", lookup)
+    assert sender._try_get_right_asset_id("tx") == "1099500000000"
+    assert len(calls) == 3
+
+
+def test_asset_id_lookup_gives_up_when_budget_is_spent(start_sender, monkeypatch):
+    rate_controller = RateController(retry_budgets={"network": 1}, backoff=NO_BACKOFF)
+    _, sender = start_sender(rate_controller=rate_controller)
+    lookup, calls = not_indexed_until(5, KeyError("actions"))
+    monkeypatch.setattr(sender, "_get_right_asset_id", lookup)
+    assert sender._try_get_right_asset_id("tx") is None
+    assert len(calls) == 2
+
+
+def test_async_asset_id_lookup_is_retried(start_node, monkeypatch):
+    _, endpoints = start_node()
+    lookup, calls = not_indexed_until(1, httpx.ConnectError("refused"))
+
+    async def get_right_asset_id(tx_id):
+        return lookup(tx_id)
+
+    async def run():
+        async with AsyncAssetSender(
+            COLLECTION,
+            COLLECTION_WALLET,
+            PRIVATE_KEY,
+            rate_controller=RateController(backoff=NO_BACKOFF),
+            **endpoints,
+        ) as sender:
+            monkeypatch.setattr(sender, "_get_right_asset_id", get_right_asset_id)
+            return await sender._try_get_right_asset_id("tx")
+
+    assert asyncio.run(run()) == "1099500000000"
+    assert len(calls) == 2
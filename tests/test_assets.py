@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from waxnftdispatcher.assets import AssetRecord, JsonArrayParser
+
+REPLY = {
+    "success": True,
+    "data": [
+        {"asset_id": "1099511627776", "name": "Café ☕ 𝔘", "mint": 12345.5e-3},
+        {"asset_id": "1099511627777", "name": 'escaped \\"quote\\" \\\\', "mint": -7},
+        {"asset_id": "1099511627778", "nested": {"data": [1, 2]}, "mint": 0},
+    ],
+    "query_time": 1700000000000,
+}
+
+
+def parse(chunks, parser=None) -> list:
+    parser = parser or JsonArrayParser()
+    items = []
+    for chunk in chunks:
+        items += parser.feed(chunk)
+    return items + parser.close()
+
+
+def split_at(data: bytes, *positions) -> list:
+    bounds = [0, *positions, len(data)]
+    return [data[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_parser_every_split_point():
+    body = json.dumps(REPLY, ensure_ascii=False).encode()
+    for position in range(len(body) + 1):
+        assert parse(split_at(body, position)) == REPLY["data"], position
+
+
+def test_parser_byte_by_byte():
+    body = json.dumps(REPLY, ensure_ascii=False, indent=2).encode()
+    assert parse(body[i : i + 1] for i in range(len(body))) == REPLY["data"]
+
+
+def test_parser_number_split_between_chunks():
+    body = b'{"data": [12345, 6.5e10], "count": 98765}'
+    number_start = body.index(b"12345")
+    assert parse(split_at(body, number_start + 2)) == [12345, 6.5e10]
+    assert parse(split_at(body, body.index(b"e10") + 1)) == [12345, 6.5e10]
+
+
+def test_parser_escaped_quote_split_between_chunks():
+    body = b'{"data": ["a\\"b", "c\\\\"]}'
+    assert parse(split_at(body, body.index(b'\\"') + 1)) == ['a"b', "c\\"]
+    assert parse(split_at(body, body.index(b"\\\\") + 1)) == ['a"b', "c\\"]
+
+
+def test_parser_multibyte_character_split_between_chunks():
+    body = '{"data": ["𝔘"]}'.encode()
+    character_start = body.index("𝔘".encode())
+    for offset in range(1, 4):
+        assert parse(split_at(body, character_start + offset)) == ["𝔘"]
+
+
+def test_parser_projects_elements():
+    body = json.dumps(REPLY).encode()
+    records = parse([body], JsonArrayParser("data", AssetRecord.from_api))
+    assert [record.asset_id for record in records] == [
+        asset["asset_id"] for asset in REPLY["data"]
+    ]
+
+
+def test_parser_reply_without_data():
+    with pytest.raises(KeyError):
+        parse([b'{"success": false, "message": "Internal Server Error"}'])
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        b'{"data": [{"asset_id": "1"}',
+        b'{"data": [1, 2]',
+        b'{"data": [1, 2], "count',
+    ],
+)
+def test_parser_truncated_reply(body):
+    with pytest.raises(ValueError):
+        parse([body])
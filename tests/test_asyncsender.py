@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from waxnftdispatcher.asyncsender import AsyncAssetSender
+
+from .conftest import COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, RECIPIENT, SCHEMA
+
+
+def test_pipelined_sending_is_rejected():
+    with pytest.raises(ValueError):
+        AsyncAssetSender(COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, sign_workers=2)
+
+
+def test_send_or_mint_assets_with_inventory_cache(start_node):
+    node, endpoints = start_node({"100": 1})
+
+    async def run():
+        async with AsyncAssetSender(
+            COLLECTION,
+            COLLECTION_WALLET,
+            PRIVATE_KEY,
+            use_inventory_cache=True,
+            **endpoints,
+        ) as sender:
+            results = await sender.send_or_mint_assets(
+                [(SCHEMA, "100"), (SCHEMA, "100")], RECIPIENT
+            )
+            with pytest.raises(TypeError, match="_refresh_inventory"):
+                sender.inventory.refresh_stale(["200"])
+            return results
+
+    results = asyncio.run(run())
+    assert all(tx_id for _, tx_id in results)
+    assert len(node.pushed) == 2
+
+
+def test_pushed_transaction_isnt_confirmed_by_closed_tracker(start_node):
+    _, endpoints = start_node()
+
+    async def run():
+        async with AsyncAssetSender(
+            COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, **endpoints
+        ) as sender:
+            track = sender.confirmations.track
+
+            def track_and_close(transaction_id):
+                future = track(transaction_id)
+                sender.confirmations.close()
+                return future
+
+            sender.confirmations.track = track_and_close
+            return await sender._settle_pushed("0" * 64, 2)
+
+    assert asyncio.run(run()) == [("None", False)] * 2
@@ -0,0 +1,34 @@
+from .conftest import RECIPIENT, SCHEMA
+
+
+def test_mints_without_results_are_counted_as_failed(start_sender, monkeypatch):
+    _, sender = start_sender(validate_mints=False)
+    batches = []
+
+    def send_with_missing_results(actions):
+        batches.append(len(actions))
+        return [("1099500000000", "tx")]
+
+    monkeypatch.setattr(sender, "_send_with_retries", send_with_missing_results)
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 3, batch_size=3)
+    assert batches == [3]
+    assert results == [
+        (("1099500000000", SCHEMA, "100"), "tx"),
+        ((None, SCHEMA, "100"), False),
+        ((None, SCHEMA, "100"), False),
+    ]
+
+
+def test_cpu_budget_caps_batch_size(start_sender):
+    node, sender = start_sender({"100": 0}, transaction_cpu_budget=4000)
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 4, batch_size=4)
+    assert all(tx_id for _, tx_id in results)
+    assert len(node.pushed) == 2
+
+
+def test_send_or_mint_assets_forwards_batch_size(start_sender):
+    node, sender = start_sender({"100": 0})
+    results = sender.send_or_mint_assets([(SCHEMA, "100")] * 3, RECIPIENT, batch_size=3)
+    assert len(results) == 3
+    assert all(tx_id for _, tx_id in results)
+    assert len(node.pushed) == 1
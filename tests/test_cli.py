@@ -0,0 +1,92 @@
+import io
+import json
+import time
+
+import pytest
+
+from waxnftdispatcher.cli import completed_line, dispatch, main, read_orders
+
+from .conftest import COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, RECIPIENT, SCHEMA
+
+
+class FakeSender:
+    def __init__(self, delays: dict = None):
+        """
+        :param delays: seconds dispatching of the order of every wallet takes
+        """
+        self.delays = delays or {}
+        self.wallets = []
+
+    def send_or_mint_assets(self, assets, wallet, memo=""):
+        time.sleep(self.delays.get(wallet, 0))
+        self.wallets.append(wallet)
+        return [(("1", SCHEMA, "100"), "tx")]
+
+
+def order(wallet: str) -> str:
+    return json.dumps({"wallet": wallet, "schema": SCHEMA, "template": "100"}) + "\n"
+
+
+def written_lines(output: io.StringIO) -> list:
+    return [json.loads(line)["line"] for line in output.getvalue().splitlines()]
+
+
+def test_completed_line_cuts_off_partial_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"line": 1, "ok": true}\n{"line": 3, "ok": true}\n{"line": 4, "o')
+    assert completed_line(str(path)) == 3
+    assert path.read_text() == '{"line": 1, "ok": true}\n{"line": 3, "ok": true}\n'
+
+
+def test_completed_line_without_output(tmp_path):
+    assert completed_line(str(tmp_path / "missing.jsonl")) == 0
+
+
+def test_dispatch_skips_completed_orders():
+    sender = FakeSender()
+    output = io.StringIO()
+    orders = [(1, order("a.wam")), (2, order("b.wam")), (3, order("c.wam"))]
+    stats = dispatch(sender, iter(orders), output, workers=2, start_after=2)
+    assert stats == {"orders": 1, "failed": 0, "skipped": 2}
+    assert sender.wallets == ["c.wam"]
+    assert written_lines(output) == [3]
+
+
+def test_results_are_written_in_order_on_interrupt():
+    sender = FakeSender({"a.wam": 0.3})
+    output = io.StringIO()
+
+    def orders():
+        yield 1, order("a.wam")
+        yield 2, order("b.wam")
+        # Give the second order time to finish before the first one
+        time.sleep(0.1)
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        dispatch(sender, orders(), output, workers=2)
+    assert written_lines(output) == [1, 2]
+
+
+def test_resume_doesnt_dispatch_orders_again(tmp_path, start_node, monkeypatch):
+    node, endpoints = start_node({"100": 2})
+    orders = tmp_path / "orders.jsonl"
+    orders.write_text(order(RECIPIENT) * 2)
+    output = tmp_path / "results.jsonl"
+    monkeypatch.setenv("PRIVATE_KEY", PRIVATE_KEY)
+    argv = ["dispatch", str(orders), "-o", str(output), "--collection", COLLECTION]
+    argv += ["--wallet", COLLECTION_WALLET, "--resume", "--workers", "1"]
+    for option, key in (
+        ("--api-endpoint", "api_endpoints"),
+        ("--history-endpoint", "history_endpoints"),
+        ("--push-endpoint", "push_endpoints"),
+    ):
+        argv += [option, endpoints[key][0]]
+    assert main(argv) == 0
+    # The result of the second order was cut off by the interrupted run
+    first_result = output.read_text().splitlines()[0]
+    output.write_text(first_result + "\n" + '{"line": 2, "o')
+    assert main(argv) == 0
+    assert written_lines(io.StringIO(output.read_text())) == [1, 2]
+    # Only the order without a complete result is sent again
+    assert len(node.pushed) == 3
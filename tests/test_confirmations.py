@@ -0,0 +1,60 @@
+import pytest
+
+from waxnftdispatcher.confirmations import shift_timestamp
+
+from .conftest import RECIPIENT, SCHEMA
+
+
+def test_shift_timestamp():
+    assert shift_timestamp("2023-01-01T00:00:00.500", -1) == "2022-12-31T23:59:59.500"
+    assert (
+        shift_timestamp("2023-01-01T00:00:00.000Z", 0.25) == "2023-01-01T00:00:00.250"
+    )
+
+
+def test_pushed_transaction_is_confirmed(start_sender):
+    node, sender = start_sender({"100": 1}, node_kwargs={"irreversible_blocks": 0})
+    sender.confirmations.poll_interval = 0.1
+    asset_ids, tx_id = sender.send_assets(["1099500000000"], RECIPIENT)
+    confirmation = sender.confirmations.track(tx_id).result(timeout=5)
+    assert confirmation.transaction_id == tx_id
+    final = sender.confirmations.track(tx_id, irreversible=True).result(timeout=5)
+    assert final.irreversible
+
+
+def test_minted_asset_ids_are_read_from_logmint_of_the_recipient(start_sender):
+    _, sender = start_sender({"100": 0}, node_kwargs={"logmint_in_traces": False})
+    sender.confirmations.poll_interval = 0.1
+    results = sender.mint_assets_and_get_ids(SCHEMA, "100", RECIPIENT, 3, batch_size=3)
+    asset_ids = [asset[0] for asset, _ in results]
+    assert all(tx_id for _, tx_id in results)
+    assert asset_ids == ["1099500000000", "1099500000001", "1099500000002"]
+
+
+def test_unknown_transaction_times_out(start_sender):
+    _, sender = start_sender()
+    sender.confirmations.poll_interval = 0.1
+    sender.confirmations.timeout = 0.3
+    future = sender.confirmations.track("0" * 64)
+    with pytest.raises(TimeoutError):
+        future.result(timeout=5)
+
+
+def test_closed_tracker_doesnt_confirm(start_sender):
+    _, sender = start_sender()
+    future = sender.confirmations.track("0" * 64)
+    sender.confirmations.close()
+    assert sender._confirmed_asset_ids(future) == []
+
+
+def test_pushed_transaction_isnt_confirmed_by_closed_tracker(start_sender, monkeypatch):
+    _, sender = start_sender()
+    track = sender.confirmations.track
+
+    def track_and_close(transaction_id):
+        future = track(transaction_id)
+        sender.confirmations.close()
+        return future
+
+    monkeypatch.setattr(sender.confirmations, "track", track_and_close)
+    assert sender._settle_pushed("0" * 64, 2) == [("None", False)] * 2
@@ -0,0 +1,31 @@
+import pytest
+
+from .conftest import RECIPIENT, SCHEMA
+
+
+def test_invalid_recipient_fails_only_its_order(start_sender):
+    _, sender = start_sender({"100": 2})
+    results = sender.dispatch_many(
+        [
+            (RECIPIENT, [(SCHEMA, "100")], ""),
+            ("r0.wam", [(SCHEMA, "100")], ""),
+            ("other.wam", [(SCHEMA, "100"), (SCHEMA, "100")], ""),
+        ]
+    )
+    assert results[1] == [((None, SCHEMA, "100"), False)]
+    assert all(tx_id for _, tx_id in results[0] + results[2])
+    assert len(results[2]) == 2
+
+
+def test_failed_planning_releases_reservations(start_sender, monkeypatch):
+    _, sender = start_sender({"100": 1}, use_inventory_cache=True)
+
+    def broken_transfer(*args, **kwargs):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(sender, "_prepare_transfer_transaction", broken_transfer)
+    with pytest.raises(RuntimeError):
+        # One asset is taken from the inventory and one is minted
+        sender.dispatch_many([(RECIPIENT, [(SCHEMA, "100"), (SCHEMA, "100")], "")])
+    assert sender.inventory.reserved_assets() == {}
+    assert sender.templates._templates["100"].issued_supply == 1
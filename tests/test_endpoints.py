@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from waxnftdispatcher import AssetSender
+from waxnftdispatcher.endpoints import MIN_SAMPLES, EndpointPool
+
+from .conftest import COLLECTION, COLLECTION_WALLET, PRIVATE_KEY, RECIPIENT, SCHEMA
+
+# Nothing listens on the port 1, so connections are refused at once
+DEAD_URL = "http://127.0.0.1:1"
+
+
+def test_endpoints_are_ranked_by_latency():
+    pool = EndpointPool(["https://a", "https://b", "https://c"])
+    pool.record("https://a", 0.3, True)
+    pool.record("https://b", 0.1, True)
+    # Endpoints without requests go first, so they get measured
+    assert pool.ranked() == ["https://c", "https://b", "https://a"]
+
+
+def test_failing_endpoints_go_after_slow_ones():
+    pool = EndpointPool(["https://a", "https://b"])
+    pool.record("https://a", 0.1, True)
+    pool.record("https://a", 0.1, False)
+    pool.record("https://b", 1.0, True)
+    assert pool.ranked() == ["https://b", "https://a"]
+
+
+def test_endpoint_is_suspended_when_it_fails_too_often():
+    pool = EndpointPool(["https://a", "https://b"], max_error_rate=0.5)
+    for _ in range(MIN_SAMPLES):
+        pool.record("https://a", 0.1, False)
+    pool.record("https://b", 0.1, False)
+    assert pool.report()["https://a"]["suspended"]
+    assert pool.ranked() == ["https://b", "https://a"]
+
+
+def test_request_fails_over_to_the_next_endpoint():
+    pool = EndpointPool(["https://a", "https://b"])
+    tried = []
+
+    def send(url):
+        tried.append(url)
+        if url == "https://a":
+            raise ConnectionError("refused")
+        return url
+
+    assert pool.request(send) == "https://b"
+    assert tried == ["https://a", "https://b"]
+    assert pool.report()["https://a"]["error_rate"] == 1.0
+    assert pool.ranked()[0] == "https://b"
+
+
+def test_request_raises_the_last_error_if_all_endpoints_fail():
+    pool = EndpointPool(["https://a", "https://b"])
+
+    def send(url):
+        raise ConnectionError(url)
+
+    with pytest.raises(ConnectionError, match="https://b"):
+        pool.request(send)
+
+
+def test_hedged_request_returns_the_faster_reply():
+    pool = EndpointPool(["https://a", "https://b"])
+    for _ in range(MIN_SAMPLES):
+        pool.record("https://a", 0.01, True)
+
+    def send(url):
+        if url == "https://a":
+            time.sleep(0.5)
+        return url
+
+    try:
+        assert pool.request(send, hedge=True) == "https://b"
+    finally:
+        pool.close()
+
+
+def test_async_request_fails_over_to_the_next_endpoint():
+    pool = EndpointPool(["https://a", "https://b"])
+
+    async def send(url):
+        if url == "https://a":
+            raise ConnectionError("refused")
+        return url
+
+    assert asyncio.run(pool.request_async(send)) == "https://b"
+
+
+def test_sender_fails_over_from_dead_endpoints(start_node):
+    node, endpoints = start_node({"100": 1})
+    sender = AssetSender(
+        COLLECTION,
+        COLLECTION_WALLET,
+        PRIVATE_KEY,
+        **{key: [DEAD_URL] + urls for key, urls in endpoints.items()},
+    )
+    try:
+        asset_ids, tx_id = sender.send_or_mint_assets([(SCHEMA, "100")], RECIPIENT)[0]
+        assert tx_id in node.pushed
+        assert sender.push_endpoints.ranked()[0] != DEAD_URL
+    finally:
+        sender.close()
@@ -0,0 +1,45 @@
+from waxnftdispatcher.assets import AssetRecord
+from waxnftdispatcher.inventory import InventoryCache
+
+
+def inventory(*assets) -> InventoryCache:
+    return InventoryCache(
+        lambda template_ids: [
+            AssetRecord(asset_id, template_id)
+            for asset_id, template_id in assets
+            if template_id in template_ids
+        ]
+    )
+
+
+def test_inventory_reserve_commit_release():
+    cache = inventory(("1", "t1"), ("2", "t1"), ("3", "t1"), ("4", "t2"))
+
+    assert cache.reserve("t1", 2) == (["1", "2"], 0)
+    assert cache.reserve("t1", 2) == (["3"], 1)
+    assert cache.reserved_assets() == {"1": "t1", "2": "t1", "3": "t1"}
+
+    cache.commit(["1"])
+    cache.release(["2", "3"])
+    assert cache.reserved_assets() == {}
+    # Released assets are picked first and in the order they were reserved
+    assert cache.reserve("t1", 3) == (["2", "3"], 1)
+
+
+def test_inventory_sent_assets_are_not_reserved_again():
+    cache = inventory(("1", "t1"), ("2", "t1"))
+    asset_ids, _ = cache.reserve("t1", 1)
+    cache.commit(asset_ids)
+    # The API may still return the sent asset until it indexes the transfer
+    cache.invalidate()
+    assert cache.reserve("t1", 2) == (["2"], 1)
+
+
+def test_inventory_refresh_keeps_reservations():
+    cache = inventory(("1", "t1"), ("2", "t1"))
+    asset_ids, _ = cache.reserve("t1", 1)
+    cache.invalidate(["t1"])
+    # The reserved asset is still returned by the API, but it isn't free
+    assert cache.reserve("t1", 2) == (["2"], 1)
+    cache.release(asset_ids)
+    assert cache.reserve("t1", 1) == (["1"], 0)
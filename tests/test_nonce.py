@@ -0,0 +1,21 @@
+from .conftest import RECIPIENT, SCHEMA
+
+
+def test_identical_transactions_get_different_ids(start_sender):
+    node, sender = start_sender({"100": 0})
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 3)
+    tx_ids = [tx_id for _, tx_id in results]
+    assert all(tx_ids)
+    assert len(set(tx_ids)) == 3
+    assert set(tx_ids) == node.pushed
+
+
+def test_nonce_action_is_the_last_one(start_sender):
+    _, sender = start_sender()
+    action = sender._prepare_mint_transaction(
+        sender.collection_wallet, sender.collection, SCHEMA, "100", RECIPIENT
+    )
+    first = sender._prepare_transaction([action])
+    second = sender._prepare_transaction([action])
+    assert [a.name for a in first.actions] == ["mintasset", "nonce"]
+    assert first.actions[-1].data != second.actions[-1].data
@@ -0,0 +1,52 @@
+from waxnftdispatcher.network import PooledNet
+from waxnftdispatcher.ratecontrol import RateController
+
+from .conftest import RECIPIENT, SCHEMA
+from .test_ratecontrol import time_out_pushes
+
+CPU_ERROR_REPLY = {
+    "code": 500,
+    "error": {
+        "name": "tx_cpu_usage_exceeded",
+        "details": [{"message": "transaction was executing for too long"}],
+    },
+}
+
+
+def test_pipelined_mints_follow_rate_controller(start_sender):
+    node, sender = start_sender(
+        {"100": 0}, sign_workers=1, rate_controller=RateController(max_batch_size=2)
+    )
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 5, batch_size=5)
+    assert all(tx_id for _, tx_id in results)
+    assert len(node.pushed) == 3
+
+
+def test_retried_batch_is_split_when_batch_size_shrinks(start_sender, monkeypatch):
+    rate_controller = RateController(max_batch_size=4, backoff={"cpu": 0.0})
+    node, sender = start_sender(
+        {"100": 0}, sign_workers=1, rate_controller=rate_controller
+    )
+    post = PooledNet._post
+    rejected = []
+
+    def reject_first_push(self, host, endpoint, payload):
+        if endpoint == "/v1/chain/push_transaction" and not rejected:
+            rejected.append(payload)
+            return CPU_ERROR_REPLY
+        return post(self, host, endpoint, payload)
+
+    monkeypatch.setattr(PooledNet, "_post", reject_first_push)
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 4, batch_size=4)
+    assert len(results) == 4
+    assert all(tx_id for _, tx_id in results)
+    # The batch of 4 is sent again as 2 transactions of 2 actions
+    assert len(node.pushed) == 2
+
+
+def test_timed_out_pipelined_transaction_is_confirmed(start_sender, monkeypatch):
+    node, sender = start_sender({"100": 0}, sign_workers=1)
+    sender.confirmations.poll_interval = 0.1
+    time_out_pushes(monkeypatch, reach_node=True)
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 2, batch_size=2)
+    assert [tx_id for _, tx_id in results] == list(node.pushed) * 2
@@ -0,0 +1,65 @@
+import pytest
+
+from waxnftdispatcher.pool import AssetSenderPool
+from waxnftdispatcher.ratecontrol import RateController
+
+from .conftest import COLLECTION, PRIVATE_KEY, RECIPIENT, SCHEMA
+
+ACCOUNTS = ["minter1.wam", "minter2.wam", "minter3.wam"]
+
+
+@pytest.fixture
+def make_pool(start_node):
+    pools = []
+
+    def make(strategy: str, accounts_cpu: dict = None, **kwargs) -> AssetSenderPool:
+        _, endpoints = start_node({"100": 0}, accounts_cpu=accounts_cpu)
+        pool = AssetSenderPool(
+            COLLECTION,
+            [(account, PRIVATE_KEY) for account in ACCOUNTS],
+            strategy=strategy,
+            **endpoints,
+            **kwargs,
+        )
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+@pytest.mark.parametrize("orders_count", [0, 1, 2, 7, 100])
+def test_split_lru_evenly(make_pool, orders_count):
+    shares = make_pool("lru")._split(orders_count)
+    assert sum(shares) == orders_count
+    assert max(shares) - min(shares) <= 1
+
+
+def test_split_by_resources(make_pool):
+    pool = make_pool(
+        "resources", {"minter1.wam": 100, "minter2.wam": 300, "minter3.wam": 0}
+    )
+    assert pool._split(8) == [2, 6, 0]
+    # The rest goes to the accounts with the most CPU
+    assert pool._split(5) == [1, 4, 0]
+
+
+def test_split_without_resources(make_pool):
+    pool = make_pool("resources", {account: 0 for account in ACCOUNTS})
+    assert pool._split(4) == [2, 1, 1]
+
+
+def test_shared_rate_controller_is_rejected(make_pool):
+    with pytest.raises(ValueError):
+        make_pool("lru", rate_controller=RateController())
+
+
+def test_dispatch_many_through_all_accounts(make_pool):
+    pool = make_pool("lru")
+    orders = [(RECIPIENT, [(SCHEMA, "100")], "")] * 6
+    results = pool.dispatch_many(orders)
+    assert all(tx_id for order_results in results for _, tx_id in order_results)
+    assert {
+        wallet: stats["actions"] for wallet, stats in pool.throughput().items()
+    } == {account: 2 for account in ACCOUNTS}
@@ -0,0 +1,74 @@
+import httpx
+from pyntelope import exc
+
+from waxnftdispatcher.network import PooledNet
+from waxnftdispatcher.ratecontrol import RateController
+
+from .conftest import RECIPIENT, SCHEMA
+
+ERROR_REPLY = {
+    "code": 500,
+    "error": {"name": "unknown_account", "details": [{"message": "unknown"}]},
+}
+
+
+def test_error_reply_leaves_resources_unknown():
+    rate_controller = RateController()
+    rate_controller.observe_account(
+        {"cpu_limit": {"available": 5000}, "net_limit": {"available": 100}}
+    )
+    assert rate_controller.batch_size(10, 1000) == 5
+    rate_controller.observe_account(ERROR_REPLY)
+    assert rate_controller.cpu_available is None
+    assert rate_controller.batch_size(10, 1000) == 10
+    assert not rate_controller.resources_stale()
+
+
+def test_send_survives_error_reply_of_get_account(start_sender, monkeypatch):
+    _, sender = start_sender({"100": 1})
+    monkeypatch.setattr(
+        PooledNet, "get_account", lambda self, account_name: ERROR_REPLY
+    )
+    asset_ids, tx_id = sender.send_assets(["1099500000000"], RECIPIENT)
+    assert tx_id
+
+
+def time_out_pushes(monkeypatch, reach_node: bool):
+    """
+    Makes the sender get a read timeout for every pushed transaction
+    :param reach_node: if True, transactions reach the node anyway
+    """
+    post = PooledNet._post
+
+    def timed_out_post(self, host, endpoint, payload):
+        if endpoint != "/v1/chain/push_transaction":
+            return post(self, host, endpoint, payload)
+        if reach_node:
+            post(self, host, endpoint, payload)
+        error = httpx.ReadTimeout("timed out")
+        raise exc.ConnectionError(
+            response=None, url=host, payload=payload, error=error
+        ) from error
+
+    monkeypatch.setattr(PooledNet, "_post", timed_out_post)
+
+
+def test_timed_out_transaction_is_confirmed(start_sender, monkeypatch):
+    node, sender = start_sender({"100": 1}, use_inventory_cache=True)
+    sender.confirmations.poll_interval = 0.1
+    time_out_pushes(monkeypatch, reach_node=True)
+    asset_ids, tx_id = sender.send_or_mint_assets([(SCHEMA, "100")], RECIPIENT)[0]
+    assert tx_id in node.pushed
+    assert asset_ids == ("1099500000000",)
+    assert sender.inventory.reserved_assets() == {}
+    # The sent asset isn't offered again
+    assert sender.inventory.reserve("100", 1) == ([], 1)
+
+
+def test_lost_transaction_fails_after_confirmation_timeout(start_sender, monkeypatch):
+    node, sender = start_sender({"100": 1}, confirmation_timeout=0.5)
+    sender.confirmations.poll_interval = 0.1
+    time_out_pushes(monkeypatch, reach_node=False)
+    asset_ids, tx_id = sender.send_assets(["1099500000000"], RECIPIENT)
+    assert tx_id is False
+    assert not node.pushed
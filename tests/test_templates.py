@@ -0,0 +1,58 @@
+import pytest
+
+from waxnftdispatcher.pool import AssetSenderPool
+
+from .conftest import COLLECTION, PRIVATE_KEY, RECIPIENT, SCHEMA
+
+
+def test_supply_of_unsent_mints_is_released(start_sender, monkeypatch):
+    _, sender = start_sender({"100": 0}, node_kwargs={"max_supply": 5})
+
+    def broken_send(actions):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(sender, "_send_with_retries", broken_send)
+    with pytest.raises(RuntimeError):
+        sender.mint_assets(SCHEMA, "100", RECIPIENT, 3)
+    monkeypatch.undo()
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 5)
+    assert all(tx_id for _, tx_id in results)
+
+
+def test_pool_accounts_share_issued_supply(start_node):
+    _, endpoints = start_node({"100": 0}, max_supply=3)
+    with AssetSenderPool(
+        COLLECTION,
+        [("minter1.wam", PRIVATE_KEY), ("minter2.wam", PRIVATE_KEY)],
+        **endpoints,
+    ) as pool:
+        first = pool.mint_assets(SCHEMA, "100", RECIPIENT, 2)
+        second = pool.mint_assets(SCHEMA, "100", RECIPIENT, 2)
+        templates = {id(sender.templates) for sender in pool.senders}
+        issued_supply = pool.senders[1].templates._templates["100"].issued_supply
+    assert [bool(tx_id) for _, tx_id in first + second] == [True, True, True, False]
+    # The last mint is rejected by the shared cache without pushing a transaction
+    assert len(templates) == 1
+    assert issued_supply == 3
+
+
+def test_mints_of_unknown_template_are_rejected(start_sender):
+    node, sender = start_sender({"100": 0})
+    results = sender.mint_assets(SCHEMA, "999", RECIPIENT, 2)
+    assert results == [((None, SCHEMA, "999"), False)] * 2
+    assert not node.pushed
+
+
+def test_mints_of_template_of_another_schema_are_rejected(start_sender):
+    node, sender = start_sender({"100": 0})
+    results = sender.mint_assets("otherschema", "100", RECIPIENT, 1)
+    assert results == [((None, "otherschema", "100"), False)]
+    assert not node.pushed
+
+
+def test_mints_beyond_max_supply_are_rejected(start_sender):
+    node, sender = start_sender({"100": 1}, node_kwargs={"max_supply": 3})
+    results = sender.mint_assets(SCHEMA, "100", RECIPIENT, 4, batch_size=4)
+    assert [bool(tx_id) for _, tx_id in results] == [True, True, False, False]
+    assert len(node.pushed) == 1
+    assert node.issued["100"] == 3
@@ -1 +1,6 @@
-from .waxNFTdispatcher import AssetSender
\ No newline at end of file
+from .waxNFTdispatcher import AssetSender
+from .asyncsender import AsyncAssetSender
+from .inventory import InventoryCache
+from .pool import AssetSenderPool
+from .metrics import InMemoryMetrics, MetricsHook, start_prometheus_server
+from .confirmations import Confirmation, ConfirmationTracker
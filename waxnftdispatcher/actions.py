@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+import pyntelope
+
+# How many compiled action templates are kept
+ACTION_TEMPLATES_SIZE = 1024
+ATOMICASSETS_CONTRACT = "atomicassets"
+
+
+class ActionTemplates:
+    def __init__(
+        self, actor: str, permission: str = "active", maxsize=ACTION_TEMPLATES_SIZE
+    ):
+        """
+        Serializes the constant fields of mint and transfer actions once, so only the recipient,
+        asset IDs and memo are encoded for every action. The least recently used templates are evicted.
+        :param actor: wallet which authorizes the actions
+        :param permission: self-explanatory
+        :param maxsize: how many compiled templates are kept
+        """
+        self.authorization = (
+            pyntelope.Authorization(actor=actor, permission=permission),
+        )
+        self.maxsize = maxsize
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(
+        self, key: tuple, compile_: Callable[[], pyntelope.Data]
+    ) -> pyntelope.Data:
+        """
+        :param key: what identifies the constant fields
+        :param compile_: function which serializes the constant fields
+        :return: Data object with the serialized constant fields
+        """
+        with self._lock:
+            compiled = self._templates.get(key)
+            if compiled is not None:
+                self._templates.move_to_end(key)
+                return compiled
+        compiled = compile_()
+        with self._lock:
+            self._templates[key] = compiled
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return compiled
+
+    def mint(
+        self,
+        authorized_minter: str,
+        collection_name: str,
+        schema_name: str,
+        template_id: str,
+        new_asset_owner: str,
+        tokens_to_back: str = "0.00000000 WAX",
+    ) -> pyntelope.Action:
+        """
+        :return: mintasset action without immutable and mutable data
+        """
+
+        def compile_head():
+            return _compile(
+                "authorized_minter,collection_name,schema_name,template_id",
+                pyntelope.types.Name(authorized_minter),
+                pyntelope.types.Name(collection_name),
+                pyntelope.types.Name(schema_name),
+                pyntelope.types.Uint32(template_id),
+            )
+
+        def compile_tail():
+            return _compile(
+                "immutable_data,mutable_data,tokens_to_back",
+                pyntelope.types.Array(values=[], type_=pyntelope.types.Array),
+                pyntelope.types.Array(values=[], type_=pyntelope.types.Array),
+                pyntelope.types.Asset(tokens_to_back),
+            )
+
+        head = self._get(
+            ("mintasset", authorized_minter, collection_name, schema_name, template_id),
+            compile_head,
+        )
+        tail = self._get(("mintasset", tokens_to_back), compile_tail)
+        return pyntelope.Action(
+            account=ATOMICASSETS_CONTRACT,
+            name="mintasset",
+            data=[
+                head,
+                pyntelope.Data(
+                    name="new_asset_owner",
+                    value=pyntelope.types.Name(new_asset_owner),
+                ),
+                tail,
+            ],
+            authorization=self.authorization,
+        )
+
+    def transfer(
+        self, from_wallet: str, to: str, asset_ids: Iterable[any], memo: str = ""
+    ) -> pyntelope.Action:
+        """
+        :return: transfer action
+        """
+        head = self._get(
+            ("transfer", from_wallet),
+            lambda: _compile("from", pyntelope.types.Name(from_wallet)),
+        )
+        return pyntelope.Action(
+            account=ATOMICASSETS_CONTRACT,
+            name="transfer",
+            data=[
+                head,
+                pyntelope.Data(name="to", value=pyntelope.types.Name(to)),
+                pyntelope.Data(
+                    name="asset_ids",
+                    value=pyntelope.types.Array.from_dict(
+                        asset_ids, type_=pyntelope.types.Uint64
+                    ),
+                ),
+                pyntelope.Data(name="memo", value=pyntelope.types.String(memo)),
+            ],
+            authorization=self.authorization,
+        )
+
+
+def _compile(name: str, *values) -> pyntelope.Data:
+    """
+    :param name: names of the fields separated by commas
+    :param values: pyntelope types of consecutive fields
+    :return: one Data object with already serialized fields
+    """
+    return pyntelope.Data(
+        name=name,
+        value=pyntelope.types.Bytes(value=b"".join(bytes(value) for value in values)),
+    )
@@ -0,0 +1,180 @@
+import codecs
+import json
+import re
+from typing import AsyncIterable, Callable, Iterable
+
+# Bytes read from the socket at once while parsing replies of the API
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# What may still follow the part of a number already received, e.g. "6." or "6.5e"
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+_DECODER = json.JSONDecoder()
+
+
+class AssetRecord:
+    __slots__ = ("asset_id", "template_id", "schema_name", "template_mint")
+
+    def __init__(
+        self,
+        asset_id: str,
+        template_id: str,
+        schema_name: str = None,
+        template_mint: str = None,
+    ):
+        """
+        Asset of the collection wallet with only the fields needed to pick assets for orders
+        :param asset_id: self-explanatory
+        :param template_id: self-explanatory
+        :param schema_name: self-explanatory
+        :param template_mint: mint number of the asset within its template
+        """
+        self.asset_id = asset_id
+        self.template_id = template_id
+        self.schema_name = schema_name
+        self.template_mint = template_mint
+
+    @classmethod
+    def from_api(cls, asset: dict) -> "AssetRecord":
+        """
+        :param asset: asset as AtomicAssets API returns it
+        """
+        return cls(
+            asset["asset_id"],
+            (asset.get("template") or {}).get("template_id"),
+            (asset.get("schema") or {}).get("schema_name"),
+            asset.get("template_mint"),
+        )
+
+    def __repr__(self):
+        return f"AssetRecord({self.asset_id!r}, {self.template_id!r})"
+
+
+class JsonArrayParser:
+    def __init__(self, key: str = "data", project: Callable = None):
+        """
+        Incremental parser of one array of a JSON object, e.g. "data" of AtomicAssets API replies.
+        Elements are returned as soon as they are complete, so the whole reply is never held in memory.
+        :param key: key of the array in the top-level object
+        :param project: applied to every element, e.g. to keep only the needed fields
+        """
+        self.key = key
+        self.project = project
+        self._text = ""
+        self._position = 0
+        self._state = "object"
+        self._last_key = None
+        self._found = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        :param chunk: next bytes of the reply
+        :return: elements of the array completed by the chunk
+        """
+        self._text = self._text[self._position :] + self._decoder.decode(chunk)
+        self._position = 0
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """
+        :return: remaining elements of the array
+        """
+        self._text = self._text[self._position :] + self._decoder.decode(
+            b"", final=True
+        )
+        self._position = 0
+        items = self._parse(final=True)
+        if self._state != "done":
+            raise ValueError("Reply of the API is incomplete!")
+        if not self._found:
+            raise KeyError(self.key)
+        return items
+
+    def _decode(self, final: bool):
+        """
+        :return: True and the value starting at the current position or False and None if it isn't complete yet
+        """
+        try:
+            value, end = _DECODER.raw_decode(self._text, self._position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        # A number at the end of the text may go on in the next chunk
+        if (
+            not final
+            and not isinstance(value, (str, list, dict))
+            and _NUMBER_TAIL.match(self._text, end)
+        ):
+            return False, None
+        self._position = end
+        return True, value
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        while True:
+            self._position = _WHITESPACE.match(self._text, self._position).end()
+            if self._position == len(self._text):
+                return items
+            char = self._text[self._position]
+            if self._state == "object":
+                if char != "{":
+                    raise ValueError("Reply of the API isn't a JSON object!")
+                self._position += 1
+                self._state = "key"
+            elif self._state in ("key", "element") and char == ",":
+                self._position += 1
+            elif self._state == "key" and char == "}":
+                self._position += 1
+                self._state = "done"
+            elif self._state == "element" and char == "]":
+                self._position += 1
+                self._state = "key"
+            elif self._state == "colon":
+                if char != ":":
+                    raise ValueError("Reply of the API isn't valid JSON!")
+                self._position += 1
+                self._state = "array" if self._last_key == self.key else "value"
+            elif self._state == "array":
+                if char != "[":
+                    raise ValueError(f"'{self.key}' of the reply isn't an array!")
+                self._position += 1
+                self._found = True
+                self._state = "element"
+            elif self._state == "done":
+                raise ValueError("Reply of the API isn't valid JSON!")
+            else:
+                complete, value = self._decode(final)
+                if not complete:
+                    return items
+                if self._state == "key":
+                    self._last_key = value
+                    self._state = "colon"
+                elif self._state == "value":
+                    self._state = "key"
+                else:
+                    items.append(value if self.project is None else self.project(value))
+
+
+def read_asset_records(chunks: Iterable[bytes]) -> list:
+    """
+    :param chunks: body of the reply of /atomicassets/v1/assets
+    :return: list of AssetRecord objects
+    """
+    parser = JsonArrayParser("data", AssetRecord.from_api)
+    records = []
+    for chunk in chunks:
+        records += parser.feed(chunk)
+    return records + parser.close()
+
+
+async def aread_asset_records(chunks: AsyncIterable[bytes]) -> list:
+    """
+    Same as read_asset_records() for the body of an asynchronous reply
+    """
+    parser = JsonArrayParser("data", AssetRecord.from_api)
+    records = []
+    async for chunk in chunks:
+        records += parser.feed(chunk)
+    return records + parser.close()
@@ -0,0 +1,697 @@
+import asyncio
+from concurrent.futures import CancelledError
+from collections import Counter
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Tuple
+from urllib.parse import urljoin
+
+import httpx
+import pyntelope
+from loguru import logger
+from pyntelope import exc
+
+from .assets import STREAM_CHUNK_SIZE, AssetRecord, aread_asset_records
+from .endpoints import EndpointPool
+from .network import read_node_reply
+from .ratecontrol import classify_exception, classify_push_error
+from .waxNFTdispatcher import (
+    ASSETS_PAGE_LIMIT,
+    ASSETS_PATH,
+    DUPLICATE_TRANSACTION_DELAY,
+    HISTORY_TRANSACTION_PATH,
+    REQUEST_TIMEOUT,
+    INVENTORY_WORKERS,
+    MAX_ACTIONS_PER_TRANSACTION,
+    AssetSender,
+)
+
+# How many requests to API and blockchain can be in flight at the same time
+MAX_CONCURRENCY = 50
+
+
+class AsyncAssetSender(AssetSender):
+    def __init__(
+        self,
+        collection: str,
+        collection_wallet: str,
+        private_key: str,
+        api_endpoint: str = "",
+        testnet: bool = False,
+        max_concurrency: int = MAX_CONCURRENCY,
+        **kwargs,
+    ):
+        """
+        asyncio counterpart of AssetSender. Methods have the same names and return the same values
+        but must be awaited.
+        :param collection: Collection which assets are going to be transferred or minted
+        :param collection_wallet: wallet which holds the assets
+        :param private_key: private key from the collection_wallet
+        :param api_endpoint: API URL address
+        :param testnet: if True, will interact with Wax Test Net through Test endpoint.
+        :param max_concurrency: how many requests to API and blockchain can be in flight at the same time
+        :param kwargs: other arguments of AssetSender except sign_workers and send_workers
+        """
+        if kwargs.get("sign_workers"):
+            raise ValueError("Pipelined sending isn't supported by AsyncAssetSender!")
+        super().__init__(
+            collection, collection_wallet, private_key, api_endpoint, testnet, **kwargs
+        )
+        self.max_concurrency = max_concurrency
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency)
+        )
+        # Created on first use, so they are bound to the running event loop
+        self._semaphore = None
+        self._inventory_lock = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def inventory_lock(self) -> asyncio.Lock:
+        if self._inventory_lock is None:
+            self._inventory_lock = asyncio.Lock()
+        return self._inventory_lock
+
+    async def close(self):
+        """
+        Closes pooled connections to the API and blockchain nodes
+        """
+        await self.client.aclose()
+        super().close()
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncAssetSender")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError("Use 'async with' with AsyncAssetSender")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _api_get(
+        self,
+        endpoints: EndpointPool,
+        path: str,
+        params: dict,
+        parse: Callable[[httpx.Response], Awaitable] = None,
+    ):
+        """
+        Makes GET request to the fastest healthy endpoint. Fails over to the next ones.
+        :param endpoints: pool of API endpoints
+        :param path: e.g. "/atomicassets/v1/assets"
+        :param params: query parameters
+        :param parse: coroutine function which reads the streamed reply. The whole reply is decoded
+                as JSON by default.
+        :return: reply of the API
+        """
+
+        async def send(base_url: str):
+            async with self.semaphore:
+                async with self.client.stream(
+                    "GET", f"{base_url}{path}", params=params, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    # Let the next endpoint answer if this one is overloaded or broken
+                    if response.status_code >= 500 or response.status_code == 429:
+                        response.raise_for_status()
+                    if parse is not None:
+                        return await parse(response)
+                    await response.aread()
+            return response.json()
+
+        return await endpoints.request_async(send, hedge=self.hedge_reads)
+
+    async def _post_to_chain(self, endpoint: str, payload: dict) -> dict:
+        """
+        Same as pyntelope.Net._request() but doesn't block the event loop
+        :param endpoint: chain API endpoint. E.g. "/v1/chain/get_info"
+        :param payload: request body
+        :return: reply of the blockchain node
+        """
+
+        async def send(host: str) -> dict:
+            url = urljoin(host, endpoint)
+            headers = {"user-agent": f"pyntelope/{pyntelope.__version__}"}
+            headers.update(self.net.headers)
+            try:
+                async with self.semaphore:
+                    resp = await self.client.post(url, json=payload, headers=headers)
+            except (
+                httpx.TimeoutException,
+                httpx.NetworkError,
+                httpx.WriteError,
+            ) as e:
+                raise exc.ConnectionError(
+                    response=None, url=url, payload=payload, error=e
+                )
+            return read_node_reply(resp, url, payload)
+
+        return await self.push_endpoints.request_async(send)
+
+    async def _get_available_assets(
+        self,
+        schema_template_list: Iterable[Tuple[str, str]],
+        sorting_key: str = None,
+        limit: int = ASSETS_PAGE_LIMIT,
+    ) -> list:
+        with self.metrics.timer("get_available_assets"):
+            return [
+                asset
+                async for asset in self._iter_available_assets(
+                    schema_template_list, sorting_key, limit
+                )
+            ]
+
+    async def _iter_available_assets(
+        self,
+        schema_template_list: Iterable[Tuple[str, str]],
+        sorting_key: str = None,
+        limit: int = ASSETS_PAGE_LIMIT,
+        workers: int = INVENTORY_WORKERS,
+    ) -> AsyncIterator[AssetRecord]:
+        template_list_string = ",".join(
+            dict.fromkeys(template[1] for template in schema_template_list)
+        )
+        logger.info(
+            f"Making request to blockchain to find in the collection wallet "
+            f"following templates: {template_list_string}"
+        )
+        payload = {
+            "owner": self.collection_wallet,
+            "template_whitelist": template_list_string,
+            "sort": sorting_key or self.sorting_key,
+            "order": self.sorting_order,
+            "limit": limit,
+        }
+        page = 1
+        while True:
+            pages = await asyncio.gather(
+                *(
+                    self._get_assets_page(payload, page_number)
+                    for page_number in range(page, page + workers)
+                )
+            )
+            for assets in pages:
+                for asset in assets:
+                    yield asset
+                if len(assets) < limit:
+                    return
+            page += workers
+
+    async def _get_assets_page(self, payload: dict, page: int) -> list:
+        logger.debug(f"Requesting page {page} of available assets...")
+        with self.metrics.timer("get_assets_page"):
+            return await self._api_get(
+                self.api_endpoints,
+                ASSETS_PATH,
+                {**payload, "page": page},
+                parse=lambda response: aread_asset_records(
+                    response.aiter_bytes(STREAM_CHUNK_SIZE)
+                ),
+            )
+
+    async def _get_right_asset_id(
+        self,
+        tx_id: str,
+    ) -> str:
+        logger.info(f"Making request to blockchain to find ID of freshly minted asset.")
+        with self.metrics.timer("get_right_asset_id"):
+            response = await self._api_get(
+                self.history_endpoints, HISTORY_TRANSACTION_PATH, {"id": tx_id}
+            )
+            return self._parse_minted_asset_id(response)
+
+    async def _try_get_right_asset_id(self, tx_id: str):
+        """
+        Same as AssetSender._try_get_right_asset_id()
+        """
+        retries = self.rate_controller.retry_budget()
+        while True:
+            try:
+                return await self._get_right_asset_id(tx_id)
+            except (KeyError, httpx.HTTPError) as error:
+                wait_time = self.rate_controller.next_retry(retries, "network")
+                if wait_time is None:
+                    logger.error(f"Couldn't find transaction {tx_id}: {error!r}")
+                    return None
+                self.metrics.retry("get_right_asset_id", "network")
+                logger.warning(
+                    f"Transaction {tx_id} wasn't found. Will retry in {wait_time} seconds..."
+                )
+                await asyncio.sleep(wait_time)
+
+    async def _get_available_assets_for(self, schemas_templates_quantities) -> list:
+        still_needed = Counter()
+        for schema_template, quantity in schemas_templates_quantities:
+            still_needed[schema_template[1]] += quantity
+        api_response = []
+        with self.metrics.timer("get_available_assets"):
+            async for asset in self._iter_available_assets(
+                [schema_template for schema_template, _ in schemas_templates_quantities]
+            ):
+                api_response.append(asset)
+                still_needed[asset.template_id] -= 1
+                if all(quantity <= 0 for quantity in still_needed.values()):
+                    break
+        return api_response
+
+    def _fetch_inventory(self, template_ids: Iterable[str]):
+        """
+        The inventory cache is refreshed by awaiting _refresh_inventory() and reserved with refresh=False,
+        since the cache can't await the requests itself
+        """
+        raise TypeError(
+            "Inventory of AsyncAssetSender is refreshed only by _refresh_inventory()!"
+        )
+
+    async def _refresh_inventory(self, template_ids: Iterable[str]):
+        """
+        Requests assets of not cached or expired templates and loads them into the inventory cache
+        :param template_ids: templates which are going to be reserved
+        """
+        template_ids = list(template_ids)
+        # Concurrent orders wait for one refresh instead of requesting the same templates
+        async with self.inventory_lock:
+            stale = self.inventory.stale_templates(template_ids)
+            if stale:
+                assets = await self._get_available_assets(
+                    [(None, template_id) for template_id in stale]
+                )
+                self.inventory.load(stale, assets)
+
+    async def _link(self, raw_transaction: pyntelope.Transaction):
+        """
+        Links transaction to the network requesting chain info only if the cached one is expired
+        :param raw_transaction: Transaction object
+        :return: LinkedTransaction object
+        """
+        if self.net.cached_chain_info() is None:
+            self.net.set_chain_info(await self._post_to_chain("/v1/chain/get_info", {}))
+        # pyntelope requests chain info with a blocking call if the cached one expired meanwhile
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(raw_transaction.link, net=self.net)
+        )
+
+    async def _send_transaction(self, action):
+        return (await self._send_batch_transaction([action]))[0]
+
+    async def _send_batch_transaction(self, actions: list) -> list:
+        _, resp = await self._push_transaction(actions)
+        return self._parse_push_response(resp, len(actions))
+
+    async def _push_transaction(self, actions: list) -> Tuple[str, dict]:
+        transaction_id, signed_transaction = await self._sign_transaction(actions)
+        return transaction_id, await self._push_signed_transaction(signed_transaction)
+
+    async def _sign_transaction(
+        self, actions: list
+    ) -> Tuple[str, pyntelope.SignedTransaction]:
+        with self.metrics.timer("build"):
+            raw_transaction = self._prepare_transaction(actions)
+        logger.debug("Linking transaction to the network...")
+        with self.metrics.timer("link"):
+            linked_transaction = await self._link(raw_transaction)
+        logger.debug("Signing transaction...")
+        with self.metrics.timer("sign"):
+            # Signing is CPU-bound, so it's done outside of the event loop
+            signed_transaction = await asyncio.get_running_loop().run_in_executor(
+                None, partial(linked_transaction.sign, key=self.private_key)
+            )
+        return signed_transaction.id(), signed_transaction
+
+    async def _push_signed_transaction(
+        self, signed_transaction: pyntelope.SignedTransaction
+    ) -> dict:
+        logger.debug("Sending transaction to the blockchain...")
+        with self.metrics.timer("send"):
+            resp = await self._post_to_chain(
+                "/v1/chain/push_transaction",
+                dict(
+                    signatures=list(signed_transaction.signatures),
+                    compression=False,
+                    packed_context_free_data="",
+                    packed_trx=signed_transaction.pack(),
+                ),
+            )
+        self._record_push_failure(resp)
+        return resp
+
+    async def _send_with_retries(self, actions: list) -> list:
+        retries = self.rate_controller.retry_budget()
+        while True:
+            await self._refresh_resources()
+            await asyncio.sleep(self.rate_controller.reserve())
+            transaction_id = None
+            try:
+                transaction_id, signed_transaction = await self._sign_transaction(
+                    actions
+                )
+                resp = await self._push_signed_transaction(signed_transaction)
+            except exc.ConnectionError as error:
+                logger.error(f"Couldn't send transaction: {error}")
+                # Nothing was pushed if linking the transaction failed
+                error_class = classify_exception(error) if transaction_id else "network"
+                results = [("None", False)] * len(actions)
+            else:
+                error_class = classify_push_error(resp)
+                results = self._parse_push_response(resp, len(actions))
+            if error_class is None:
+                self.rate_controller.record_success(self._cpu_usage(resp))
+                return results
+            self.rate_controller.record_failure(error_class)
+            if self._may_be_pushed(error_class):
+                return await self._settle_pushed(transaction_id, len(actions))
+            wait_time = self.rate_controller.next_retry(retries, error_class)
+            if wait_time is None:
+                logger.error(
+                    f"No retries left for '{error_class}' errors. Giving up..."
+                )
+                return results
+            if error_class == "expired":
+                self.net.invalidate_chain_info()
+            self.metrics.retry("send", error_class)
+            logger.warning(
+                f"Transaction failed with '{error_class}' error. Will retry in {wait_time} seconds..."
+            )
+            await asyncio.sleep(wait_time)
+
+    async def _settle_pushed(self, transaction_id: str, actions_count: int) -> list:
+        logger.warning(
+            f"Transaction {transaction_id} may have been pushed. Waiting for it in the account history..."
+        )
+        future = self.confirmations.track(transaction_id)
+        # Waited without awaiting the result, so cancellation of the future isn't taken for cancellation of the task
+        await asyncio.wait([asyncio.wrap_future(future)])
+        try:
+            confirmation = future.result()
+        except TimeoutError as error:
+            logger.error(error)
+            return [("None", False)] * actions_count
+        except CancelledError:
+            # The tracker was closed before the transaction was found
+            logger.error(f"Transaction {transaction_id} wasn't confirmed")
+            return [("None", False)] * actions_count
+        self.rate_controller.record_success()
+        return self._confirmed_results(confirmation, actions_count)
+
+    async def _refresh_resources(self):
+        if not self.rate_controller.resources_stale():
+            return
+        try:
+            account = await self._post_to_chain(
+                "/v1/chain/get_account", {"account_name": self.collection_wallet}
+            )
+        except exc.ConnectionError as error:
+            logger.warning(
+                f"Couldn't get resources of '{self.collection_wallet}': {error}"
+            )
+            account = None
+        self.rate_controller.observe_account(account)
+
+    async def send_or_mint_assets(
+        self,
+        schema_template_list: Iterable[Tuple[str, str]],
+        wallet: str,
+        memo: str = "",
+        batch_size: int = 1,
+    ) -> list:
+        """
+        :param schema_template_list: list or tuple of tuples containing schema names and template IDs
+         e.g. [("rawmaterials", "318738"), ("magmaterials", "416529")]
+        :param wallet: recipient wallet
+        :param memo: transaction memo
+        :param batch_size: how many mintasset actions to pack into one transaction, same as in mint_assets()
+        :return: tuple of list with asset IDs / id-schema-template tuples + hash of successful transaction or False
+        """
+        self._validate_order(schema_template_list, wallet)
+        schemas_templates_quantities = self._collapse_identical_schemas_templates(
+            schema_template_list
+        )
+        logger.info(
+            f"*** Requested to send {schemas_templates_quantities} to the wallet '{wallet}'"
+        )
+        if self.inventory is not None:
+            await self._refresh_inventory(
+                schema_template[1]
+                for schema_template, _ in schemas_templates_quantities
+            )
+            find_assets = partial(self.inventory.reserve, refresh=False)
+        else:
+            assets_index = self._index_assets_by_template(
+                await self._get_available_assets_for(schemas_templates_quantities)
+            )
+            find_assets = partial(self._find_assets_with_highest_mints, assets_index)
+
+        assets_to_send = []
+        successful_tx = []
+        try:
+            for schema_template, quantity in schemas_templates_quantities:
+                schema = schema_template[0]
+                template = schema_template[1]
+                logger.info(
+                    f"Searching in stock for {quantity} asset(s) with template '{template}'"
+                )
+                found_assets, need_to_mint = find_assets(template, quantity)
+                if found_assets:
+                    assets_to_send.extend(found_assets)
+                if need_to_mint > 0:
+                    successful_tx += await self.mint_assets(
+                        schema, template, wallet, need_to_mint, batch_size
+                    )
+            if assets_to_send:
+                successful_tx.append(
+                    await self.send_assets(assets_to_send, wallet, memo)
+                )
+        except BaseException:
+            if self.inventory is not None:
+                self.inventory.release(assets_to_send)
+            raise
+        return successful_tx
+
+    async def dispatch_many(
+        self,
+        orders: Iterable[Tuple[str, Iterable[Tuple[str, str]], str]],
+        batch_size: int = MAX_ACTIONS_PER_TRANSACTION,
+    ) -> list:
+        """
+        Sends or mints assets for many recipients at once. Available assets are requested once for all orders,
+        and transfer and mint actions of different orders are packed into as few transactions as possible.
+        :param orders: list of (recipient wallet, schema-template list, memo) tuples.
+                E.g. [("recipient.wam", [("rawmaterials", "318738")], "Season reward")]
+        :param batch_size: maximum number of actions per transaction. Capped by max_actions_per_transaction
+                and the transaction CPU/size budget.
+        :return: list with the result of send_or_mint_assets() for every order, in the same order
+        """
+        orders, orders_quantities, total_quantities = self._prepare_orders(orders)
+        if self.inventory is not None:
+            await self._refresh_inventory(
+                schema_template[1] for schema_template in total_quantities
+            )
+            find_assets = partial(self.inventory.reserve, refresh=False)
+        else:
+            assets_index = self._index_assets_by_template(
+                await self._get_available_assets_for(total_quantities.items())
+            )
+            find_assets = partial(self._find_assets_with_highest_mints, assets_index)
+
+        results = [[] for _ in orders]
+        mints = []
+        transfers = []
+        settled_mints = settled = 0
+        try:
+            # Templates are loaded with blocking requests, so the orders are planned in a thread
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._plan_orders,
+                orders,
+                orders_quantities,
+                find_assets,
+                results,
+                mints,
+                transfers,
+            )
+            for batch in self._pack_actions(mints, batch_size):
+                self._settle_mint_batch(
+                    batch, await self._send_packed_actions(batch), results
+                )
+                settled_mints += len(batch)
+                if not self.unique_transactions:
+                    await asyncio.sleep(DUPLICATE_TRANSACTION_DELAY)
+
+            for batch in self._pack_actions(transfers, batch_size):
+                batch_results = await self._send_packed_actions(batch)
+                logger.info(f"Sent assets of {len(batch)} order(s) in one transaction")
+                for (order_number, assets_to_send, _), (
+                    asset_ids,
+                    tx_return_status,
+                ) in zip(batch, batch_results):
+                    results[order_number].append(
+                        self._settle_transfer(
+                            assets_to_send,
+                            orders[order_number][0],
+                            asset_ids,
+                            tx_return_status,
+                        )
+                    )
+                    settled += 1
+        except BaseException:
+            self._release_unsent(mints[settled_mints:], transfers[settled:])
+            raise
+        return results
+
+    async def _send_packed_actions(self, batch: list) -> list:
+        return await self._send_with_retries([item[-1] for item in batch])
+
+    async def send_assets(
+        self,
+        assets_to_send: Iterable[any],
+        wallet: str,
+        memo: str = "",
+    ) -> tuple:
+        """
+        Sends assets with given IDs to the provided wallet with provided memo.
+        :param assets_to_send: must be an iterable type. E.g. ('1099788246105', )
+        :param wallet: blockchain wallet
+        :param memo: optional field for memo of the transaction
+        :return: tuple of list with asset IDs + hash of successful transaction or False
+        """
+        logger.info(
+            f"Going to send following assets: {assets_to_send} to the wallet '{wallet}'"
+        )
+        asset_ids, tx_return_status = (
+            await self._send_with_retries(
+                [
+                    self._prepare_transfer_transaction(
+                        assets_to_send, wallet, self.collection_wallet, memo
+                    )
+                ]
+            )
+        )[0]
+        return self._settle_transfer(
+            assets_to_send, wallet, asset_ids, tx_return_status
+        )
+
+    async def mint_assets(
+        self,
+        schema: str,
+        template: str,
+        wallet: str,
+        quantity: int = 1,
+        batch_size: int = 1,
+    ) -> list:
+        """
+        Mints given number of assets with given schema and template. Transactions are paced and failed ones
+        are retried by the rate controller. Asset ID is taken from the logmint trace
+        of the transaction and is 'None' if the blockchain node didn't return it.
+        :param schema: self-explanatory
+        :param template: self-explanatory
+        :param wallet: recipient wallet
+        :param quantity: how many assets of the same template needs to be minted
+        :param batch_size: how many mintasset actions to pack into one transaction. Capped by
+                max_actions_per_transaction and the transaction CPU/size budget.
+        :return: list of id-schema-template tuples + hashes of successful transactions or False
+        """
+        logger.info(
+            f"Going to mint {quantity} assets with template '{template}', schema '{schema}' to the wallet '{wallet}'"
+        )
+        # Templates are loaded with blocking requests, so the check runs in a thread
+        allowed_quantity = await asyncio.get_running_loop().run_in_executor(
+            None, self._reserve_mints, schema, template, quantity
+        )
+        rejected = self._reject_mints(schema, template, quantity - allowed_quantity)
+        quantity = allowed_quantity
+        minted_quantity = 0
+        txs = []
+        try:
+            action = self._prepare_mint_transaction(
+                self.collection_wallet,
+                self.collection,
+                schema,
+                template,
+                wallet,
+            )
+            cpu_cost, _ = self._estimate_action_cost(action)
+            while minted_quantity < quantity:
+                actions_in_batch = min(
+                    self.rate_controller.batch_size(
+                        self._cap_batch_size(action, batch_size), cpu_cost
+                    ),
+                    quantity - minted_quantity,
+                )
+                results = await self._send_with_retries([action] * actions_in_batch)
+                # Mints which the node didn't return results for are counted as failed
+                results += [("None", False)] * (actions_in_batch - len(results))
+                txs += self._collect_mint_results(results, schema, template)
+                minted_quantity += actions_in_batch
+                if not self.unique_transactions:
+                    # Sleep in order to get rid of "duplicate transaction" error
+                    await asyncio.sleep(DUPLICATE_TRANSACTION_DELAY)
+        except BaseException:
+            # Supply of mints which weren't sent is given back along with the failed ones
+            self._release_mints(template, quantity - len(txs))
+            raise
+        finally:
+            self._release_failed_mints(template, txs)
+        return txs + rejected
+
+    async def mint_assets_and_get_ids(
+        self,
+        schema: str,
+        template: str,
+        wallet: str,
+        quantity: int = 1,
+        batch_size: int = 1,
+    ) -> list:
+        """
+        Same as mint_asset() but makes sure the real ID of every minted asset is known. IDs which are missing
+        in the transaction traces are found in the account history, which is polled for all transactions at once.
+        :param schema: self-explanatory
+        :param template: self-explanatory
+        :param wallet: recipient wallet
+        :param quantity: how many assets of the same template needs to be minted
+        :param batch_size: how many mintasset actions to pack into one transaction, same as in mint_assets()
+        :return: list of id-schema-template tuples + hashes of successful transactions or False
+        """
+        output_list = await self.mint_assets(
+            schema, template, wallet, quantity, batch_size
+        )
+        new_output_list = list(output_list)
+        pending = self._pending_minted_assets(output_list)
+        if pending:
+            logger.info(
+                "Minting finished. Now gonna wait for confirmation of transactions."
+            )
+            futures = self.confirmations.track_many(
+                (asset[1] for asset in pending.values()), recipient=wallet
+            )
+            with self.metrics.timer("confirm"):
+                await asyncio.wait(
+                    [asyncio.wrap_future(future) for future in futures.values()]
+                )
+            confirmed_ids = {
+                tx_id: self._confirmed_asset_ids(future)
+                for tx_id, future in futures.items()
+            }
+            self._apply_confirmed_ids(new_output_list, pending, confirmed_ids)
+        if pending:
+            # Transactions whose logmint actions aren't in the account history are requested one by one
+            found_ids = await asyncio.gather(
+                *(self._try_get_right_asset_id(asset[1]) for asset in pending.values())
+            )
+            for asset_number, asset_id in zip(list(pending), found_ids):
+                if not asset_id:
+                    continue
+                asset = pending.pop(asset_number)
+                new_output_list[asset_number] = (
+                    (asset_id, asset[0][1], asset[0][2]),
+                    asset[1],
+                )
+        if pending:
+            raise ValueError("Couldn't fetch ID! Blockchain is too slow!")
+        return new_output_list
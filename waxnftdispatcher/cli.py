@@ -0,0 +1,267 @@
+"""
+Command line interface of waxNFTdispatcher.
+
+    PRIVATE_KEY=... waxnftdispatcher dispatch orders.jsonl --collection pixeltycoons --wallet mywallet.wam
+
+Orders are read one by one, so files of any size are processed with bounded memory. Every line of JSONL is an
+object like {"wallet": "recipient.wam", "assets": [["rawmaterials", "318738"]], "memo": ""}, or with "schema",
+"template" and "quantity" instead of "assets". CSV needs a header with the columns wallet, schema, template
+and optionally quantity and memo.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Tuple, Union
+
+from loguru import logger
+
+from .inventory import INVENTORY_TTL
+from .waxNFTdispatcher import AssetSender
+
+PRIVATE_KEY_ENV = "PRIVATE_KEY"
+WORKERS = 4
+# How many orders per worker may be read before the result of the oldest one is written
+READ_AHEAD = 4
+INPUT_FORMATS = ("jsonl", "csv")
+
+
+RawOrder = Union[str, dict, csv.Error]
+
+
+def read_orders(path: str, input_format: str) -> Iterator[Tuple[int, RawOrder]]:
+    """
+    Orders are parsed later, so a malformed one fails alone instead of the whole run
+    :param path: file with orders
+    :param input_format: "jsonl" or "csv"
+    :return: generator of line numbers and raw orders: lines of JSONL, rows of CSV or errors of malformed rows
+    """
+    with open(path, newline="") as file:
+        if input_format == "csv":
+            reader = csv.DictReader(file)
+            while True:
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as error:
+                    record = error
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, line
+
+
+def parse_order(raw: RawOrder) -> Tuple[str, list, str]:
+    """
+    :param raw: raw order from read_orders()
+    :return: recipient wallet, list of schema-template tuples, memo
+    """
+    if isinstance(raw, csv.Error):
+        raise raw
+    record = json.loads(raw) if isinstance(raw, str) else raw
+    if not isinstance(record, dict):
+        raise ValueError("Order must be an object!")
+    wallet = record.get("wallet")
+    if not wallet:
+        raise ValueError("The wallet can't be empty!")
+    if record.get("assets"):
+        assets = [tuple(asset) for asset in record["assets"]]
+    elif record.get("schema") and record.get("template"):
+        assets = [(record["schema"], str(record["template"]))] * int(
+            record.get("quantity") or 1
+        )
+    else:
+        raise ValueError("Order has neither assets nor schema and template!")
+    return wallet, assets, record.get("memo") or ""
+
+
+def completed_line(path: str) -> int:
+    """
+    Finds where a previous run stopped. A partially written last line is cut off.
+    :param path: output file of the previous run
+    :return: line number of the last order which has a result, 0 if there are none
+    """
+    if not os.path.exists(path):
+        return 0
+    last_line = 0
+    complete_size = 0
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                last_line = json.loads(line)["line"]
+            except (ValueError, KeyError):
+                break
+            complete_size += len(line)
+    with open(path, "r+b") as file:
+        file.truncate(complete_size)
+    return last_line
+
+
+def dispatch_order(sender: AssetSender, line_number: int, raw: RawOrder) -> dict:
+    """
+    :return: result of the order as it's written to the output file
+    """
+    try:
+        wallet, assets, memo = parse_order(raw)
+        results = sender.send_or_mint_assets(assets, wallet, memo)
+    except Exception as error:
+        logger.error(f"Order on line {line_number} failed: {error!r}")
+        return {"line": line_number, "ok": False, "error": repr(error)}
+    return {
+        "line": line_number,
+        "ok": all(tx_id for _, tx_id in results),
+        "wallet": wallet,
+        "results": results,
+    }
+
+
+def dispatch(
+    sender: AssetSender,
+    orders: Iterator[Tuple[int, RawOrder]],
+    output,
+    workers: int = WORKERS,
+    start_after: int = 0,
+) -> dict:
+    """
+    Dispatches orders concurrently and writes their results in the order of the input. If the run is interrupted,
+    results of the orders already being dispatched are still written, so --resume doesn't send them again.
+    :param sender: self-explanatory
+    :param orders: result of read_orders()
+    :param output: text file the results are written to as JSON lines
+    :param workers: how many orders are dispatched at the same time
+    :param start_after: line number of the last order dispatched by a previous run
+    :return: statistics of the run
+    """
+    stats = {"orders": 0, "failed": 0, "skipped": 0}
+    in_flight = deque()
+
+    def write_oldest():
+        # Removed only when written, so it isn't lost if waiting is interrupted
+        result = in_flight[0].result()
+        in_flight.popleft()
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        stats["orders"] += 1
+        stats["failed"] += not result["ok"]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for line_number, raw in orders:
+                if line_number <= start_after:
+                    stats["skipped"] += 1
+                    continue
+                in_flight.append(
+                    executor.submit(dispatch_order, sender, line_number, raw)
+                )
+                if len(in_flight) >= workers * READ_AHEAD:
+                    write_oldest()
+        except BaseException:
+            # Orders which haven't started yet are dispatched by the next run with --resume
+            for future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            while in_flight and not in_flight[0].cancelled():
+                write_oldest()
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="waxnftdispatcher", description=__doc__.strip().splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    dispatch_parser = commands.add_parser(
+        "dispatch",
+        help="send or mint assets for every order of a JSONL or CSV file",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    dispatch_parser.add_argument("input", help="JSONL or CSV file with orders")
+    dispatch_parser.add_argument(
+        "-o",
+        "--output",
+        help="JSONL file the results are written to. <input>.results.jsonl by default",
+    )
+    dispatch_parser.add_argument(
+        "--format", choices=INPUT_FORMATS, help="guessed from the file name by default"
+    )
+    dispatch_parser.add_argument("--collection", required=True)
+    dispatch_parser.add_argument(
+        "--wallet", required=True, help="wallet which holds the assets"
+    )
+    dispatch_parser.add_argument(
+        "--private-key-env",
+        default=PRIVATE_KEY_ENV,
+        help="environment variable with the private key of the wallet",
+    )
+    dispatch_parser.add_argument("--testnet", action="store_true")
+    dispatch_parser.add_argument(
+        "--api-endpoint", action="append", help="can be repeated"
+    )
+    dispatch_parser.add_argument(
+        "--history-endpoint", action="append", help="can be repeated"
+    )
+    dispatch_parser.add_argument(
+        "--push-endpoint", action="append", help="can be repeated"
+    )
+    dispatch_parser.add_argument("--workers", type=int, default=WORKERS)
+    dispatch_parser.add_argument("--inventory-ttl", type=float, default=INVENTORY_TTL)
+    dispatch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip orders which already have a result in the output file",
+    )
+    dispatch_parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="ERROR")
+    private_key = os.environ.get(args.private_key_env)
+    if not private_key:
+        sys.exit(f"Set the private key in the {args.private_key_env} variable")
+    input_format = args.format or (
+        "csv" if args.input.lower().endswith(".csv") else "jsonl"
+    )
+    output_path = args.output or f"{args.input}.results.jsonl"
+    start_after = completed_line(output_path) if args.resume else 0
+    started = time.perf_counter()
+    # Concurrent orders must not pick the same assets, so they are reserved in the inventory cache
+    with AssetSender(
+        args.collection,
+        args.wallet,
+        private_key,
+        testnet=args.testnet,
+        use_inventory_cache=True,
+        inventory_ttl=args.inventory_ttl,
+        api_endpoints=args.api_endpoint,
+        history_endpoints=args.history_endpoint,
+        push_endpoints=args.push_endpoint,
+    ) as sender, open(output_path, "a" if args.resume else "w") as output:
+        stats = dispatch(
+            sender,
+            read_orders(args.input, input_format),
+            output,
+            workers=args.workers,
+            start_after=start_after,
+        )
+    print(
+        f"Dispatched {stats['orders']} orders ({stats['failed']} failed, "
+        f"{stats['skipped']} skipped) in {time.perf_counter() - started:.1f} seconds. "
+        f"Results: {output_path}",
+        file=sys.stderr,
+    )
+    return 1 if stats["failed"] else 0
@@ -0,0 +1,333 @@
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+import requests
+from loguru import logger
+
+from .endpoints import EndpointPool
+
+ACTIONS_PATH = "/v2/history/get_actions"
+# Actions of the wallet itself, e.g. mintasset and transfer
+ACCOUNT_ACTIONS_FILTER = "atomicassets:*"
+# logmint is executed by atomicassets and only the owner of the new asset is notified of it, not the minter
+LOGMINT_FILTER = "atomicassets:logmint"
+# Seconds between requests of the account history
+POLL_INTERVAL = 1.0
+# Seconds after which a transaction not found in the history is considered lost
+CONFIRMATION_TIMEOUT = 30
+# Seconds after inclusion within which the block of the transaction should become irreversible
+IRREVERSIBLE_TIMEOUT = 300
+# How many seconds before the head block the history is read from when an account is queried for the first time
+LOOKBACK_SECONDS = 60
+# WAX makes a block every half a second
+BLOCK_INTERVAL = 0.5
+ACTIONS_PAGE_LIMIT = 1000
+REQUEST_TIMEOUT = 30
+
+
+def shift_timestamp(timestamp: str, seconds: float) -> str:
+    """
+    :param timestamp: time of a block in UTC as the history API and nodes return it, e.g. "2023-01-01T00:00:00.000"
+    :param seconds: how many seconds to add. Negative to subtract.
+    :return: timestamp in the same format
+    """
+    shifted = datetime.fromisoformat(timestamp.rstrip("Z")) + timedelta(seconds=seconds)
+    return shifted.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+class Confirmation:
+    def __init__(self, transaction_id: str, block_num: int):
+        """
+        Transaction found in the account history
+        :param transaction_id: self-explanatory
+        :param block_num: block which includes the transaction
+        """
+        self.transaction_id = transaction_id
+        self.block_num = block_num
+        # IDs of minted or transferred assets in the order of actions
+        self.asset_ids = []
+        self.irreversible = False
+        self._global_sequences = set()
+
+    def add_action(self, action: dict):
+        """
+        :param action: action of the transaction from the history API
+        """
+        sequence = action.get("global_sequence")
+        if sequence is not None:
+            if sequence in self._global_sequences:
+                return
+            self._global_sequences.add(sequence)
+        data = action.get("act", {}).get("data") or {}
+        if action.get("act", {}).get("name") == "logmint" and "asset_id" in data:
+            self.asset_ids.append(str(data["asset_id"]))
+
+
+class ConfirmationTracker:
+    def __init__(
+        self,
+        account: str,
+        history_endpoints: EndpointPool,
+        net,
+        poll_interval: float = POLL_INTERVAL,
+        timeout: float = CONFIRMATION_TIMEOUT,
+        irreversible_timeout: float = IRREVERSIBLE_TIMEOUT,
+        page_limit: int = ACTIONS_PAGE_LIMIT,
+    ):
+        """
+        Confirms many transactions of one account with one request of the account history per poll_interval
+        instead of requesting every transaction. IDs of minted assets are read from logmint actions in the history
+        of their recipients. Polling runs in a background thread while there are unconfirmed transactions.
+        Only documented parameters of Hyperion get_actions are used: account, filter, after (ISO 8601), sort,
+        skip and limit.
+        :param account: wallet which sends the transactions
+        :param history_endpoints: pool of history API (Hyperion) endpoints
+        :param net: pyntelope network used to get the head and last irreversible block
+        :param poll_interval: seconds between requests of the account history
+        :param timeout: seconds after which futures of transactions not found in the history fail with TimeoutError
+        :param irreversible_timeout: seconds after inclusion within which the block should become irreversible
+        :param page_limit: how many actions are requested at once
+        """
+        self.account = account
+        self.history_endpoints = history_endpoints
+        self.net = net
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.irreversible_timeout = irreversible_timeout
+        self.page_limit = page_limit
+        self.session = requests.Session()
+        # transaction ID -> [deadline, future resolved on inclusion, future resolved on irreversibility, recipient]
+        self._pending = {}
+        # Included transactions which aren't irreversible yet
+        self._included = {}
+        # (account, filter) -> timestamp after which its history is read
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._closed = False
+        self._stopped = threading.Event()
+
+    def track(
+        self,
+        transaction_id: str,
+        irreversible: bool = False,
+        recipient: Optional[str] = None,
+    ) -> Future:
+        """
+        :param transaction_id: ID of the pushed transaction
+        :param irreversible: if True, the future is resolved when the block of the transaction is irreversible
+        :param recipient: wallet which gets the assets minted by the transaction. Their IDs are known only
+                if it's given or it's the account itself.
+        :return: future with Confirmation. Fails with TimeoutError if the transaction isn't found in time.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Confirmation tracker is closed!")
+            tracked = self._pending.get(transaction_id)
+            if tracked is None:
+                tracked = [time.monotonic() + self.timeout, Future(), Future(), None]
+                self._pending[transaction_id] = tracked
+            if recipient is not None and recipient != self.account:
+                tracked[3] = recipient
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="confirmation-tracker", daemon=True
+                )
+                self._thread.start()
+            self._wakeup.notify()
+        return tracked[2] if irreversible else tracked[1]
+
+    def track_many(
+        self,
+        transaction_ids: Iterable[str],
+        irreversible: bool = False,
+        recipient: Optional[str] = None,
+    ) -> Dict[str, Future]:
+        """
+        :param transaction_ids: IDs of pushed transactions
+        :param irreversible: same as in track()
+        :param recipient: same as in track()
+        :return: dictionary of transaction IDs and their futures
+        """
+        return {
+            transaction_id: self.track(transaction_id, irreversible, recipient)
+            for transaction_id in dict.fromkeys(transaction_ids)
+        }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._stopped.set()
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.session.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    pending = list(self._pending.values())
+                    self._pending.clear()
+                    break
+            started = time.monotonic()
+            try:
+                self._poll()
+            except Exception as error:
+                logger.warning(f"Couldn't poll history of '{self.account}': {error}")
+            self._expire()
+            self._stopped.wait(
+                max(self.poll_interval - (time.monotonic() - started), 0)
+            )
+        for _, included, final, _ in pending:
+            for future in (included, final):
+                if not future.done():
+                    future.cancel()
+
+    def _get_actions(self, params: dict) -> dict:
+        def send(base_url: str) -> dict:
+            response = self.session.get(
+                f"{base_url}{ACTIONS_PATH}", params=params, timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self.history_endpoints.request(send)
+
+    def _poll(self):
+        """
+        Reads the history of the account and of the recipients of awaited mints after their cursors
+        and resolves futures of found transactions
+        """
+        with self._lock:
+            recipients = {tracked[3] for tracked in self._pending.values()}
+        queries = [(self.account, ACCOUNT_ACTIONS_FILTER)] + [
+            (recipient, LOGMINT_FILTER) for recipient in recipients if recipient
+        ]
+        # Recipients which aren't awaited anymore aren't read
+        self._cursors = {query: self._cursors.get(query) for query in queries}
+        last_irreversible_block = None
+        for account, actions_filter in queries:
+            last_irreversible_block = self._read_history(account, actions_filter)
+        self._resolve()
+        if last_irreversible_block is None:
+            last_irreversible_block = self.net.get_info()["last_irreversible_block_num"]
+        self._finalize(int(last_irreversible_block))
+
+    def _read_history(self, account: str, actions_filter: str) -> Optional[int]:
+        """
+        Collects actions of awaited transactions from the history of the account after its cursor
+        :param account: matches actions which the account authorized or was notified of
+        :param actions_filter: e.g. "atomicassets:logmint"
+        :return: last irreversible block if the history API returned it
+        """
+        query = (account, actions_filter)
+        if self._cursors[query] is None:
+            self._cursors[query] = shift_timestamp(
+                self.net.get_info()["head_block_time"], -LOOKBACK_SECONDS
+            )
+        skip = 0
+        last_timestamp = None
+        last_irreversible_block = None
+        while True:
+            response = self._get_actions(
+                {
+                    "account": account,
+                    "filter": actions_filter,
+                    "after": self._cursors[query],
+                    "sort": "asc",
+                    "limit": self.page_limit,
+                    "skip": skip,
+                }
+            )
+            actions = response.get("actions", [])
+            last_irreversible_block = response.get("lib", last_irreversible_block)
+            if actions:
+                last_timestamp = actions[-1]["@timestamp"]
+            self._process(actions)
+            if len(actions) < self.page_limit:
+                break
+            skip += len(actions)
+        if last_timestamp is not None:
+            # The last block is read again, in case not all of its actions were indexed yet
+            self._cursors[query] = max(
+                self._cursors[query], shift_timestamp(last_timestamp, -BLOCK_INTERVAL)
+            )
+        return last_irreversible_block
+
+    def _process(self, actions: list):
+        """
+        :param actions: actions from the history API sorted by block
+        """
+        with self._lock:
+            for action in actions:
+                transaction_id = action.get("trx_id")
+                block_num = int(action.get("block_num", 0))
+                tracked = self._pending.get(transaction_id)
+                if tracked is None:
+                    continue
+                confirmation = self._included.get(transaction_id)
+                if confirmation is None:
+                    confirmation = Confirmation(transaction_id, block_num)
+                    self._included[transaction_id] = confirmation
+                confirmation.add_action(action)
+
+    def _resolve(self):
+        """
+        Resolves futures of included transactions when actions of all queries are collected
+        """
+        with self._lock:
+            deadline = time.monotonic() + self.irreversible_timeout
+            for transaction_id, confirmation in self._included.items():
+                tracked = self._pending[transaction_id]
+                if not tracked[1].done():
+                    logger.debug(
+                        f"Transaction {transaction_id} is in block {confirmation.block_num}"
+                    )
+                    tracked[0] = deadline
+                    tracked[1].set_result(confirmation)
+
+    def _finalize(self, last_irreversible_block: int):
+        """
+        :param last_irreversible_block: number of the last irreversible block
+        """
+        with self._lock:
+            for transaction_id, confirmation in list(self._included.items()):
+                if confirmation.block_num > last_irreversible_block:
+                    continue
+                confirmation.irreversible = True
+                final = self._pending.pop(transaction_id)[2]
+                del self._included[transaction_id]
+                final.set_result(confirmation)
+
+    def _expire(self):
+        """
+        Fails futures of transactions which weren't found in time
+        """
+        now = time.monotonic()
+        with self._lock:
+            for transaction_id, (deadline, included, final, _) in list(
+                self._pending.items()
+            ):
+                if deadline > now:
+                    continue
+                if included.done():
+                    error = TimeoutError(
+                        f"Block of transaction {transaction_id} didn't become irreversible"
+                    )
+                else:
+                    error = TimeoutError(
+                        f"Transaction {transaction_id} wasn't found in the history"
+                    )
+                if not included.done():
+                    included.set_exception(error)
+                if not final.done():
+                    final.set_exception(error)
+                self._pending.pop(transaction_id)
+                self._included.pop(transaction_id, None)
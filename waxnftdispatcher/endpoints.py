@@ -0,0 +1,265 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+from loguru import logger
+
+# How many last requests are used to calculate latency and error rate of an endpoint
+LATENCY_WINDOW = 50
+# Endpoint is suspended when more requests in the window failed
+MAX_ERROR_RATE = 0.5
+# Seconds after which a suspended endpoint is tried again
+SUSPEND_SECONDS = 30
+# Minimal number of requests in the window to judge latency or error rate of an endpoint
+MIN_SAMPLES = 5
+
+T = TypeVar("T")
+
+
+class EndpointStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Rolling latency and errors of one endpoint
+        :param window: how many last requests are kept
+        """
+        self.latencies = deque(maxlen=window)
+        self.errors = deque(maxlen=window)
+        self.suspended_until = 0.0
+
+    def error_rate(self) -> float:
+        if not self.errors:
+            return 0.0
+        return sum(self.errors) / len(self.errors)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        :param percent: e.g. 0.95
+        :return: latency in seconds or None if there were no successful requests
+        """
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[int(percent * (len(latencies) - 1))]
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": len(self.errors),
+            "error_rate": round(self.error_rate(), 3),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "suspended": self.suspended_until > time.monotonic(),
+        }
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        urls: Iterable[str],
+        window: int = LATENCY_WINDOW,
+        max_error_rate: float = MAX_ERROR_RATE,
+        suspend_seconds: float = SUSPEND_SECONDS,
+    ):
+        """
+        Several endpoints of the same API. Requests go to the fastest healthy endpoint,
+        and to the next one if it fails.
+        :param urls: base URLs of the endpoints, e.g. ["https://wax.eosusa.io"]
+        :param window: how many last requests are used to calculate latency and error rate
+        :param max_error_rate: endpoint is suspended when more requests in the window failed
+        :param suspend_seconds: seconds after which a suspended endpoint is tried again
+        """
+        self.urls = list(dict.fromkeys(url.rstrip("/") for url in urls))
+        if not self.urls:
+            raise ValueError("At least one endpoint is needed!")
+        self.max_error_rate = max_error_rate
+        self.suspend_seconds = suspend_seconds
+        self.stats = {url: EndpointStats(window) for url in self.urls}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def primary(self) -> str:
+        return self.urls[0]
+
+    def ranked(self) -> list:
+        """
+        :return: endpoints ordered from the fastest healthy one. Endpoints which fail more often go after
+                 the ones which fail less, whatever their latency. Suspended endpoints are the last.
+                 Endpoints without any requests yet go first, so they get measured.
+        """
+        now = time.monotonic()
+        with self._lock:
+
+            def rank(url: str):
+                stats = self.stats[url]
+                return (
+                    stats.suspended_until > now,
+                    stats.error_rate(),
+                    stats.percentile(0.5) or 0.0,
+                    self.urls.index(url),
+                )
+
+            return sorted(self.urls, key=rank)
+
+    def record(self, url: str, latency: float, success: bool):
+        """
+        :param url: base URL of the endpoint
+        :param latency: seconds the request took
+        :param success: False if the request failed
+        """
+        with self._lock:
+            stats = self.stats[url]
+            stats.errors.append(not success)
+            if success:
+                stats.latencies.append(latency)
+            elif (
+                len(stats.errors) >= MIN_SAMPLES
+                and stats.error_rate() > self.max_error_rate
+            ):
+                logger.warning(
+                    f"Endpoint {url} fails too often. Suspending it for {self.suspend_seconds} seconds."
+                )
+                stats.suspended_until = time.monotonic() + self.suspend_seconds
+                stats.errors.clear()
+
+    def hedge_delay(self, url: str) -> Optional[float]:
+        """
+        :param url: base URL of the endpoint
+        :return: p95 latency of the endpoint or None if there are not enough requests to know it
+        """
+        with self._lock:
+            stats = self.stats[url]
+            if len(stats.latencies) < MIN_SAMPLES:
+                return None
+            return stats.percentile(0.95)
+
+    def _timed(self, url: str, send: Callable[[str], T]) -> T:
+        started = time.monotonic()
+        try:
+            result = send(url)
+        except Exception:
+            self.record(url, time.monotonic() - started, False)
+            raise
+        self.record(url, time.monotonic() - started, True)
+        return result
+
+    def request(self, send: Callable[[str], T], hedge: bool = False) -> T:
+        """
+        Sends request to the fastest healthy endpoint and fails over to the next ones.
+        :param send: callable which gets base URL, makes the request and raises if the endpoint failed
+        :param hedge: if True, the same request is also sent to the second endpoint when the first one
+                is slower than its p95 latency. Only for idempotent requests.
+        :return: result of send()
+        """
+        ranked = self.ranked()
+        tried = 0
+        last_error = None
+        if hedge and len(ranked) > 1 and self.hedge_delay(ranked[0]) is not None:
+            tried = 2
+            try:
+                return self._hedged(send, ranked[0], ranked[1])
+            except Exception as error:
+                last_error = error
+        for url in ranked[tried:]:
+            try:
+                return self._timed(url, send)
+            except Exception as error:
+                logger.warning(f"Request to {url} failed: {error}")
+                last_error = error
+        raise last_error
+
+    def _hedged(self, send: Callable[[str], T], first_url: str, second_url: str) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="hedged-request")
+        futures = {self._executor.submit(self._timed, first_url, send)}
+        done, _ = wait(futures, timeout=self.hedge_delay(first_url))
+        if not done or next(iter(done)).exception() is not None:
+            logger.debug(
+                f"{first_url} is slow or failed. Sending hedged request to {second_url}"
+            )
+            futures.add(self._executor.submit(self._timed, second_url, send))
+        last_error = None
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+                logger.warning(f"Hedged request failed: {last_error}")
+        raise last_error
+
+    async def _timed_async(self, url: str, send: Callable[[str], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        try:
+            result = await send(url)
+        except Exception:
+            self.record(url, time.monotonic() - started, False)
+            raise
+        self.record(url, time.monotonic() - started, True)
+        return result
+
+    async def request_async(
+        self, send: Callable[[str], Awaitable[T]], hedge: bool = False
+    ) -> T:
+        """
+        Same as request() but for coroutines
+        :param send: coroutine function which gets base URL, makes the request and raises if the endpoint failed
+        :param hedge: if True, the same request is also sent to the second endpoint when the first one
+                is slower than its p95 latency. Only for idempotent requests.
+        :return: result of send()
+        """
+        ranked = self.ranked()
+        tried = 0
+        last_error = None
+        if hedge and len(ranked) > 1 and self.hedge_delay(ranked[0]) is not None:
+            tried = 2
+            try:
+                return await self._hedged_async(send, ranked[0], ranked[1])
+            except Exception as error:
+                last_error = error
+        for url in ranked[tried:]:
+            try:
+                return await self._timed_async(url, send)
+            except Exception as error:
+                logger.warning(f"Request to {url} failed: {error}")
+                last_error = error
+        raise last_error
+
+    async def _hedged_async(
+        self, send: Callable[[str], Awaitable[T]], first_url: str, second_url: str
+    ) -> T:
+        tasks = {asyncio.ensure_future(self._timed_async(first_url, send))}
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(first_url))
+        if not done or next(iter(done)).exception() is not None:
+            logger.debug(
+                f"{first_url} is slow or failed. Sending hedged request to {second_url}"
+            )
+            tasks.add(asyncio.ensure_future(self._timed_async(second_url, send)))
+        last_error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    # The slower request still finishes to record its latency
+                    for pending in tasks:
+                        pending.add_done_callback(
+                            lambda finished: finished.cancelled()
+                            or finished.exception()
+                        )
+                    return task.result()
+                last_error = task.exception()
+                logger.warning(f"Hedged request failed: {last_error}")
+        raise last_error
+
+    def report(self) -> dict:
+        """
+        :return: latency and error rate of every endpoint
+        """
+        with self._lock:
+            return {url: stats.as_dict() for url, stats in self.stats.items()}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
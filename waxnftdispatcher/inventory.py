@@ -0,0 +1,204 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, Tuple
+
+from .assets import AssetRecord
+
+from loguru import logger
+
+INVENTORY_TTL = 60
+INVENTORY_MAX_TEMPLATES = 256
+
+
+class InventoryCache:
+    def __init__(
+        self,
+        fetch_assets: Callable[[Iterable[str]], Iterable[AssetRecord]],
+        ttl: float = INVENTORY_TTL,
+        max_templates: int = INVENTORY_MAX_TEMPLATES,
+    ):
+        """
+        In-process cache of the assets available in the collection wallet, grouped by template ID.
+        Picked assets are reserved, so concurrent orders never get the same asset.
+        :param fetch_assets: callable which gets template IDs and returns AssetRecord of every asset found
+                in the collection wallet
+        :param ttl: seconds after which the assets of a template are requested again
+        :param max_templates: how many templates are kept. The least recently used are evicted first.
+        """
+        self.fetch_assets = fetch_assets
+        self.ttl = ttl
+        self.max_templates = max_templates
+        # template_id -> (time of the last refresh, deque with free asset IDs)
+        self._templates = OrderedDict()
+        # asset_id -> template_id
+        self._reserved = {}
+        # Sent assets which can still be returned by the API. asset_id -> template_id
+        self._sent = {}
+        self._lock = threading.Lock()
+
+    def _is_stale(self, template_id: str) -> bool:
+        entry = self._templates.get(template_id)
+        return entry is None or time.monotonic() - entry[0] > self.ttl
+
+    def _refresh(self, template_ids: Iterable[str]):
+        """
+        Requests assets of given templates and replaces the cached ones.
+        :param template_ids: templates to refresh
+        """
+        template_ids = list(template_ids)
+        logger.debug(f"Refreshing inventory cache for templates: {template_ids}")
+        self._store(template_ids, self.fetch_assets(template_ids))
+
+    def _store(self, template_ids: Iterable[str], assets: Iterable[AssetRecord]):
+        """
+        Replaces cached assets of given templates. Reserved and sent assets are skipped.
+        :param template_ids: refreshed templates
+        :param assets: AssetRecord of every asset found in the collection wallet
+        """
+        found = {template_id: deque() for template_id in template_ids}
+        still_indexed = set()
+        for asset in assets:
+            asset_id = asset.asset_id
+            template_id = asset.template_id
+            if asset_id in self._sent:
+                still_indexed.add(asset_id)
+            elif asset_id not in self._reserved and template_id in found:
+                found[template_id].append(asset_id)
+        # Forget sent assets which are not returned by the API anymore
+        for asset_id, template_id in list(self._sent.items()):
+            if template_id in found and asset_id not in still_indexed:
+                del self._sent[asset_id]
+
+        refreshed_at = time.monotonic()
+        for template_id, asset_ids in found.items():
+            self._templates[template_id] = (refreshed_at, asset_ids)
+            self._templates.move_to_end(template_id)
+        while len(self._templates) > self.max_templates:
+            evicted_template, _ = self._templates.popitem(last=False)
+            for asset_id, template_id in list(self._sent.items()):
+                if template_id == evicted_template:
+                    del self._sent[asset_id]
+            logger.debug(f"Evicted template '{evicted_template}' from inventory cache")
+
+    def stale_templates(self, template_ids: Iterable[str]) -> list:
+        """
+        :param template_ids: templates which are going to be reserved
+        :return: templates which are not cached or expired
+        """
+        with self._lock:
+            return [
+                template_id
+                for template_id in dict.fromkeys(template_ids)
+                if self._is_stale(template_id)
+            ]
+
+    def load(self, template_ids: Iterable[str], assets: Iterable[AssetRecord]):
+        """
+        Replaces cached assets of given templates with assets requested outside of the cache
+        :param template_ids: refreshed templates
+        :param assets: AssetRecord of every asset found in the collection wallet
+        """
+        with self._lock:
+            self._store(list(template_ids), assets)
+
+    def refresh_stale(self, template_ids: Iterable[str]):
+        """
+        Refreshes with one request all given templates which are not cached or expired
+        :param template_ids: templates which are going to be reserved
+        """
+        with self._lock:
+            stale = [
+                template_id
+                for template_id in dict.fromkeys(template_ids)
+                if self._is_stale(template_id)
+            ]
+            if stale:
+                self._refresh(stale)
+
+    def reserve(
+        self, template_id: str, quantity: int = 1, refresh: bool = True
+    ) -> Tuple[list, int]:
+        """
+        Reserves given quantity of assets with given template
+        :param template_id: self-explanatory
+        :param quantity: how many assets with given template ID must be found
+        :param refresh: if False, a stale template is not requested again
+        :return: list of reserved asset IDs, quantity needed to mint if any.
+        """
+        with self._lock:
+            if refresh and self._is_stale(template_id):
+                self._refresh([template_id])
+            free_assets = deque()
+            if template_id in self._templates:
+                self._templates.move_to_end(template_id)
+                free_assets = self._templates[template_id][1]
+            asset_ids = []
+            while free_assets and len(asset_ids) < quantity:
+                asset_id = free_assets.popleft()
+                self._reserved[asset_id] = template_id
+                asset_ids.append(asset_id)
+                logger.info(f"found asset with ID {asset_id}")
+        quantity_to_mint = quantity - len(asset_ids)
+        if quantity_to_mint:
+            logger.warning(
+                f"Not enough assets available. Have: {len(asset_ids)}; Need: {quantity}"
+            )
+        return asset_ids, quantity_to_mint
+
+    def commit(self, asset_ids: Iterable[str]):
+        """
+        Removes successfully sent assets from the cache
+        :param asset_ids: sent asset IDs
+        """
+        with self._lock:
+            for asset_id in asset_ids:
+                asset_id = str(asset_id)
+                template_id = self._reserved.pop(asset_id, None)
+                if template_id is None:
+                    # The asset was sent without reservation
+                    template_id = self._discard_free_asset(asset_id)
+                if template_id is not None:
+                    self._sent[asset_id] = template_id
+
+    def _discard_free_asset(self, asset_id: str):
+        """
+        :param asset_id: asset ID which is not reserved
+        :return: template ID of the removed asset or None if the asset wasn't cached
+        """
+        for template_id, (_, free_assets) in self._templates.items():
+            if asset_id in free_assets:
+                free_assets.remove(asset_id)
+                return template_id
+        return None
+
+    def release(self, asset_ids: Iterable[str]):
+        """
+        Returns reserved assets back to the cache, e.g. if the transfer failed
+        :param asset_ids: reserved asset IDs
+        """
+        with self._lock:
+            for asset_id in reversed(list(asset_ids)):
+                asset_id = str(asset_id)
+                template_id = self._reserved.pop(asset_id, None)
+                if template_id in self._templates:
+                    self._templates[template_id][1].appendleft(asset_id)
+
+    def invalidate(self, template_ids: Iterable[str] = None):
+        """
+        Drops cached assets, so they are requested again on the next reservation
+        :param template_ids: templates to drop. All templates if not given.
+        """
+        with self._lock:
+            if template_ids is None:
+                self._templates.clear()
+                return
+            for template_id in template_ids:
+                self._templates.pop(template_id, None)
+
+    def reserved_assets(self) -> Dict[str, str]:
+        """
+        :return: currently reserved assets. asset_id -> template_id
+        """
+        with self._lock:
+            return dict(self._reserved)
@@ -0,0 +1,195 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+
+# Upper bounds (seconds) of latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_PREFIX = "waxnftdispatcher"
+
+_DISABLED_TIMER = nullcontext()
+
+
+class MetricsHook:
+    """
+    Receives measurements of AssetSender. Subclass it and override the methods you need.
+    Stages: "get_available_assets", "get_assets_page", "build", "link", "sign", "send",
+    "confirm", "get_right_asset_id".
+    """
+
+    def observe(self, stage: str, seconds: float):
+        """
+        :param stage: name of the measured stage
+        :param seconds: how long the stage took
+        """
+
+    def failure(self, stage: str, reason: str):
+        """
+        :param stage: name of the failed stage
+        :param reason: exception class or blockchain error name, e.g. "tx_cpu_usage_exceeded"
+        """
+
+    def retry(self, stage: str, reason: str):
+        """
+        :param stage: name of the retried stage
+        :param reason: why it's retried
+        """
+
+
+class Metrics:
+    def __init__(self, hooks: Iterable[MetricsHook] = None):
+        """
+        Passes measurements to the hooks. Does nothing if there are no hooks.
+        :param hooks: list of MetricsHook objects
+        """
+        self.hooks = list(hooks or [])
+
+    def add_hook(self, hook: MetricsHook):
+        self.hooks.append(hook)
+
+    def timer(self, stage: str):
+        """
+        Measures the duration of the with-block. Exceptions are reported as failures with the exception class.
+        :param stage: name of the measured stage
+        """
+        if not self.hooks:
+            return _DISABLED_TIMER
+        return self._timer(stage)
+
+    @contextmanager
+    def _timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            self.observe(stage, time.perf_counter() - started)
+            self.failure(stage, type(error).__name__)
+            raise
+        self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float):
+        for hook in self.hooks:
+            hook.observe(stage, seconds)
+
+    def failure(self, stage: str, reason: str):
+        for hook in self.hooks:
+            hook.failure(stage, reason)
+
+    def retry(self, stage: str, reason: str):
+        for hook in self.hooks:
+            hook.retry(stage, reason)
+
+
+class InMemoryMetrics(MetricsHook):
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        """
+        Keeps latency histograms, failures and retries of every stage in memory
+        :param buckets: upper bounds of latency histogram buckets in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        # stage -> counts of observations per bucket, the last one is +Inf
+        self.histograms = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self.sums = Counter()
+        self.counts = Counter()
+        # (stage, reason) -> count
+        self.failures = Counter()
+        self.retries = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.histograms[stage][bisect_left(self.buckets, seconds)] += 1
+            self.sums[stage] += seconds
+            self.counts[stage] += 1
+
+    def failure(self, stage: str, reason: str):
+        with self._lock:
+            self.failures[(stage, reason)] += 1
+
+    def retry(self, stage: str, reason: str):
+        with self._lock:
+            self.retries[(stage, reason)] += 1
+
+    def summary(self) -> dict:
+        """
+        :return: count, total and average seconds of every stage
+        """
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "seconds": round(self.sums[stage], 6),
+                    "average": round(self.sums[stage] / count, 6),
+                }
+                for stage, count in self.counts.items()
+            }
+
+    def to_prometheus(self, prefix: str = METRICS_PREFIX) -> str:
+        """
+        :param prefix: prefix of metric names
+        :return: metrics in Prometheus text exposition format
+        """
+        lines = [
+            f"# HELP {prefix}_stage_seconds Duration of dispatching stages.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), histogram):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {self.sums[stage]}'
+                )
+                lines.append(
+                    f'{prefix}_stage_seconds_count{{stage="{stage}"}} {self.counts[stage]}'
+                )
+            for name, counter, help_text in (
+                ("failures", self.failures, "Failed dispatching stages."),
+                ("retries", self.retries, "Retried dispatching stages."),
+            ):
+                lines.append(f"# HELP {prefix}_{name}_total {help_text}")
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (stage, reason), count in sorted(counter.items()):
+                    reason = reason.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(
+                        f'{prefix}_{name}_total{{stage="{stage}",reason="{reason}"}} {count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def start_prometheus_server(
+    metrics: InMemoryMetrics, port: int, host: str = "0.0.0.0"
+) -> ThreadingHTTPServer:
+    """
+    Serves metrics in Prometheus text format on http://host:port/metrics in a background thread
+    :param metrics: InMemoryMetrics object added to AssetSender as a hook
+    :param port: self-explanatory
+    :param host: self-explanatory
+    :return: running server. Call shutdown() to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,126 @@
+import threading
+import time
+import typing
+from urllib.parse import urljoin
+
+import httpx
+import pydantic
+import pyntelope
+from pyntelope import exc
+
+from .endpoints import EndpointPool
+
+# How long the chain info used for linking transactions (TAPOS) is reused
+CHAIN_INFO_TTL = 30
+
+
+def read_node_reply(resp: httpx.Response, url: str, payload: dict) -> dict:
+    """
+    Nodes reply to rejected transactions with status 500 and the error in the body. Any other error status
+    or a body which isn't JSON comes from a proxy or a broken node.
+    :param resp: reply of the blockchain node
+    :param url: requested URL
+    :param payload: request body
+    :return: decoded reply
+    :raise exc.ConnectionError: caused by httpx.HTTPStatusError or ValueError
+    """
+    try:
+        if resp.status_code > 299 and resp.status_code != 500:
+            resp.raise_for_status()
+        return resp.json()
+    except (httpx.HTTPStatusError, ValueError) as error:
+        raise exc.ConnectionError(
+            response=resp, url=url, payload=payload, error=error
+        ) from error
+
+
+class PooledNet(pyntelope.Net):
+    """
+    pyntelope network which reuses one pool of HTTP connections for all requests
+    and caches the chain info used for linking transactions for chain_info_ttl seconds.
+    """
+
+    chain_info_ttl: float = CHAIN_INFO_TTL
+    _client: httpx.Client = pydantic.PrivateAttr(default_factory=httpx.Client)
+    # Shared between the copies pyntelope makes while linking transactions
+    _chain_info: dict = pydantic.PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    _endpoints: typing.Optional[EndpointPool] = pydantic.PrivateAttr(default=None)
+
+    def use_endpoints(self, endpoints: EndpointPool):
+        """
+        Sends requests to the fastest healthy node of the pool instead of the host
+        :param endpoints: pool of blockchain nodes
+        """
+        self._endpoints = endpoints
+
+    def _request(
+        self,
+        *,
+        endpoint: str,
+        payload: typing.Optional[dict] = dict(),
+        verb: str = "POST",
+    ):
+        if self._endpoints is None:
+            return self._post(self.host, endpoint, payload)
+        return self._endpoints.request(lambda host: self._post(host, endpoint, payload))
+
+    def _post(self, host: str, endpoint: str, payload: dict):
+        url = urljoin(host, endpoint)
+
+        headers = {"user-agent": f"pyntelope/{pyntelope.__version__}"}
+        headers.update(self.headers)
+
+        try:
+            resp = self._client.post(url, json=payload, headers=headers)
+        except (
+            httpx.TimeoutException,
+            httpx.NetworkError,
+            httpx.WriteError,
+        ) as e:
+            raise exc.ConnectionError(response=None, url=url, payload=payload, error=e)
+
+        return read_node_reply(resp, url, payload)
+
+    def get_info(self):
+        """
+        :return: chain info. Requested again only if the cached one is older than chain_info_ttl seconds.
+        """
+        with self._lock:
+            fetched_at = self._chain_info.get("fetched_at", 0)
+            if time.monotonic() - fetched_at > self.chain_info_ttl:
+                self._chain_info["data"] = super().get_info()
+                self._chain_info["fetched_at"] = time.monotonic()
+            return self._chain_info["data"]
+
+    def cached_chain_info(self) -> typing.Optional[dict]:
+        """
+        :return: cached chain info or None if it's older than chain_info_ttl seconds
+        """
+        with self._lock:
+            fetched_at = self._chain_info.get("fetched_at", 0)
+            if time.monotonic() - fetched_at > self.chain_info_ttl:
+                return None
+            return self._chain_info["data"]
+
+    def set_chain_info(self, chain_info: dict):
+        """
+        Stores chain info requested outside of this object, e.g. by an async client
+        :param chain_info: reply of /v1/chain/get_info
+        """
+        with self._lock:
+            self._chain_info["data"] = chain_info
+            self._chain_info["fetched_at"] = time.monotonic()
+
+    def invalidate_chain_info(self):
+        """
+        Makes the next linked transaction request fresh chain info
+        """
+        with self._lock:
+            self._chain_info.clear()
+
+    def close(self):
+        self._client.close()
+        if self._endpoints is not None:
+            self._endpoints.close()
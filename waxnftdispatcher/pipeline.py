@@ -0,0 +1,282 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import Empty, Full, Queue
+from typing import Iterable, Iterator, Optional, Tuple
+
+from loguru import logger
+from pyntelope import exc, utils
+
+from .ratecontrol import classify_exception, classify_push_error
+
+# How many signed transactions are pushed concurrently
+SEND_WORKERS = 4
+# How many transactions may wait between the stages before building new ones is paused
+QUEUE_SIZE = 16
+# Seconds between checks whether the pipeline was stopped while a stage is blocked
+POLL_INTERVAL = 0.1
+
+_private_key = None
+
+
+def _init_signer(private_key: str):
+    global _private_key
+    _private_key = private_key
+
+
+def _sign(chain_id: str, transaction_bytes: bytes) -> Tuple[str, float]:
+    """
+    Signs serialized transaction in a worker process the same way as pyntelope.LinkedTransaction.sign()
+    :param chain_id: self-explanatory
+    :param transaction_bytes: serialized linked transaction
+    :return: signature, seconds signing took
+    """
+    started = time.perf_counter()
+    signature = utils.sign_bytes(
+        bytes_=bytes.fromhex(chain_id) + transaction_bytes + bytes(32), key=_private_key
+    )
+    return signature, time.perf_counter() - started
+
+
+class TransactionPipeline:
+    def __init__(
+        self,
+        sender,
+        sign_workers: int,
+        send_workers: int = SEND_WORKERS,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        """
+        Builds and links transactions in one thread, signs them in a pool of processes and pushes them
+        from a pool of threads, so signing of the next transactions overlaps with pushing of the previous ones.
+        :param sender: AssetSender which actions are sent
+        :param sign_workers: number of processes signing transactions
+        :param send_workers: number of threads pushing signed transactions
+        :param queue_size: how many transactions may wait for signing or pushing. Building is paused
+                when the queue is full.
+        """
+        self.sender = sender
+        self.sign_workers = sign_workers
+        self.send_workers = send_workers
+        self.queue_size = queue_size
+        self._sign_pool = None
+        self._lock = threading.Lock()
+
+    def _get_sign_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._sign_pool is None:
+                # Forking a process which runs threads may copy locks held by them
+                self._sign_pool = ProcessPoolExecutor(
+                    max_workers=self.sign_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_signer,
+                    initargs=(self.sender.private_key,),
+                )
+            return self._sign_pool
+
+    def close(self):
+        if self._sign_pool is not None:
+            self._sign_pool.shutdown()
+            self._sign_pool = None
+
+    @staticmethod
+    def _put(queue: Queue, item, stopped: threading.Event) -> bool:
+        """
+        Waits for a free place in the queue
+        :return: False if the pipeline was stopped before the item was put
+        """
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def run(self, batches: Iterable[list]) -> Iterator[Tuple[list, list]]:
+        """
+        Sends every batch within one transaction
+        :param batches: lists of tuples with Action object on the last place, e.g. made by _pack_actions()
+        :return: generator of (batch, list with tuple of asset ID(s) and TX ID/False for every action)
+                 in the order of batches
+        """
+        sign_pool = self._get_sign_pool()
+        signed = Queue(maxsize=self.queue_size)
+        ordered = Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+
+        def build():
+            batches_iterator = iter(batches)
+            try:
+                while True:
+                    # Batches are sized by the rate controller, so it gets fresh resources first
+                    self.sender._refresh_resources()
+                    batch = next(batches_iterator, None)
+                    if batch is None:
+                        return
+                    result = Future()
+                    if not self._put(ordered, (batch, result), stopped):
+                        return
+                    actions = [item[-1] for item in batch]
+                    try:
+                        transaction = self._build(actions, sign_pool)
+                    except BaseException as error:
+                        result.set_exception(error)
+                        continue
+                    if not self._put(signed, (transaction, actions, result), stopped):
+                        return
+            except BaseException as error:
+                result = Future()
+                result.set_exception(error)
+                self._put(ordered, (None, result), stopped)
+            finally:
+                self._put(ordered, None, stopped)
+                for _ in range(self.send_workers):
+                    self._put(signed, None, stopped)
+
+        def send():
+            while True:
+                try:
+                    item = signed.get(timeout=POLL_INTERVAL)
+                except Empty:
+                    if stopped.is_set():
+                        return
+                    continue
+                if item is None:
+                    return
+                transaction, actions, result = item
+                # Transactions nobody waits for anymore are not pushed
+                if stopped.is_set():
+                    transaction[0].cancel()
+                    result.cancel()
+                    continue
+                try:
+                    result.set_result(self._push(transaction, actions, sign_pool))
+                except BaseException as error:
+                    result.set_exception(error)
+
+        threads = [threading.Thread(target=build, daemon=True)] + [
+            threading.Thread(target=send, daemon=True) for _ in range(self.send_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = ordered.get()
+                if item is None:
+                    return
+                batch, result = item
+                yield batch, result.result()
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
+
+    def _build(
+        self, actions: list, sign_pool: ProcessPoolExecutor
+    ) -> Tuple[Future, bytes, str]:
+        """
+        Builds and links the transaction and submits it for signing
+        :param actions: list of Action objects
+        :param sign_pool: result of _get_sign_pool()
+        :return: future of _sign(), serialized linked transaction, ID of the transaction
+        """
+        metrics = self.sender.metrics
+        with metrics.timer("build"):
+            raw_transaction = self.sender._prepare_transaction(actions)
+        with metrics.timer("link"):
+            linked_transaction = raw_transaction.link(net=self.sender.net)
+        transaction_bytes = bytes(linked_transaction)
+        signature = sign_pool.submit(
+            _sign, linked_transaction.chain_id, transaction_bytes
+        )
+        return signature, transaction_bytes, linked_transaction.id()
+
+    def _push(
+        self, transaction: tuple, actions: list, sign_pool: ProcessPoolExecutor
+    ) -> list:
+        """
+        Pushes the signed transaction. Failed transactions are built and signed again while the retry budget
+        of the error class isn't exhausted, the same as AssetSender._send_with_retries() does. If the rate controller
+        shrank the batch size meanwhile, the actions are split into several transactions.
+        :param transaction: result of _build()
+        :param actions: dispatching actions of the transaction
+        :param sign_pool: result of _get_sign_pool()
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action
+        """
+        rate_controller = self.sender.rate_controller
+        retries = rate_controller.retry_budget()
+        while True:
+            results, error_class = self._push_once(transaction, len(actions))
+            if error_class is None:
+                return results
+            wait_time = rate_controller.next_retry(retries, error_class)
+            if wait_time is None:
+                logger.error(
+                    f"No retries left for '{error_class}' errors. Giving up..."
+                )
+                return results
+            if error_class == "expired":
+                self.sender.net.invalidate_chain_info()
+            self.sender.metrics.retry("send", error_class)
+            logger.warning(
+                f"Transaction failed with '{error_class}' error. Will retry in {wait_time} seconds..."
+            )
+            time.sleep(wait_time)
+            self.sender._refresh_resources()
+            cpu_cost, _ = self.sender._estimate_action_cost(actions[0])
+            max_actions = rate_controller.batch_size(len(actions), cpu_cost)
+            if max_actions < len(actions):
+                results = []
+                for start in range(0, len(actions), max_actions):
+                    part = actions[start : start + max_actions]
+                    results += self._push(self._build(part, sign_pool), part, sign_pool)
+                return results
+            # The new transaction gets another nonce, so it isn't rejected as duplicate
+            transaction = self._build(actions, sign_pool)
+
+    def _push_once(
+        self, transaction: tuple, actions_count: int
+    ) -> Tuple[list, Optional[str]]:
+        """
+        :param transaction: result of _build()
+        :param actions_count: number of dispatching actions in the transaction
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action,
+                 class of the error or None if the transaction was accepted
+        """
+        signature, transaction_bytes, transaction_id = transaction
+        signature, sign_seconds = signature.result()
+        metrics = self.sender.metrics
+        if metrics.hooks:
+            metrics.observe("sign", sign_seconds)
+        payload = dict(
+            signatures=[signature],
+            compression=False,
+            packed_context_free_data="",
+            packed_trx=transaction_bytes.hex(),
+        )
+        rate_controller = self.sender.rate_controller
+        time.sleep(rate_controller.reserve())
+        logger.debug("Sending transaction to the blockchain...")
+        try:
+            with metrics.timer("send"):
+                resp = self.sender.net._request(
+                    endpoint="/v1/chain/push_transaction", payload=payload
+                )
+        except exc.ConnectionError as error:
+            logger.error(f"Couldn't send transaction: {error}")
+            error_class = classify_exception(error)
+            results = [("None", False)] * actions_count
+        else:
+            self.sender._record_push_failure(resp)
+            error_class = classify_push_error(resp)
+            results = self.sender._parse_push_response(resp, actions_count)
+        if error_class is None:
+            rate_controller.record_success(self.sender._cpu_usage(resp))
+            return results, None
+        rate_controller.record_failure(error_class)
+        # Pipelined transactions are always unique, so the same checks as for sequential ones apply
+        if self.sender._may_be_pushed(error_class):
+            return self.sender._settle_pushed(transaction_id, actions_count), None
+        return results, error_class
@@ -0,0 +1,312 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Tuple
+
+from loguru import logger
+
+from .waxNFTdispatcher import AssetSender
+
+# How long the resources of an account are reused for scheduling
+RESOURCES_TTL = 10
+STRATEGIES = ("lru", "resources")
+
+
+class AccountStats:
+    def __init__(self):
+        """
+        Throughput counters of one account
+        """
+        self.transactions = set()
+        self.actions = 0
+        self.failed_actions = 0
+        self.busy_seconds = 0.0
+        self.last_used = 0.0
+
+    def record(self, results: list, busy_seconds: float):
+        """
+        :param results: list of asset IDs / id-schema-template tuples + hash of transaction or False
+        :param busy_seconds: how long the account was dispatching
+        """
+        for _, tx_id in results:
+            if tx_id:
+                self.transactions.add(tx_id)
+                self.actions += 1
+            else:
+                self.failed_actions += 1
+        self.busy_seconds += busy_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "transactions": len(self.transactions),
+            "actions": self.actions,
+            "failed_actions": self.failed_actions,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "actions_per_second": (
+                round(self.actions / self.busy_seconds, 3) if self.busy_seconds else 0.0
+            ),
+        }
+
+
+class AssetSenderPool:
+    def __init__(
+        self,
+        collection: str,
+        accounts: Iterable[Tuple[str, str]],
+        strategy: str = "lru",
+        resources_ttl: float = RESOURCES_TTL,
+        **sender_kwargs,
+    ):
+        """
+        Dispatches assets through several authorized accounts, so the throughput isn't limited
+        by CPU/NET of one account. Every account sends its transactions one after another.
+        :param collection: Collection which assets are going to be transferred or minted
+        :param accounts: list of (wallet, private key) tuples. Every wallet must be an authorized minter
+                of the collection and holds its own stock of assets.
+        :param strategy: "lru" to use the least recently used account, "resources" to use the account
+                with the most available CPU
+        :param resources_ttl: seconds during which the resources of an account are reused for scheduling
+        :param sender_kwargs: other arguments of AssetSender, e.g. testnet=True. rate_controller isn't
+                accepted, since every account is paced by its own controller.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Use one of {STRATEGIES}")
+        if "rate_controller" in sender_kwargs:
+            # A controller paces one account, so every sender creates its own
+            raise ValueError("rate_controller can't be shared between accounts!")
+        self.senders = []
+        for wallet, private_key in accounts:
+            sender = AssetSender(collection, wallet, private_key, **sender_kwargs)
+            if not self.senders:
+                # Accounts mint from the same templates, so they count issued supply together
+                sender_kwargs = {"template_cache": sender.templates, **sender_kwargs}
+            self.senders.append(sender)
+        if not self.senders:
+            raise ValueError("At least one account is needed!")
+        self.strategy = strategy
+        self.resources_ttl = resources_ttl
+        self.stats = {
+            sender.collection_wallet: AccountStats() for sender in self.senders
+        }
+        self._busy = set()
+        self._resources = {}
+        self._condition = threading.Condition()
+
+    def close(self):
+        for sender in self.senders:
+            sender.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _resources_stale(self, sender: AssetSender) -> bool:
+        """
+        :param sender: AssetSender of the account
+        :return: True if the resources of the account are older than resources_ttl seconds
+        """
+        fetched_at, _ = self._resources.get(sender.collection_wallet, (0, 0))
+        return time.monotonic() - fetched_at > self.resources_ttl
+
+    def _refresh_resources(self, senders: Iterable[AssetSender]):
+        """
+        Requests resources of the accounts whose cached ones are stale. Never called while holding
+        the condition, so other threads aren't blocked by the request.
+        :param senders: AssetSenders of the accounts
+        """
+        for sender in senders:
+            if not self._resources_stale(sender):
+                continue
+            wallet = sender.collection_wallet
+            try:
+                account = sender.net.get_account(account_name=wallet)
+                available_cpu = int(account["cpu_limit"]["available"])
+            except Exception as error:
+                logger.warning(f"Couldn't get resources of '{wallet}': {error}")
+                available_cpu = 0
+            self._resources[wallet] = (time.monotonic(), available_cpu)
+
+    def _available_cpu(self, sender: AssetSender) -> int:
+        """
+        :param sender: AssetSender of the account
+        :return: available CPU of the account in microseconds as last fetched by _refresh_resources()
+        """
+        return self._resources.get(sender.collection_wallet, (0, 0))[1]
+
+    def _weight(self, sender: AssetSender) -> float:
+        """
+        :param sender: AssetSender of the account
+        :return: the higher, the earlier the account is used
+        """
+        if self.strategy == "resources":
+            return self._available_cpu(sender)
+        return -self.stats[sender.collection_wallet].last_used
+
+    def _acquire(self) -> AssetSender:
+        """
+        Waits for an idle account and marks it busy
+        :return: AssetSender of the picked account
+        """
+        refreshed = False
+        while True:
+            with self._condition:
+                while True:
+                    idle = [
+                        sender
+                        for sender in self.senders
+                        if sender.collection_wallet not in self._busy
+                    ]
+                    if idle:
+                        break
+                    self._condition.wait()
+                stale = []
+                if self.strategy == "resources" and not refreshed:
+                    stale = [sender for sender in idle if self._resources_stale(sender)]
+                if not stale:
+                    sender = max(idle, key=self._weight)
+                    self._busy.add(sender.collection_wallet)
+                    return sender
+            # Resources are requested without the lock and the idle accounts are looked up again
+            self._refresh_resources(stale)
+            refreshed = True
+
+    def _release(self, sender: AssetSender):
+        with self._condition:
+            self.stats[sender.collection_wallet].last_used = time.monotonic()
+            self._busy.discard(sender.collection_wallet)
+            self._condition.notify()
+
+    def _run(self, sender: AssetSender, method: str, *args, **kwargs):
+        """
+        Calls the method of AssetSender and records the throughput of the account
+        :param sender: AssetSender of the account
+        :param method: name of the AssetSender method
+        :return: result of the method
+        """
+        started = time.monotonic()
+        result = getattr(sender, method)(*args, **kwargs)
+        results = result if isinstance(result, list) else [result]
+        if method == "dispatch_many":
+            results = [entry for order_results in result for entry in order_results]
+        self.stats[sender.collection_wallet].record(results, time.monotonic() - started)
+        return result
+
+    def _run_on_next_account(self, method: str, *args, **kwargs):
+        sender = self._acquire()
+        logger.info(f"Dispatching through the account '{sender.collection_wallet}'")
+        try:
+            return self._run(sender, method, *args, **kwargs)
+        finally:
+            self._release(sender)
+
+    def send_or_mint_assets(
+        self,
+        schema_template_list: Iterable[Tuple[str, str]],
+        wallet: str,
+        memo: str = "",
+        batch_size: int = 1,
+    ) -> list:
+        """
+        Same as AssetSender.send_or_mint_assets() through the next idle account
+        """
+        return self._run_on_next_account(
+            "send_or_mint_assets", schema_template_list, wallet, memo, batch_size
+        )
+
+    def mint_assets(
+        self,
+        schema: str,
+        template: str,
+        wallet: str,
+        quantity: int = 1,
+        batch_size: int = 1,
+    ) -> list:
+        """
+        Same as AssetSender.mint_assets() through the next idle account
+        """
+        return self._run_on_next_account(
+            "mint_assets", schema, template, wallet, quantity, batch_size
+        )
+
+    def mint_assets_and_get_ids(
+        self,
+        schema: str,
+        template: str,
+        wallet: str,
+        quantity: int = 1,
+        batch_size: int = 1,
+    ) -> list:
+        """
+        Same as AssetSender.mint_assets_and_get_ids() through the next idle account
+        """
+        return self._run_on_next_account(
+            "mint_assets_and_get_ids", schema, template, wallet, quantity, batch_size
+        )
+
+    def dispatch_many(
+        self,
+        orders: Iterable[Tuple[str, Iterable[Tuple[str, str]], str]],
+        **kwargs,
+    ) -> list:
+        """
+        Splits orders between all accounts and dispatches them concurrently.
+        With the "resources" strategy accounts with more available CPU get more orders.
+        :param orders: list of (recipient wallet, schema-template list, memo) tuples
+        :param kwargs: other arguments of AssetSender.dispatch_many()
+        :return: list with the result of send_or_mint_assets() for every order, in the same order
+        """
+        orders = list(orders)
+        shares = self._split(len(orders))
+        shards = []
+        start = 0
+        for sender, share in zip(self.senders, shares):
+            if share:
+                shards.append((sender, start, orders[start : start + share]))
+            start += share
+
+        def dispatch_shard(shard):
+            sender, _, shard_orders = shard
+            with self._condition:
+                while sender.collection_wallet in self._busy:
+                    self._condition.wait()
+                self._busy.add(sender.collection_wallet)
+            try:
+                return self._run(sender, "dispatch_many", shard_orders, **kwargs)
+            finally:
+                self._release(sender)
+
+        results = [None] * len(orders)
+        with ThreadPoolExecutor(max_workers=max(len(shards), 1)) as executor:
+            for (_, start, _), shard_results in zip(
+                shards, executor.map(dispatch_shard, shards)
+            ):
+                results[start : start + len(shard_results)] = shard_results
+        return results
+
+    def _split(self, orders_count: int) -> list:
+        """
+        :param orders_count: number of orders
+        :return: number of orders for every account
+        """
+        weights = [1.0] * len(self.senders)
+        if self.strategy == "resources":
+            self._refresh_resources(self.senders)
+            weights = [max(self._available_cpu(sender), 0) for sender in self.senders]
+            if not any(weights):
+                weights = [1.0] * len(self.senders)
+        total_weight = sum(weights)
+        shares = [int(orders_count * weight / total_weight) for weight in weights]
+        # Give the rest to the accounts with the highest weight
+        for account_number in sorted(
+            range(len(weights)), key=lambda number: weights[number], reverse=True
+        )[: orders_count - sum(shares)]:
+            shares[account_number] += 1
+        return shares
+
+    def throughput(self) -> dict:
+        """
+        :return: throughput counters for every account
+        """
+        return {wallet: stats.as_dict() for wallet, stats in self.stats.items()}
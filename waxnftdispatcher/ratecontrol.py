@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import httpx
+import requests
+
+# Classes of errors by the name of the error returned by the blockchain node
+PUSH_ERROR_CLASSES = {
+    "tx_cpu_usage_exceeded": "cpu",
+    "deadline_exception": "cpu",
+    "leeway_deadline_exception": "cpu",
+    "block_cpu_usage_exceeded": "cpu",
+    "tx_net_usage_exceeded": "net",
+    "block_net_usage_exceeded": "net",
+    "tx_duplicate": "duplicate",
+    "expired_tx_exception": "expired",
+    "invalid_ref_block_exception": "expired",
+}
+# Retries allowed for every class of errors within one transaction. Transactions which maybe reached the node
+# ("timeout") and unknown errors ("other") are not retried, so assets are never minted twice. Timed out
+# transactions are looked up in the account history instead. Duplicates are retried only if transactions
+# aren't unique, otherwise the node already got the very same transaction.
+RETRY_BUDGETS = {
+    "cpu": 3,
+    "net": 3,
+    "network": 3,
+    "expired": 2,
+    "duplicate": 2,
+    "timeout": 0,
+    "other": 0,
+}
+# Seconds to wait before the first retry of every class of errors. Doubled for every next retry.
+BACKOFF = {
+    "cpu": 1.0,
+    "net": 1.0,
+    "network": 1.0,
+    "expired": 0.0,
+    "duplicate": 2.0,
+    "timeout": 0.0,
+    "other": 0.0,
+}
+# Classes of errors which mean that the account or the node is overloaded
+OVERLOAD_CLASSES = ("cpu", "net", "network", "timeout")
+# Seconds between transactions after the first overload. Doubled for every next one.
+MIN_BACKOFF_INTERVAL = 0.1
+MAX_INTERVAL = 30
+# Seconds by which the interval between transactions is reduced after every successful one
+INTERVAL_STEP = 0.05
+MAX_BATCH_SIZE = 10
+# How long the resources of the account are trusted
+RESOURCES_TTL = 10
+
+
+def classify_push_error(resp: dict) -> Optional[str]:
+    """
+    :param resp: reply of the blockchain node to the pushed transaction
+    :return: class of the error or None if the transaction was accepted
+    """
+    if "transaction_id" in resp:
+        return None
+    error = resp.get("error")
+    if not isinstance(error, dict):
+        return "other"
+    return PUSH_ERROR_CLASSES.get(error.get("name"), "other")
+
+
+def classify_exception(error: Exception) -> str:
+    """
+    :param error: exception raised while pushing the transaction, e.g. pyntelope.exc.ConnectionError
+    :return: "network" if the request didn't reach the node, "timeout" if the node maybe got it
+    """
+    cause = error.__cause__ or error.__context__ or error
+    if isinstance(
+        cause, (httpx.ConnectError, httpx.ConnectTimeout, requests.ConnectionError)
+    ):
+        return "network"
+    if isinstance(cause, httpx.HTTPStatusError) and cause.response.status_code < 500:
+        # The node or a proxy in front of it refused the request, e.g. with 429
+        return "network"
+    # A gateway may reply with 502/504 while the node behind it is still processing the transaction
+    return "timeout"
+
+
+class RateController:
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_interval: float = MAX_INTERVAL,
+        retry_budgets: Dict[str, int] = None,
+        backoff: Dict[str, float] = None,
+        resources_ttl: Optional[float] = RESOURCES_TTL,
+    ):
+        """
+        Paces transactions of one account. The batch size grows by one action and the interval between
+        transactions shrinks by INTERVAL_STEP after every accepted transaction, and are halved/doubled
+        when the account runs out of CPU/NET or the node is overloaded.
+        Subclass it to plug in another policy.
+        :param max_batch_size: the most actions per transaction
+        :param max_interval: the longest pause between transactions in seconds
+        :param retry_budgets: retries allowed within one transaction for every class of errors. Overrides RETRY_BUDGETS.
+        :param backoff: seconds before the first retry for every class of errors. Overrides BACKOFF.
+        :param resources_ttl: seconds during which CPU/NET of the account are trusted. None to not check them.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_interval = max_interval
+        self.retry_budgets = {**RETRY_BUDGETS, **(retry_budgets or {})}
+        self.backoff = {**BACKOFF, **(backoff or {})}
+        self.resources_ttl = resources_ttl
+        self.current_batch_size = max_batch_size
+        self.interval = 0.0
+        self.cpu_available = None
+        self.net_available = None
+        self._resources_fetched_at = None
+        self._next_send = 0.0
+        self._lock = threading.Lock()
+
+    def resources_stale(self) -> bool:
+        """
+        :return: True if CPU/NET of the account should be requested again
+        """
+        if self.resources_ttl is None:
+            return False
+        with self._lock:
+            return (
+                self._resources_fetched_at is None
+                or time.monotonic() - self._resources_fetched_at > self.resources_ttl
+            )
+
+    def observe_account(self, account: Optional[dict]):
+        """
+        :param account: reply of /v1/chain/get_account or None if it couldn't be requested.
+                Resources are unknown until the next request if the reply doesn't have them, e.g. it's an error.
+        """
+        with self._lock:
+            self._resources_fetched_at = time.monotonic()
+            try:
+                cpu_available = int(account["cpu_limit"]["available"])
+                net_available = int(account["net_limit"]["available"])
+            except (KeyError, TypeError, ValueError):
+                self.cpu_available = self.net_available = None
+                return
+            self.cpu_available = cpu_available
+            self.net_available = net_available
+
+    def batch_size(self, limit: int, action_cpu_cost: int = 0) -> int:
+        """
+        :param limit: the most actions which fit into the transaction
+        :param action_cpu_cost: estimated CPU cost of one action in microseconds
+        :return: how many actions to send in the next transaction. At least 1.
+        """
+        with self._lock:
+            batch_size = min(limit, self.current_batch_size)
+            if self.cpu_available is not None and action_cpu_cost:
+                batch_size = min(batch_size, self.cpu_available // action_cpu_cost)
+        return max(batch_size, 1)
+
+    def reserve(self) -> float:
+        """
+        Takes the next slot for sending a transaction
+        :return: seconds to wait before sending it
+        """
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send)
+            self._next_send = send_at + self.interval
+            return send_at - now
+
+    def record_success(self, cpu_usage: int = 0):
+        """
+        :param cpu_usage: CPU used by the accepted transaction in microseconds
+        """
+        with self._lock:
+            self.current_batch_size = min(
+                self.current_batch_size + 1, self.max_batch_size
+            )
+            self.interval = max(self.interval - INTERVAL_STEP, 0.0)
+            if self.cpu_available is not None:
+                self.cpu_available = max(self.cpu_available - cpu_usage, 0)
+
+    def record_failure(self, error_class: str):
+        """
+        :param error_class: class of the error, e.g. returned by classify_push_error()
+        """
+        if error_class not in OVERLOAD_CLASSES:
+            return
+        with self._lock:
+            if error_class in ("cpu", "net"):
+                self.current_batch_size = max(self.current_batch_size // 2, 1)
+                # Available resources are outdated if the account ran out of them
+                self._resources_fetched_at = None
+            self.interval = min(
+                max(self.interval * 2, MIN_BACKOFF_INTERVAL), self.max_interval
+            )
+
+    def retry_budget(self) -> Counter:
+        """
+        :return: counter of retries used for one transaction
+        """
+        return Counter()
+
+    def next_retry(self, used: Counter, error_class: str) -> Optional[float]:
+        """
+        Spends one retry of the error class
+        :param used: counter made by retry_budget()
+        :param error_class: self-explanatory
+        :return: seconds to wait before the retry or None if the budget is exhausted
+        """
+        if used[error_class] >= self.retry_budgets.get(error_class, 0):
+            return None
+        used[error_class] += 1
+        return self.backoff.get(error_class, 0.0) * 2 ** (used[error_class] - 1)
@@ -0,0 +1,192 @@
+import threading
+import time
+from typing import Iterator, Optional
+
+import requests
+from loguru import logger
+
+from .endpoints import EndpointPool
+
+TEMPLATES_PATH = "/atomicassets/v1/templates"
+SCHEMAS_PATH = "/atomicassets/v1/schemas"
+TEMPLATES_TTL = 300
+# Templates created after the last load are looked up again, but not more often than every so many seconds
+UNKNOWN_TEMPLATE_RELOAD_INTERVAL = 10
+TEMPLATES_PAGE_LIMIT = 1000
+REQUEST_TIMEOUT = 30
+
+
+class TemplateInfo:
+    def __init__(self, schema_name: str, max_supply: int, issued_supply: int):
+        """
+        :param schema_name: schema the template belongs to
+        :param max_supply: the most assets which can be minted. 0 means unlimited.
+        :param issued_supply: assets minted so far, including the ones being minted now
+        """
+        self.schema_name = schema_name
+        self.max_supply = max_supply
+        self.issued_supply = issued_supply
+
+    def remaining(self) -> Optional[int]:
+        """
+        :return: how many assets can still be minted or None if unlimited
+        """
+        if not self.max_supply:
+            return None
+        return max(self.max_supply - self.issued_supply, 0)
+
+
+class TemplateCache:
+    def __init__(
+        self, collection: str, api_endpoints: EndpointPool, ttl: float = TEMPLATES_TTL
+    ):
+        """
+        In-process cache of templates and schemas of the collection, loaded in bulk from AtomicAssets API.
+        Mints are checked against it before any transaction is built: the template must exist, belong to
+        the schema and have supply left. Issued supply is counted locally as mints are reserved, so
+        concurrent mints never exceed max_supply. If the API can't be reached, nothing is rejected.
+        :param collection: self-explanatory
+        :param api_endpoints: pool of AtomicAssets API endpoints
+        :param ttl: seconds after which templates and schemas are requested again
+        """
+        self.collection = collection
+        self.api_endpoints = api_endpoints
+        self.ttl = ttl
+        self.session = requests.Session()
+        # template_id -> TemplateInfo. None until loaded.
+        self._templates = None
+        self._schemas = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def _iter_pages(self, path: str) -> Iterator[dict]:
+        """
+        :param path: e.g. "/atomicassets/v1/templates"
+        :return: generator of all records of the collection
+        """
+        page = 1
+        while True:
+
+            def send(base_url: str) -> dict:
+                response = self.session.get(
+                    f"{base_url}{path}",
+                    params={
+                        "collection_name": self.collection,
+                        "page": page,
+                        "limit": TEMPLATES_PAGE_LIMIT,
+                    },
+                    timeout=REQUEST_TIMEOUT,
+                )
+                response.raise_for_status()
+                return response.json()
+
+            records = self.api_endpoints.request(send)["data"]
+            yield from records
+            if len(records) < TEMPLATES_PAGE_LIMIT:
+                return
+            page += 1
+
+    def _load(self):
+        """
+        Requests all templates and schemas of the collection. Locally counted issued supply is kept
+        if the API doesn't know about the latest mints yet.
+        """
+        logger.debug(f"Loading templates and schemas of '{self.collection}'...")
+        self._loaded_at = time.monotonic()
+        try:
+            schemas = {
+                schema["schema_name"] for schema in self._iter_pages(SCHEMAS_PATH)
+            }
+            templates = {}
+            for template in self._iter_pages(TEMPLATES_PATH):
+                template_id = str(template["template_id"])
+                issued_supply = int(template["issued_supply"])
+                cached = (self._templates or {}).get(template_id)
+                if cached is not None:
+                    issued_supply = max(issued_supply, cached.issued_supply)
+                templates[template_id] = TemplateInfo(
+                    template["schema"]["schema_name"],
+                    int(template["max_supply"]),
+                    issued_supply,
+                )
+        except (KeyError, ValueError, requests.RequestException) as error:
+            logger.warning(f"Couldn't load templates of '{self.collection}': {error!r}")
+            return
+        self._schemas = schemas
+        self._templates = templates
+
+    def _get(self, template_id: str) -> Optional[TemplateInfo]:
+        """
+        Loads templates if they are stale, the template is unknown or the last load failed
+        :return: cached template or None if it doesn't exist
+        """
+        since_load = (
+            None if self._loaded_at is None else time.monotonic() - self._loaded_at
+        )
+        if since_load is None or since_load > self.ttl:
+            self._load()
+        elif (
+            self._templates is None or template_id not in self._templates
+        ) and since_load > UNKNOWN_TEMPLATE_RELOAD_INTERVAL:
+            self._load()
+        if self._templates is None:
+            return None
+        return self._templates.get(template_id)
+
+    def reserve(self, schema: str, template_id: str, quantity: int = 1) -> int:
+        """
+        Checks the mints and counts the allowed ones as issued
+        :param schema: self-explanatory
+        :param template_id: self-explanatory
+        :param quantity: how many assets are going to be minted
+        :return: how many of them can be minted
+        """
+        template_id = str(template_id)
+        with self._lock:
+            template = self._get(template_id)
+            if self._templates is None:
+                # Templates couldn't be loaded, so the blockchain decides
+                return quantity
+            if template is None:
+                if schema not in self._schemas:
+                    reason = f"schema '{schema}' doesn't exist"
+                else:
+                    reason = f"template '{template_id}' doesn't exist"
+                logger.error(f"Can't mint {quantity} asset(s): {reason}!")
+                return 0
+            if template.schema_name != schema:
+                logger.error(
+                    f"Can't mint {quantity} asset(s): template '{template_id}' belongs "
+                    f"to schema '{template.schema_name}', not '{schema}'!"
+                )
+                return 0
+            remaining = template.remaining()
+            allowed = quantity if remaining is None else min(quantity, remaining)
+            template.issued_supply += allowed
+        if allowed < quantity:
+            logger.error(
+                f"Can't mint {quantity - allowed} of {quantity} asset(s): template '{template_id}' "
+                f"reached its max supply of {template.max_supply}!"
+            )
+        return allowed
+
+    def release(self, template_id: str, quantity: int = 1):
+        """
+        Returns supply of failed mints
+        :param template_id: self-explanatory
+        :param quantity: how many reserved mints failed
+        """
+        with self._lock:
+            template = (self._templates or {}).get(str(template_id))
+            if template is not None:
+                template.issued_supply = max(template.issued_supply - quantity, 0)
+
+    def invalidate(self):
+        """
+        Drops cached templates, so they are requested again on the next reservation
+        """
+        with self._lock:
+            self._loaded_at = None
@@ -1,18 +1,54 @@
+import re
 import time
-from typing import Iterable, Tuple
+import uuid
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, Tuple
 import pyntelope
 from loguru import logger
 import requests
-from collections import Counter
+from collections import Counter, deque
 import json
 
 from pyntelope import exc
 
+from .actions import ActionTemplates
+from .assets import STREAM_CHUNK_SIZE, AssetRecord, read_asset_records
+from .confirmations import CONFIRMATION_TIMEOUT, ConfirmationTracker
+from .endpoints import EndpointPool
+from .inventory import INVENTORY_TTL, InventoryCache
+from .metrics import Metrics, MetricsHook
+from .network import CHAIN_INFO_TTL, PooledNet
+from .pipeline import SEND_WORKERS, TransactionPipeline
+from .ratecontrol import RateController, classify_exception, classify_push_error
+from .templates import TEMPLATES_TTL, TemplateCache
+
 ATOMICASSETS_MAIN_API = "https://wax.eosusa.io"
 ATOMICASSETS_TEST_API = "https://test.wax.eosusa.io"
-TIMEOUT = 3
-# RETRIES = 2
-RETRIES = 0
+ASSETS_PATH = "/atomicassets/v1/assets"
+HISTORY_TRANSACTION_PATH = "/v2/history/get_transaction"
+# Seconds to wait for a reply of API before trying the next endpoint
+REQUEST_TIMEOUT = 30
+# AtomicAssets API doesn't return more than 1000 assets per page
+ASSETS_PAGE_LIMIT = 1000
+# How many pages of available assets are requested concurrently
+INVENTORY_WORKERS = 4
+# How many minting transactions missing in the account history are requested from the history API concurrently
+HISTORY_WORKERS = 8
+# pyntelope.Transaction doesn't accept more than 10 actions
+MAX_ACTIONS_PER_TRANSACTION = 10
+# Rough CPU cost of one action (in microseconds) used to keep batched transactions within the budget
+ACTION_CPU_COST_US = {"mintasset": 2000, "transfer": 1000, "nonce": 100}
+TRANSACTION_CPU_BUDGET_US = 15000
+# Limit for the serialized action data packed into one transaction
+TRANSACTION_SIZE_BUDGET = 4096
+# Action without contract which makes every transaction unique, so identical ones aren't rejected as duplicates
+NONCE_ACCOUNT = "eosio.null"
+NONCE_ACTION = "nonce"
+# Pause between identical transactions if they are not made unique with the nonce action
+DUPLICATE_TRANSACTION_DELAY = 2
+# Up to 12 characters a-z, 1-5 and dots, which can't be the first or the last one
+ACCOUNT_NAME_PATTERN = re.compile(r"[a-z1-5](?:[a-z1-5.]{0,10}[a-z1-5])?")
 
 
 class AssetSender:
@@ -23,6 +59,25 @@ class AssetSender:
         private_key: str,
         api_endpoint: str = "",
         testnet: bool = False,
+        use_inventory_cache: bool = False,
+        inventory_ttl: float = INVENTORY_TTL,
+        chain_info_ttl: float = CHAIN_INFO_TTL,
+        sorting_key: str = "asset_id",
+        sorting_order: str = "desc",
+        api_endpoints: Iterable[str] = None,
+        history_endpoints: Iterable[str] = None,
+        push_endpoints: Iterable[str] = None,
+        hedge_reads: bool = False,
+        unique_transactions: bool = True,
+        metrics_hooks: Iterable[MetricsHook] = None,
+        sign_workers: int = 0,
+        send_workers: int = SEND_WORKERS,
+        rate_controller: RateController = None,
+        confirmation_timeout: float = CONFIRMATION_TIMEOUT,
+        validate_mints: bool = True,
+        templates_ttl: float = TEMPLATES_TTL,
+        template_cache: TemplateCache = None,
+        transaction_cpu_budget: int = TRANSACTION_CPU_BUDGET_US,
     ):
         """
         Constructor
@@ -31,41 +86,170 @@ class AssetSender:
         :param private_key: private key from the collection_wallet
         :param api_endpoint: API URL address
         :param testnet: if True, will interact with Wax Test Net through Test endpoint.
+        :param use_inventory_cache: if True, available assets are cached and reserved between calls
+                of send_or_mint_assets instead of requesting them from API every time.
+        :param inventory_ttl: seconds after which cached assets of a template are requested again
+        :param chain_info_ttl: seconds during which the reference block info is reused for linking transactions
+        :param sorting_key: which assets are sent first. Any sort key of AtomicAssets API,
+                e.g. "asset_id" or "template_mint"
+        :param sorting_order: "desc" to send the highest values first, "asc" for the lowest
+        :param api_endpoints: AtomicAssets API URL addresses. Overrides api_endpoint.
+                Requests go to the fastest healthy endpoint of the list and fail over to the next ones.
+        :param history_endpoints: history API URL addresses used to get transactions. Same as api_endpoints.
+        :param push_endpoints: blockchain node URL addresses used to push transactions. Same as api_endpoints.
+        :param hedge_reads: if True, reads are also sent to the second endpoint when the first one
+                is slower than its p95 latency
+        :param unique_transactions: if True, every transaction gets a nonce action, so identical
+                transactions can be sent without pauses. If False, waits DUPLICATE_TRANSACTION_DELAY
+                seconds between mints to get rid of "duplicate transaction" error.
+        :param metrics_hooks: MetricsHook objects which get the duration of every stage, failures and retries,
+                e.g. [InMemoryMetrics()]. Nothing is measured if there are none.
+        :param sign_workers: if above 0, transactions of mint_assets() and dispatch_many() are signed
+                in so many processes while the previous ones are being pushed. Needs unique_transactions.
+        :param send_workers: number of threads pushing signed transactions if sign_workers is above 0
+        :param rate_controller: RateController which paces transactions of the account and decides
+                which failed ones are retried. Every account needs its own one.
+        :param confirmation_timeout: seconds to wait for minting transactions to appear in the account history
+        :param validate_mints: if True, mints of unknown templates, of templates of another schema or beyond
+                max_supply are rejected without pushing a transaction
+        :param templates_ttl: seconds after which templates and schemas of the collection are requested again
+        :param template_cache: TemplateCache shared with other accounts minting from the same collection,
+                so they count issued supply together. It isn't closed by this object.
+        :param transaction_cpu_budget: estimated CPU in microseconds which actions of one transaction may take.
+                With the default one a transaction holds up to 7 mintasset or 9 transfer actions.
         """
         self.collection = collection
         self.collection_wallet = collection_wallet
         self.private_key = private_key
         self.testnet = testnet
+        self.sorting_key = sorting_key
+        self.sorting_order = sorting_order
         # Set the default API endpoint
         if not self.testnet and not api_endpoint:
             api_endpoint = ATOMICASSETS_MAIN_API
         elif self.testnet and not api_endpoint:
             api_endpoint = ATOMICASSETS_TEST_API
-        self.endpoint_assets = f"{api_endpoint}/atomicassets/v1/assets"
+        self.api_endpoints = EndpointPool(api_endpoints or [api_endpoint])
+        self.endpoint_assets = f"{self.api_endpoints.primary}{ASSETS_PATH}"
         # Set the API endpoint for getting transfers
         if not self.testnet:
             transfer_endpoint = "https://wax.eosusa.io"
         elif self.testnet:
             transfer_endpoint = "https://test.wax.eosusa.io"
-        self.endpoint_transfers = f"{transfer_endpoint}/v2/history/get_transaction"
+        self.history_endpoints = EndpointPool(history_endpoints or [transfer_endpoint])
+        self.endpoint_transfers = (
+            f"{self.history_endpoints.primary}{HISTORY_TRANSACTION_PATH}"
+        )
+        self.hedge_reads = hedge_reads
+        self.transaction_cpu_budget = transaction_cpu_budget
+        self.unique_transactions = unique_transactions
+        self.metrics = Metrics(metrics_hooks)
+        self.action_templates = ActionTemplates(self.collection_wallet)
+        self.rate_controller = rate_controller or RateController(
+            max_batch_size=self.max_actions_per_transaction
+        )
+        if sign_workers and not unique_transactions:
+            raise ValueError("Pipelined sending needs unique transactions!")
+        # One pool of connections for all API requests and one network object for all transactions
+        self.session = requests.Session()
+        if self.testnet:
+            default_net = pyntelope.WaxTestnet()
+        else:
+            default_net = pyntelope.WaxMainnet()
+        self.push_endpoints = EndpointPool(push_endpoints or [default_net.host])
+        self.net = PooledNet(
+            host=self.push_endpoints.primary, chain_info_ttl=chain_info_ttl
+        )
+        self.net.use_endpoints(self.push_endpoints)
+        self.confirmations = ConfirmationTracker(
+            self.collection_wallet,
+            self.history_endpoints,
+            self.net,
+            timeout=confirmation_timeout,
+        )
+        self.pipeline = None
+        if sign_workers:
+            self.pipeline = TransactionPipeline(self, sign_workers, send_workers)
+        self.templates = None
+        self._owns_templates = template_cache is None
+        if validate_mints:
+            self.templates = template_cache or TemplateCache(
+                self.collection, self.api_endpoints, ttl=templates_ttl
+            )
+        self.inventory = None
+        if use_inventory_cache:
+            self.inventory = InventoryCache(self._fetch_inventory, ttl=inventory_ttl)
+
+    def close(self):
+        """
+        Closes pooled connections to the API and blockchain nodes
+        """
+        self.session.close()
+        if self.pipeline is not None:
+            self.pipeline.close()
+        self.confirmations.close()
+        if self.templates is not None and self._owns_templates:
+            self.templates.close()
+        self.net.close()
+        self.api_endpoints.close()
+        self.history_endpoints.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _get_available_assets(
         self,
         schema_template_list: Iterable[Tuple[str, str]],
-        sorting_key: str = "asset_id",
-        limit: int = 1000,
+        sorting_key: str = None,
+        limit: int = ASSETS_PAGE_LIMIT,
     ) -> list:
         """
         Make request to blockchain to get available assets in collection wallet with given template IDs
         :param schema_template_list: list or tuple of (schema, template) tuples.
                 E.g. [("rawmaterials", "318738"), ("magmaterials", "416529")]
-        :param sorting_key: self-explanatory, default "asset_id"
-        :param limit: self-explanatory, default "1000"
-        :return: list with all found assets (with other info from API) sorted by default by the highest asset ID
+        :param sorting_key: self-explanatory, default is the sorting key of the object
+        :param limit: page size, default "1000"
+        :return: list with AssetRecord of all found assets sorted by default by the highest asset ID
+        """
+        with self.metrics.timer("get_available_assets"):
+            return list(
+                self._iter_available_assets(schema_template_list, sorting_key, limit)
+            )
+
+    def _fetch_inventory(self, template_ids: Iterable[str]) -> Iterator[AssetRecord]:
+        """
+        Loads assets into the inventory cache. Refreshes are measured as the "get_available_assets" stage.
+        :param template_ids: templates to refresh
+        :return: generator of AssetRecord of found assets
+        """
+        with self.metrics.timer("get_available_assets"):
+            yield from self._iter_available_assets(
+                [(None, template_id) for template_id in template_ids]
+            )
+
+    def _iter_available_assets(
+        self,
+        schema_template_list: Iterable[Tuple[str, str]],
+        sorting_key: str = None,
+        limit: int = ASSETS_PAGE_LIMIT,
+        workers: int = INVENTORY_WORKERS,
+    ) -> Iterator[AssetRecord]:
+        """
+        Walks through all pages of available assets in collection wallet with given template IDs.
+        Several pages are fetched at once. Stop iterating as soon as enough assets are found.
+        :param schema_template_list: list or tuple of (schema, template) tuples.
+                E.g. [("rawmaterials", "318738"), ("magmaterials", "416529")]
+        :param sorting_key: self-explanatory, default is the sorting key of the object
+        :param limit: page size, default "1000"
+        :param workers: how many pages are requested concurrently
+        :return: generator of AssetRecord of found assets sorted by default by the highest asset ID
         """
         # Build comma separated string of templates
         template_list_string = ",".join(
-            template[1] for template in schema_template_list
+            dict.fromkeys(template[1] for template in schema_template_list)
         )
         logger.info(
             f"Making request to blockchain to find in the collection wallet "
@@ -74,11 +258,74 @@ class AssetSender:
         payload = {
             "owner": self.collection_wallet,
             "template_whitelist": template_list_string,
-            "sort": sorting_key,
+            "sort": sorting_key or self.sorting_key,
+            "order": self.sorting_order,
             "limit": limit,
         }
-        response = requests.get(self.endpoint_assets, params=payload)
-        return response.json()["data"]
+        page = 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                pages = executor.map(
+                    lambda page_number: self._get_assets_page(payload, page_number),
+                    range(page, page + workers),
+                )
+                for assets in pages:
+                    yield from assets
+                    if len(assets) < limit:
+                        return
+                page += workers
+
+    def _get_assets_page(self, payload: dict, page: int) -> list:
+        """
+        Make request to blockchain to get one page of available assets
+        :param payload: request parameters without page number
+        :param page: number of the page starting from 1
+        :return: list with AssetRecord of every found asset on the page. The reply is parsed
+                 while it's being received, and only the fields needed to pick assets are kept.
+        """
+        logger.debug(f"Requesting page {page} of available assets...")
+        with self.metrics.timer("get_assets_page"):
+            return self._api_get(
+                self.api_endpoints,
+                ASSETS_PATH,
+                {**payload, "page": page},
+                parse=lambda response: read_asset_records(
+                    response.iter_content(STREAM_CHUNK_SIZE)
+                ),
+            )
+
+    def _api_get(
+        self,
+        endpoints: EndpointPool,
+        path: str,
+        params: dict,
+        parse: Callable[[requests.Response], any] = None,
+    ):
+        """
+        Makes GET request to the fastest healthy endpoint. Fails over to the next ones.
+        :param endpoints: pool of API endpoints
+        :param path: e.g. "/atomicassets/v1/assets"
+        :param params: query parameters
+        :param parse: callable which reads the streamed reply. The whole reply is decoded as JSON by default.
+        :return: reply of the API
+        """
+
+        def send(base_url: str):
+            response = self.session.get(
+                f"{base_url}{path}",
+                params=params,
+                timeout=REQUEST_TIMEOUT,
+                stream=parse is not None,
+            )
+            with response:
+                # Let the next endpoint answer if this one is overloaded or broken
+                if response.status_code >= 500 or response.status_code == 429:
+                    response.raise_for_status()
+                if parse is not None:
+                    return parse(response)
+                return response.json()
+
+        return endpoints.request(send, hedge=self.hedge_reads)
 
     def _get_right_asset_id(
         self,
@@ -93,9 +340,20 @@ class AssetSender:
         payload = {
             "id": tx_id,
         }
-        response = requests.get(self.endpoint_transfers, params=payload)
-        # logger.debug(f"Got response: {response.json()}")
-        asset_id = response.json()["actions"][1]["act"]["data"]["asset_id"]
+        with self.metrics.timer("get_right_asset_id"):
+            response = self._api_get(
+                self.history_endpoints, HISTORY_TRANSACTION_PATH, payload
+            )
+            # logger.debug(f"Got response: {response}")
+            return self._parse_minted_asset_id(response)
+
+    @staticmethod
+    def _parse_minted_asset_id(transaction: dict) -> str:
+        """
+        :param transaction: reply of the history API with the minting transaction
+        :return: asset ID found in the minting transaction
+        """
+        asset_id = transaction["actions"][1]["act"]["data"]["asset_id"]
         logger.debug(f"Found '{asset_id}'")
         return asset_id
 
@@ -113,35 +371,48 @@ class AssetSender:
         dict_with_counted_schemas_templates = Counter(schema_template_list)
         return dict_with_counted_schemas_templates.items()
 
+    @staticmethod
+    def _index_assets_by_template(
+        api_response: Iterable[AssetRecord],
+    ) -> Dict[str, deque]:
+        """
+        Groups found assets by template in one pass keeping the order of the API response
+        :param api_response: list with AssetRecord of found assets
+        :return: dictionary of template IDs and deques with their asset IDs
+        """
+        assets_index = {}
+        for asset in api_response:
+            assets_index.setdefault(asset.template_id, deque()).append(asset.asset_id)
+        return assets_index
+
     @staticmethod
     def _find_assets_with_highest_mints(
         api_response, template_id: str, quantity_requested: int = 1
     ):
         """
         Finds in collection wallet given quantity of assets with given template
-        :param api_response: list with found assets received from blockchain
+        :param api_response: assets index made by _index_assets_by_template() or list with AssetRecord
+                of found assets. Found assets are removed from the index, so they are not found twice.
         :param template_id: self-explanatory. Only one template ID per function run
         :param quantity_requested: how many assets with given template ID must be found
         :return: list of found asset IDs, quantity needed to mint if any.
         """
-        # extract asset_ids from reply data
+        if not isinstance(api_response, dict):
+            api_response = AssetSender._index_assets_by_template(api_response)
+        stock = api_response.get(template_id, deque())
         asset_ids = []
-        asset_number = 0
         quantity_to_mint = 0
         while len(asset_ids) < quantity_requested:
-            try:
-                asset_data = api_response[asset_number]
-                if asset_data["template"]["template_id"] == template_id:
-                    asset_ids.append(asset_data["asset_id"])
-                    logger.info(f'found asset with ID {asset_data["asset_id"]}')
-                asset_number += 1
-            except IndexError:
+            if not stock:
                 quantity_available = len(asset_ids)
                 logger.warning(
                     f"Not enough assets available. Have: {quantity_available}; Need: {quantity_requested}"
                 )
                 quantity_to_mint = quantity_requested - quantity_available
                 break
+            asset_id = stock.popleft()
+            asset_ids.append(asset_id)
+            logger.info(f"found asset with ID {asset_id}")
         return asset_ids, quantity_to_mint
 
     def _prepare_transfer_transaction(
@@ -156,34 +427,7 @@ class AssetSender:
         :return: Ready Action object.
         """
         logger.info("Creating transfer transaction...")
-        asset_ids_blk = pyntelope.types.Array.from_dict(
-            asset_ids, type_=pyntelope.types.Uint64
-        )
-        data = [
-            pyntelope.Data(
-                name="from",
-                value=pyntelope.types.Name(from_wallet),
-            ),
-            pyntelope.Data(
-                name="to",
-                value=pyntelope.types.Name(to),
-            ),
-            pyntelope.Data(name="asset_ids", value=asset_ids_blk),
-            pyntelope.Data(
-                name="memo",
-                value=pyntelope.types.String(memo),
-            ),
-        ]
-        auth = pyntelope.Authorization(
-            actor=self.collection_wallet, permission="active"
-        )
-        action = pyntelope.Action(
-            account="atomicassets",  # this is the contract account
-            name="transfer",  # this is the action name
-            data=data,
-            authorization=[auth],
-        )
-        return action
+        return self.action_templates.transfer(from_wallet, to, asset_ids, memo)
 
     def _prepare_mint_transaction(
         self,
@@ -208,13 +452,23 @@ class AssetSender:
                 Always 8 digits after period and one space before the token symbol.
         :return: Ready Action object.
         """
+        logger.info("Creating mint transaction...")
+        # The constant fields of actions without data are serialized once per template
+        if not immutable_data and not mutable_data:
+            return self.action_templates.mint(
+                authorized_minter,
+                collection_name,
+                schema_name,
+                template_id,
+                new_asset_owner,
+                tokens_to_back,
+            )
         # workaround for passing mutable default argument
         if immutable_data is None:
             immutable_data = []
         if mutable_data is None:
             mutable_data = []
 
-        logger.info("Creating mint transaction...")
         data = [
             pyntelope.Data(
                 name="authorized_minter",
@@ -264,59 +518,407 @@ class AssetSender:
         )
         return action
 
+    @property
+    def max_actions_per_transaction(self) -> int:
+        """
+        :return: how many dispatching actions fit into one transaction besides the nonce action
+        """
+        if self.unique_transactions:
+            return MAX_ACTIONS_PER_TRANSACTION - 1
+        return MAX_ACTIONS_PER_TRANSACTION
+
+    def _prepare_nonce_action(self):
+        """
+        :return: Action object with random data which makes the transaction unique
+        """
+        return pyntelope.Action(
+            account=NONCE_ACCOUNT,
+            name=NONCE_ACTION,
+            data=[
+                pyntelope.Data(
+                    name="value",
+                    value=pyntelope.types.String(uuid.uuid4().hex),
+                )
+            ],
+            authorization=self.action_templates.authorization,
+        )
+
+    def _prepare_transaction(self, actions: list) -> pyntelope.Transaction:
+        """
+        :param actions: list of Action objects
+        :return: Transaction object with the nonce action at the end if unique_transactions is on
+        """
+        if self.unique_transactions:
+            actions = list(actions) + [self._prepare_nonce_action()]
+        return pyntelope.Transaction(actions=actions)
+
+    def _pause_between_transactions(self):
+        """
+        Sleep in order to get rid of "duplicate transaction" error if transactions aren't unique
+        """
+        if not self.unique_transactions:
+            time.sleep(DUPLICATE_TRANSACTION_DELAY)
+
+    def _cap_batch_size(self, action, batch_size: int) -> int:
+        """
+        Limits the number of identical actions per transaction by the CPU and size budget
+        :param action: Action object which is going to be repeated in the transaction
+        :param batch_size: requested number of actions per transaction
+        :return: number of actions which fit into one transaction. At least 1.
+        """
+        cpu_cost, action_size = self._estimate_action_cost(action)
+        capped_batch_size = min(
+            batch_size,
+            self.max_actions_per_transaction,
+            self.transaction_cpu_budget // cpu_cost,
+            TRANSACTION_SIZE_BUDGET // max(action_size, 1),
+        )
+        return max(capped_batch_size, 1)
+
+    @staticmethod
+    def _estimate_action_cost(action) -> Tuple[int, int]:
+        """
+        :param action: Action object
+        :return: estimated CPU cost in microseconds, size of serialized action data in bytes
+        """
+        cpu_cost = ACTION_CPU_COST_US.get(action.name, max(ACTION_CPU_COST_US.values()))
+        action_size = sum(len(bytes(data)) for data in action.data)
+        return cpu_cost, action_size
+
+    def _pack_actions(self, items: list, batch_size: int) -> Iterator[list]:
+        """
+        Splits actions into groups which fit into one transaction by the CPU and size budget
+        and the batch size of the rate controller
+        :param items: list of tuples with Action object on the last place
+        :param batch_size: maximum number of actions per transaction
+        :return: generator of lists with items
+        """
+        limit = max(min(batch_size, self.max_actions_per_transaction), 1)
+        max_actions = limit
+        batch = []
+        batch_cpu = batch_size_bytes = 0
+        for item in items:
+            cpu_cost, action_size = self._estimate_action_cost(item[-1])
+            if batch and (
+                len(batch) >= max_actions
+                or batch_cpu + cpu_cost > self.transaction_cpu_budget
+                or batch_size_bytes + action_size > TRANSACTION_SIZE_BUDGET
+            ):
+                yield batch
+                batch = []
+                batch_cpu = batch_size_bytes = 0
+            if not batch:
+                # Sized when the batch is started, so it follows the rate controller while the previous ones are sent
+                max_actions = self.rate_controller.batch_size(limit, cpu_cost)
+            batch.append(item)
+            batch_cpu += cpu_cost
+            batch_size_bytes += action_size
+        if batch:
+            yield batch
+
     def _send_transaction(self, action):
         """
         Sends transaction into blockchain.
         :param action: Action object.
         :return: Tuple with asset ID(s) and TX ID/False(if TX failed).
         """
-        raw_transaction = pyntelope.Transaction(actions=[action])
+        return self._send_batch_transaction([action])[0]
+
+    def _send_batch_transaction(self, actions: list) -> list:
+        """
+        Sends several actions into blockchain within one transaction.
+        :param actions: list of Action objects. No more than max_actions_per_transaction.
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action.
+        """
+        _, resp = self._push_transaction(actions)
+        return self._parse_push_response(resp, len(actions))
+
+    def _push_transaction(self, actions: list) -> Tuple[str, dict]:
+        """
+        Builds, links, signs and pushes the transaction
+        :param actions: list of Action objects. No more than max_actions_per_transaction.
+        :return: ID of the transaction, reply of the blockchain node
+        """
+        transaction_id, signed_transaction = self._sign_transaction(actions)
+        return transaction_id, self._push_signed_transaction(signed_transaction)
+
+    def _sign_transaction(
+        self, actions: list
+    ) -> Tuple[str, pyntelope.SignedTransaction]:
+        """
+        Builds, links and signs the transaction
+        :param actions: list of Action objects. No more than max_actions_per_transaction.
+        :return: ID of the transaction, SignedTransaction object
+        """
+        with self.metrics.timer("build"):
+            raw_transaction = self._prepare_transaction(actions)
         logger.debug("Linking transaction to the network...")
-        if self.testnet:
-            net = pyntelope.WaxTestnet()  # this is an alias for WAX testnet node
-        else:
-            net = pyntelope.WaxMainnet()  # this is an alias for WAX mainnet node
-        linked_transaction = raw_transaction.link(net=net)
+        with self.metrics.timer("link"):
+            linked_transaction = raw_transaction.link(net=self.net)
         logger.debug("Signing transaction...")
-        signed_transaction = linked_transaction.sign(key=self.private_key)
+        with self.metrics.timer("sign"):
+            signed_transaction = linked_transaction.sign(key=self.private_key)
+        return signed_transaction.id(), signed_transaction
+
+    def _push_signed_transaction(
+        self, signed_transaction: pyntelope.SignedTransaction
+    ) -> dict:
+        """
+        :param signed_transaction: SignedTransaction object
+        :return: reply of the blockchain node
+        """
         logger.debug("Sending transaction to the blockchain...")
-        resp = signed_transaction.send()
+        with self.metrics.timer("send"):
+            resp = signed_transaction.send()
         # logger.debug(json.dumps(resp))
+        self._record_push_failure(resp)
+        return resp
+
+    def _send_with_retries(self, actions: list) -> list:
+        """
+        Sends actions within one transaction when the rate controller allows it. Retries the transaction
+        while the retry budget of the error class isn't exhausted. Every transaction has its own budget.
+        :param actions: list of Action objects. No more than max_actions_per_transaction.
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action.
+        """
+        retries = self.rate_controller.retry_budget()
+        while True:
+            self._refresh_resources()
+            time.sleep(self.rate_controller.reserve())
+            transaction_id = None
+            try:
+                transaction_id, signed_transaction = self._sign_transaction(actions)
+                resp = self._push_signed_transaction(signed_transaction)
+            except exc.ConnectionError as error:
+                logger.error(f"Couldn't send transaction: {error}")
+                # Nothing was pushed if linking the transaction failed
+                error_class = classify_exception(error) if transaction_id else "network"
+                results = [("None", False)] * len(actions)
+            else:
+                error_class = classify_push_error(resp)
+                results = self._parse_push_response(resp, len(actions))
+            if error_class is None:
+                self.rate_controller.record_success(self._cpu_usage(resp))
+                return results
+            self.rate_controller.record_failure(error_class)
+            if self._may_be_pushed(error_class):
+                return self._settle_pushed(transaction_id, len(actions))
+            wait_time = self.rate_controller.next_retry(retries, error_class)
+            if wait_time is None:
+                logger.error(
+                    f"No retries left for '{error_class}' errors. Giving up..."
+                )
+                return results
+            if error_class == "expired":
+                self.net.invalidate_chain_info()
+            self.metrics.retry("send", error_class)
+            logger.warning(
+                f"Transaction failed with '{error_class}' error. Will retry in {wait_time} seconds..."
+            )
+            time.sleep(wait_time)
+
+    def _may_be_pushed(self, error_class: str) -> bool:
+        """
+        Unique transactions are rejected as duplicates only if the node already got the very same signed
+        transaction, e.g. pushed again after failing over to the next node. A transaction whose push timed out
+        may have reached the node as well. Sending them again could mint twice.
+        :param error_class: class of the error of the failed transaction
+        :return: True if the transaction has to be looked up in the account history instead of being retried
+        """
+        return error_class == "timeout" or (
+            error_class == "duplicate" and self.unique_transactions
+        )
+
+    def _settle_pushed(self, transaction_id: str, actions_count: int) -> list:
+        """
+        Waits for the transaction which may have been pushed in the account history
+        :param transaction_id: ID of the transaction
+        :param actions_count: number of actions in the transaction
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX wasn't found) for every action.
+        """
+        logger.warning(
+            f"Transaction {transaction_id} may have been pushed. Waiting for it in the account history..."
+        )
+        try:
+            confirmation = self.confirmations.track(transaction_id).result()
+        except TimeoutError as error:
+            logger.error(error)
+            return [("None", False)] * actions_count
+        except CancelledError:
+            # The tracker was closed before the transaction was found
+            logger.error(f"Transaction {transaction_id} wasn't confirmed")
+            return [("None", False)] * actions_count
+        self.rate_controller.record_success()
+        return self._confirmed_results(confirmation, actions_count)
+
+    @staticmethod
+    def _confirmed_results(confirmation, actions_count: int) -> list:
+        """
+        :param confirmation: Confirmation of the transaction
+        :param actions_count: number of actions in the transaction
+        :return: list with tuple of asset ID and TX ID for every action. Asset IDs are 'None'
+                 unless every action minted one.
+        """
+        asset_ids = confirmation.asset_ids
+        if len(asset_ids) != actions_count:
+            asset_ids = ["None"] * actions_count
+        return [(asset_id, confirmation.transaction_id) for asset_id in asset_ids]
+
+    @staticmethod
+    def _cpu_usage(resp: dict) -> int:
+        """
+        :param resp: reply of the blockchain node to the accepted transaction
+        :return: CPU used by the transaction in microseconds or 0 if the reply doesn't have it
+        """
+        receipt = resp.get("processed", {}).get("receipt") or {}
+        return int(receipt.get("cpu_usage_us", 0))
+
+    def _refresh_resources(self):
+        """
+        Lets the rate controller know CPU/NET of the account if the known ones are outdated
+        """
+        if not self.rate_controller.resources_stale():
+            return
+        try:
+            account = self.net.get_account(account_name=self.collection_wallet)
+        except exc.ConnectionError as error:
+            logger.warning(
+                f"Couldn't get resources of '{self.collection_wallet}': {error}"
+            )
+            account = None
+        self.rate_controller.observe_account(account)
+
+    def _record_push_failure(self, resp: dict):
+        """
+        Reports the error name of a rejected transaction, e.g. "tx_cpu_usage_exceeded", to the metrics hooks
+        :param resp: reply of the blockchain node to the pushed transaction
+        """
+        if self.metrics.hooks and "transaction_id" not in resp:
+            error = resp.get("error")
+            reason = (
+                error.get("name", "unknown") if isinstance(error, dict) else "unknown"
+            )
+            self.metrics.failure("send", reason)
+
+    @staticmethod
+    def _parse_push_response(resp: dict, actions_count: int) -> list:
+        """
+        :param resp: reply of the blockchain node to the pushed transaction
+        :param actions_count: number of actions in the transaction
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action.
+        """
+        failed = [("None", False)] * actions_count
         try:
             transaction_id = resp["transaction_id"]
         except KeyError:
             error_message = resp["error"]["details"][0]["message"]
             logger.error(error_message)
-            return "None", False
+            return failed
 
-        asset_id = "None"
+        results = []
         try:
-            if resp["processed"]["action_traces"][0]["act"]["name"] == "transfer":
-                asset_id = tuple(
-                    resp["processed"]["action_traces"][0]["inline_traces"][2]["act"][
-                        "data"
-                    ]["asset_ids"]
-                )
+            # Skip inline actions if the node returns flattened traces
+            root_action_traces = [
+                action_trace
+                for action_trace in resp["processed"]["action_traces"]
+                if not action_trace.get("creator_action_ordinal")
+            ]
+            for action_trace in root_action_traces[:actions_count]:
+                asset_id = "None"
+                if action_trace["act"]["name"] == "transfer":
+                    asset_id = tuple(
+                        action_trace["inline_traces"][2]["act"]["data"]["asset_ids"]
+                    )
+                elif action_trace["act"]["name"] == "mintasset":
+                    asset_id = AssetSender._parse_logmint_asset_id(action_trace)
+                results.append((asset_id, transaction_id))
         except KeyError:
             error_message = resp["error"]["details"][0]["message"]
             logger.error(error_message)
-            return "None", False
-            
-        return asset_id, transaction_id
+            return failed
+
+        return results
+
+    @staticmethod
+    def _parse_logmint_asset_id(action_trace: dict) -> str:
+        """
+        :param action_trace: trace of the mintasset action
+        :return: asset ID from the inline logmint action or 'None' if the trace doesn't have it
+        """
+        for inline_trace in action_trace.get("inline_traces", []):
+            act = inline_trace.get("act", {})
+            if act.get("name") == "logmint" and isinstance(act.get("data"), dict):
+                asset_id = act["data"].get("asset_id")
+                if asset_id:
+                    return str(asset_id)
+        return "None"
 
     def send_or_mint_assets(
         self,
         schema_template_list: Iterable[Tuple[str, str]],
         wallet: str,
         memo: str = "",
+        batch_size: int = 1,
     ) -> list:
         """
         :param schema_template_list: list or tuple of tuples containing schema names and template IDs
          e.g. [("rawmaterials", "318738"), ("magmaterials", "416529")]
         :param wallet: recipient wallet
         :param memo: transaction memo
+        :param batch_size: how many mintasset actions to pack into one transaction, same as in mint_assets()
         :return: tuple of list with asset IDs / id-schema-template tuples + hash of successful transaction or False
         """
+        self._validate_order(schema_template_list, wallet)
+        schemas_templates_quantities = self._collapse_identical_schemas_templates(
+            schema_template_list
+        )
+        logger.info(
+            f"*** Requested to send {schemas_templates_quantities} to the wallet '{wallet}'"
+        )
+        if self.inventory is not None:
+            self.inventory.refresh_stale(
+                schema_template[1]
+                for schema_template, _ in schemas_templates_quantities
+            )
+            find_assets = self.inventory.reserve
+        else:
+            assets_index = self._index_assets_by_template(
+                self._get_available_assets_for(schemas_templates_quantities)
+            )
+            find_assets = partial(self._find_assets_with_highest_mints, assets_index)
+
+        assets_to_send = []
+        successful_tx = []
+        try:
+            for schema_template, quantity in schemas_templates_quantities:
+                schema = schema_template[0]
+                template = schema_template[1]
+                logger.info(
+                    f"Searching in stock for {quantity} asset(s) with template '{template}'"
+                )
+                found_assets, need_to_mint = find_assets(template, quantity)
+                if found_assets:
+                    assets_to_send.extend(found_assets)
+                if need_to_mint > 0:
+                    successful_tx += self.mint_assets(
+                        schema, template, wallet, need_to_mint, batch_size
+                    )
+            if assets_to_send:
+                successful_tx.append(self.send_assets(assets_to_send, wallet, memo))
+        except BaseException:
+            if self.inventory is not None:
+                self.inventory.release(assets_to_send)
+            raise
+        return successful_tx
+
+    def _validate_order(
+        self, schema_template_list: Iterable[Tuple[str, str]], wallet: str
+    ):
+        """
+        Raises ValueError if the order can't be dispatched
+        :param schema_template_list: list or tuple of tuples containing schema names and template IDs
+        :param wallet: recipient wallet
+        """
         if not schema_template_list:
             logger.error("Schema-template list is empty!")
             raise ValueError("Schema-template can't be empty!")
@@ -326,37 +928,240 @@ class AssetSender:
         if wallet == self.collection_wallet:
             logger.error("Can't transfer assets to yourself!")
             raise ValueError("Can't transfer assets to yourself!")
+        if not ACCOUNT_NAME_PATTERN.fullmatch(wallet):
+            logger.error(f"Wallet '{wallet}' isn't a valid account name!")
+            raise ValueError(f"Wallet '{wallet}' isn't a valid account name!")
+        for schema, _ in schema_template_list:
+            if not ACCOUNT_NAME_PATTERN.fullmatch(schema):
+                logger.error(f"Schema '{schema}' isn't a valid name!")
+                raise ValueError(f"Schema '{schema}' isn't a valid name!")
 
-        schemas_templates_quantities = self._collapse_identical_schemas_templates(
-            schema_template_list
-        )
-        logger.info(
-            f"*** Requested to send {schemas_templates_quantities} to the wallet '{wallet}'"
-        )
-        # Make a request to blockchain to get available assets with given template_ids
-        api_response = self._get_available_assets(schema_template_list)
-
-        assets_to_send = []
-        successful_tx = []
+    def _get_available_assets_for(self, schemas_templates_quantities) -> list:
+        """
+        Make requests to blockchain to get available assets until enough assets are found for every template
+        :param schemas_templates_quantities: schemas-templates and their quantities.
+                 E.g. dict_items([(("rawmaterials", "318738"), 2), (("magmaterials", "416529"), 1)])
+        :return: list with AssetRecord of found assets
+        """
+        still_needed = Counter()
         for schema_template, quantity in schemas_templates_quantities:
-            schema = schema_template[0]
-            template = schema_template[1]
-            logger.info(
-                f"Searching in stock for {quantity} asset(s) with template '{template}'"
+            still_needed[schema_template[1]] += quantity
+        api_response = []
+        with self.metrics.timer("get_available_assets"):
+            for asset in self._iter_available_assets(
+                schema_template for schema_template, _ in schemas_templates_quantities
+            ):
+                api_response.append(asset)
+                still_needed[asset.template_id] -= 1
+                if all(quantity <= 0 for quantity in still_needed.values()):
+                    break
+        return api_response
+
+    def dispatch_many(
+        self,
+        orders: Iterable[Tuple[str, Iterable[Tuple[str, str]], str]],
+        batch_size: int = MAX_ACTIONS_PER_TRANSACTION,
+    ) -> list:
+        """
+        Sends or mints assets for many recipients at once. Available assets are requested once for all orders,
+        and transfer and mint actions of different orders are packed into as few transactions as possible.
+        :param orders: list of (recipient wallet, schema-template list, memo) tuples.
+                E.g. [("recipient.wam", [("rawmaterials", "318738")], "Season reward")]
+        :param batch_size: maximum number of actions per transaction. Capped by max_actions_per_transaction
+                and the transaction CPU/size budget.
+        :return: list with the result of send_or_mint_assets() for every order, in the same order
+        """
+        orders, orders_quantities, total_quantities = self._prepare_orders(orders)
+        if self.inventory is not None:
+            self.inventory.refresh_stale(
+                schema_template[1] for schema_template in total_quantities
             )
-            found_assets, need_to_mint = self._find_assets_with_highest_mints(
-                api_response, template, quantity
+            find_assets = self.inventory.reserve
+        else:
+            assets_index = self._index_assets_by_template(
+                self._get_available_assets_for(total_quantities.items())
             )
-            if found_assets:
-                assets_to_send.extend(found_assets)
-            if need_to_mint > 0:
-                successful_tx += self.mint_assets(
-                    schema, template, wallet, need_to_mint
-                )
+            find_assets = partial(self._find_assets_with_highest_mints, assets_index)
 
-        if assets_to_send:
-            successful_tx.append(self.send_assets(assets_to_send, wallet, memo))
-        return successful_tx
+        results = [[] for _ in orders]
+        mints = []
+        transfers = []
+        # Reservations of mints and transfers which aren't settled yet are released if anything fails
+        settled_mints = settled = 0
+        try:
+            self._plan_orders(
+                orders, orders_quantities, find_assets, results, mints, transfers
+            )
+            for batch, batch_results in self._send_batches(
+                self._pack_actions(mints, batch_size)
+            ):
+                self._settle_mint_batch(batch, batch_results, results)
+                settled_mints += len(batch)
+                self._pause_between_transactions()
+
+            for batch, batch_results in self._send_batches(
+                self._pack_actions(transfers, batch_size)
+            ):
+                logger.info(f"Sent assets of {len(batch)} order(s) in one transaction")
+                for (order_number, assets_to_send, _), (
+                    asset_ids,
+                    tx_return_status,
+                ) in zip(batch, batch_results):
+                    results[order_number].append(
+                        self._settle_transfer(
+                            assets_to_send,
+                            orders[order_number][0],
+                            asset_ids,
+                            tx_return_status,
+                        )
+                    )
+                    settled += 1
+        except BaseException:
+            self._release_unsent(mints[settled_mints:], transfers[settled:])
+            raise
+        return results
+
+    def _release_unsent(self, mints: list, transfers: list):
+        """
+        Returns reservations of actions of dispatch_many() which weren't sent
+        :param mints: (order number, schema, template, Action) tuples
+        :param transfers: (order number, reserved asset IDs, Action) tuples
+        """
+        if self.inventory is not None:
+            for _, assets_to_send, _ in transfers:
+                self.inventory.release(assets_to_send)
+        for template, quantity in Counter(
+            template for _, _, template, _ in mints
+        ).items():
+            self._release_mints(template, quantity)
+
+    def _prepare_orders(self, orders: Iterable[tuple]) -> Tuple[list, list, Counter]:
+        """
+        Validates orders of dispatch_many() and counts the requested assets. Invalid orders fail alone.
+        :param orders: list of (recipient wallet, schema-template list, memo) tuples. Memo is optional.
+        :return: orders with memo, schemas-templates and their quantities for every order or None
+                 if the order is invalid, quantities of every schema-template in all valid orders
+        """
+        orders = [
+            (order[0], order[1], order[2] if len(order) > 2 else "") for order in orders
+        ]
+        orders_quantities = []
+        total_quantities = Counter()
+        for wallet, schema_template_list, _ in orders:
+            try:
+                self._validate_order(schema_template_list, wallet)
+            except ValueError:
+                orders_quantities.append(None)
+                continue
+            schemas_templates_quantities = list(
+                self._collapse_identical_schemas_templates(schema_template_list)
+            )
+            orders_quantities.append(schemas_templates_quantities)
+            total_quantities.update(dict(schemas_templates_quantities))
+        logger.info(
+            f"*** Requested to dispatch {sum(total_quantities.values())} asset(s) to {len(orders)} wallet(s)"
+        )
+        return orders, orders_quantities, total_quantities
+
+    def _plan_orders(
+        self,
+        orders: list,
+        orders_quantities: list,
+        find_assets: Callable,
+        results: list,
+        mints: list,
+        transfers: list,
+    ):
+        """
+        Reserves available assets for every order and prepares the mint and transfer actions. If preparing
+        an order fails, its reservations are released and the error is raised.
+        :param orders: result of _prepare_orders()
+        :param orders_quantities: result of _prepare_orders()
+        :param find_assets: returns assets found for a template and how many need to be minted
+        :param results: results of orders. Rejected orders and mints are added to them.
+        :param mints: (order number, schema, template, Action) tuples are added to it
+        :param transfers: (order number, reserved asset IDs, Action) tuples are added to it
+        """
+        for order_number, (wallet, schema_template_list, memo) in enumerate(orders):
+            if orders_quantities[order_number] is None:
+                results[order_number] += [
+                    ((None, schema, template), False)
+                    for schema, template in schema_template_list
+                ]
+                continue
+            assets_to_send = []
+            reserved_mints = []
+            order_mints = []
+            try:
+                for (schema, template), quantity in orders_quantities[order_number]:
+                    found_assets, need_to_mint = find_assets(template, quantity)
+                    assets_to_send.extend(found_assets)
+                    allowed_to_mint = self._reserve_mints(
+                        schema, template, need_to_mint
+                    )
+                    reserved_mints.append((template, allowed_to_mint))
+                    results[order_number] += self._reject_mints(
+                        schema, template, need_to_mint - allowed_to_mint
+                    )
+                    if allowed_to_mint > 0:
+                        action = self._prepare_mint_transaction(
+                            self.collection_wallet,
+                            self.collection,
+                            schema,
+                            template,
+                            wallet,
+                        )
+                        order_mints += [
+                            (order_number, schema, template, action)
+                        ] * allowed_to_mint
+                transfer = None
+                if assets_to_send:
+                    transfer = self._prepare_transfer_transaction(
+                        assets_to_send, wallet, self.collection_wallet, memo
+                    )
+            except BaseException:
+                if self.inventory is not None:
+                    self.inventory.release(assets_to_send)
+                for template, quantity in reserved_mints:
+                    self._release_mints(template, quantity)
+                raise
+            mints += order_mints
+            if transfer is not None:
+                transfers.append((order_number, assets_to_send, transfer))
+
+    def _settle_mint_batch(self, batch: list, batch_results: list, results: list):
+        """
+        Adds results of one minting transaction of dispatch_many() to the results of the orders
+        :param batch: (order number, schema, template, Action) tuples of the transaction
+        :param batch_results: tuple of asset ID and TX ID/False for every action
+        :param results: results of orders
+        """
+        logger.info(f"Sent {len(batch)} mint action(s) in one transaction")
+        for (order_number, schema, template, _), result in zip(batch, batch_results):
+            txs = self._collect_mint_results([result], schema, template)
+            self._release_failed_mints(template, txs)
+            results[order_number] += txs
+
+    def _send_batches(self, batches: Iterable[list]) -> Iterator[Tuple[list, list]]:
+        """
+        Sends every batch made by _pack_actions() within one transaction. Goes through the pipeline if it's on.
+        :param batches: lists of tuples with Action object on the last place
+        :return: generator of (batch, list with tuple of asset ID(s) and TX ID/False for every action)
+                 in the order of batches
+        """
+        if self.pipeline is not None:
+            yield from self.pipeline.run(batches)
+            return
+        for batch in batches:
+            yield batch, self._send_packed_actions(batch)
+
+    def _send_packed_actions(self, batch: list) -> list:
+        """
+        Sends actions packed by _pack_actions() within one transaction
+        :param batch: list of tuples with Action object on the last place
+        :return: list with tuple of asset ID(s) and TX ID/False(if TX failed) for every action.
+        """
+        return self._send_with_retries([item[-1] for item in batch])
 
     def send_assets(
         self,
@@ -374,13 +1179,37 @@ class AssetSender:
         logger.info(
             f"Going to send following assets: {assets_to_send} to the wallet '{wallet}'"
         )
-        asset_ids, tx_return_status = self._send_transaction(
-            self._prepare_transfer_transaction(
-                assets_to_send, wallet, self.collection_wallet, memo
-            )
+        asset_ids, tx_return_status = self._send_with_retries(
+            [
+                self._prepare_transfer_transaction(
+                    assets_to_send, wallet, self.collection_wallet, memo
+                )
+            ]
+        )[0]
+        return self._settle_transfer(
+            assets_to_send, wallet, asset_ids, tx_return_status
         )
+
+    def _settle_transfer(
+        self, assets_to_send: Iterable[any], wallet: str, asset_ids, tx_return_status
+    ) -> tuple:
+        """
+        Updates reservations of the inventory cache and logs the result of the transfer
+        :param assets_to_send: asset IDs which were sent
+        :param wallet: blockchain wallet
+        :param asset_ids: asset IDs found in the transaction or 'None' if the node didn't return them
+        :param tx_return_status: TX ID or False
+        :return: tuple of list with asset IDs + hash of successful transaction or False
+        """
+        if self.inventory is not None:
+            if tx_return_status:
+                self.inventory.commit(assets_to_send)
+            else:
+                self.inventory.release(assets_to_send)
         if tx_return_status:
             logger.info(f"Successfully sent: {tx_return_status}")
+            if asset_ids == "None":
+                asset_ids = tuple(assets_to_send)
             return asset_ids, tx_return_status
         else:
             logger.critical(
@@ -394,78 +1223,144 @@ class AssetSender:
         template: str,
         wallet: str,
         quantity: int = 1,
+        batch_size: int = 1,
     ) -> list:
         """
-        Mints given number of assets with given schema and template. If gets 'duplicate transaction' error will wait
-        fot TIMEOUT seconds and do RETRIES attempts of retries. Always return 'None' instead of asset ID.
+        Mints given number of assets with given schema and template. Transactions are paced and failed ones
+        are retried by the rate controller. Asset ID is taken from the logmint trace
+        of the transaction and is 'None' if the blockchain node didn't return it.
         :param schema: self-explanatory
         :param template: self-explanatory
         :param wallet: recipient wallet
         :param quantity: how many assets of the same template needs to be minted
+        :param batch_size: how many mintasset actions to pack into one transaction. Capped by
+                max_actions_per_transaction and the transaction CPU/size budget.
         :return: list of id-schema-template tuples + hashes of successful transactions or False
         """
         logger.info(
             f"Going to mint {quantity} assets with template '{template}', schema '{schema}' to the wallet '{wallet}'"
         )
-        minted_quantity = 0
+        allowed_quantity = self._reserve_mints(schema, template, quantity)
+        rejected = self._reject_mints(schema, template, quantity - allowed_quantity)
+        quantity = allowed_quantity
         txs = []
-        retry = 0
-        wait_time = TIMEOUT
-        while minted_quantity < quantity:
-            try:
-                asset_id, minting_tx = self._send_transaction(
-                    self._prepare_mint_transaction(
-                        self.collection_wallet,
-                        self.collection,
-                        schema,
-                        template,
-                        wallet,
-                    )
-                )
-            except exc.ConnectionError:
-                logger.error(
-                    f"Couldn't mint '{schema}, {template}'. Will retry in {wait_time} seconds..."
+        try:
+            if self.pipeline is not None:
+                for batch_txs in self._mint_assets_pipelined(
+                    schema, template, wallet, quantity, batch_size
+                ):
+                    txs += batch_txs
+            else:
+                minted_quantity = 0
+                action = self._prepare_mint_transaction(
+                    self.collection_wallet,
+                    self.collection,
+                    schema,
+                    template,
+                    wallet,
                 )
-                # Sleep in order to get rid of "duplicate transaction" error
-                time.sleep(wait_time)
-                wait_time *= 2
-                retry += 1
-                if retry <= RETRIES:
-                    continue
-                logger.error(f"Reached {retry} retries. Giving up...")
-                minting_tx = False
-            except UnboundLocalError:
-                logger.error(
-                    f"Couldn't mint '{schema}, {template}'. Will retry in {wait_time} seconds..."
+                cpu_cost, _ = self._estimate_action_cost(action)
+                while minted_quantity < quantity:
+                    actions_in_batch = min(
+                        self.rate_controller.batch_size(
+                            self._cap_batch_size(action, batch_size), cpu_cost
+                        ),
+                        quantity - minted_quantity,
+                    )
+                    results = self._send_with_retries([action] * actions_in_batch)
+                    # Mints which the node didn't return results for are counted as failed
+                    results += [("None", False)] * (actions_in_batch - len(results))
+                    txs += self._collect_mint_results(results, schema, template)
+                    minted_quantity += actions_in_batch
+                    self._pause_between_transactions()
+        except BaseException:
+            # Supply of mints which weren't sent is given back along with the failed ones
+            self._release_mints(template, quantity - len(txs))
+            raise
+        finally:
+            self._release_failed_mints(template, txs)
+        return txs + rejected
+
+    def _mint_assets_pipelined(
+        self, schema: str, template: str, wallet: str, quantity: int, batch_size: int
+    ) -> Iterator[list]:
+        """
+        Same as mint_assets() but the transactions are signed and pushed through the pipeline
+        :return: generator of results of _collect_mint_results() for every transaction
+        """
+        action = self._prepare_mint_transaction(
+            self.collection_wallet,
+            self.collection,
+            schema,
+            template,
+            wallet,
+        )
+        max_actions = self._cap_batch_size(action, batch_size)
+        cpu_cost, _ = self._estimate_action_cost(action)
+
+        def batches():
+            minted_quantity = 0
+            while minted_quantity < quantity:
+                # Sized when the transaction is built, so it follows the rate controller like mint_assets()
+                actions_in_batch = min(
+                    self.rate_controller.batch_size(max_actions, cpu_cost),
+                    quantity - minted_quantity,
                 )
-                time.sleep(wait_time)
-                wait_time *= 2
-                retry += 1
-                if retry <= RETRIES:
-                    continue
-                logger.error(f"Reached {retry} retries. Giving up...")
-                minting_tx = False
-                
-            if minting_tx and minting_tx not in txs:
+                yield [(action,)] * actions_in_batch
+                minted_quantity += actions_in_batch
+
+        for _, results in self.pipeline.run(batches()):
+            yield self._collect_mint_results(results, schema, template)
+
+    def _reserve_mints(self, schema: str, template: str, quantity: int) -> int:
+        """
+        :return: how many of the mints are possible according to the template cache
+        """
+        if self.templates is None or quantity <= 0:
+            return quantity
+        return self.templates.reserve(schema, template, quantity)
+
+    def _release_failed_mints(self, template: str, txs: list):
+        """
+        Returns supply of failed mints to the template cache
+        :param txs: result of _collect_mint_results()
+        """
+        self._release_mints(template, sum(not minting_tx for _, minting_tx in txs))
+
+    def _release_mints(self, template: str, quantity: int):
+        """
+        Returns supply of mints which weren't made to the template cache
+        """
+        if self.templates is not None and quantity > 0:
+            self.templates.release(template, quantity)
+
+    @staticmethod
+    def _reject_mints(schema: str, template: str, quantity: int) -> list:
+        """
+        :return: results of mints rejected without pushing a transaction
+        """
+        return [((None, schema, template), False)] * quantity
+
+    @staticmethod
+    def _collect_mint_results(results: list, schema: str, template: str) -> list:
+        """
+        :param results: list with tuple of asset ID and TX ID/False for every mintasset action
+        :param schema: self-explanatory
+        :param template: self-explanatory
+        :return: list of id-schema-template tuples + hashes of successful transactions or False
+        """
+        txs = []
+        for asset_id, minting_tx in results:
+            if minting_tx:
                 logger.info(
                     f"Successfully minted ({asset_id}, {schema}, {template}): {minting_tx}"
                 )
-                minted_quantity += 1
-                retry = 0
-                wait_time = TIMEOUT
                 txs.append(((asset_id, schema, template), minting_tx))
-                # Sleep in order to get rid of "duplicate transaction" error
-                time.sleep(2)
-            elif not minting_tx:
+            else:
                 logger.error(
                     f"Failed to mint asset with schema '{schema}' and template '{template}'!"
                 )
-                minted_quantity += 1
-                retry = 0
-                wait_time = TIMEOUT
                 txs.append(((None, schema, template), False))
-                # Sleep in order to get rid of "duplicate transaction" error
-                time.sleep(2)
         return txs
 
     def mint_assets_and_get_ids(
@@ -474,41 +1369,134 @@ class AssetSender:
         template: str,
         wallet: str,
         quantity: int = 1,
+        batch_size: int = 1,
     ) -> list:
         """
-        Same as mint_asset() but makes separate request to blockchain to fetch the real ID of minted asset.
+        Same as mint_asset() but makes sure the real ID of every minted asset is known. IDs which are missing
+        in the transaction traces are found in the account history, which is polled for all transactions at once.
         :param schema: self-explanatory
         :param template: self-explanatory
         :param wallet: recipient wallet
         :param quantity: how many assets of the same template needs to be minted
+        :param batch_size: how many mintasset actions to pack into one transaction, same as in mint_assets()
         :return: list of id-schema-template tuples + hashes of successful transactions or False
         """
-        output_list = self.mint_assets(schema, template, wallet, quantity)
-        new_output_list = []
-        logger.info("Minting finished. Now gonna try to fetch IDs.")
-        for asset in output_list:
-            transaction_id = asset[1]
-            retry = 0
-            max_retries = RETRIES + 2
-            wait_time = TIMEOUT
-            asset_id = False
-            while retry <= max_retries:
-                time.sleep(wait_time)
-                try:
-                    asset_id = self._get_right_asset_id(transaction_id)
-                except KeyError:
-                    retry += 1
-                    wait_time += 2
-                    logger.error(
-                        f"Try nr.{retry}: didn't find the transaction on blockchain. "
-                        f"Will try again in {wait_time} seconds..."
+        output_list = self.mint_assets(schema, template, wallet, quantity, batch_size)
+        new_output_list = list(output_list)
+        pending = self._pending_minted_assets(output_list)
+        if pending:
+            logger.info(
+                "Minting finished. Now gonna wait for confirmation of transactions."
+            )
+            futures = self.confirmations.track_many(
+                (asset[1] for asset in pending.values()), recipient=wallet
+            )
+            with self.metrics.timer("confirm"):
+                confirmed_ids = {
+                    tx_id: self._confirmed_asset_ids(future)
+                    for tx_id, future in futures.items()
+                }
+            self._apply_confirmed_ids(new_output_list, pending, confirmed_ids)
+        if pending:
+            # Transactions whose logmint actions aren't in the account history are requested one by one
+            with ThreadPoolExecutor(
+                max_workers=min(len(pending), HISTORY_WORKERS)
+            ) as executor:
+                found_ids = dict(
+                    zip(
+                        list(pending),
+                        executor.map(
+                            self._try_get_right_asset_id,
+                            [asset[1] for asset in pending.values()],
+                        ),
                     )
-                else:
-                    break
-            if asset_id:
-                new_output_list.append(
-                    ((asset_id, asset[0][1], asset[0][2]), transaction_id)
                 )
-            else:
-                raise ValueError("Couldn't fetch ID! Blockchain is too slow!")
+            for asset_number, asset_id in found_ids.items():
+                if asset_id:
+                    asset = pending.pop(asset_number)
+                    new_output_list[asset_number] = (
+                        (asset_id, asset[0][1], asset[0][2]),
+                        asset[1],
+                    )
+        if pending:
+            raise ValueError("Couldn't fetch ID! Blockchain is too slow!")
         return new_output_list
+
+    @staticmethod
+    def _pending_minted_assets(output_list: list) -> Dict[int, tuple]:
+        """
+        :param output_list: result of mint_assets()
+        :return: successfully minted assets without ID in the transaction trace by their position in the list
+        """
+        return {
+            asset_number: asset
+            for asset_number, asset in enumerate(output_list)
+            if asset[0][0] in (None, "None") and asset[1]
+        }
+
+    @staticmethod
+    def _confirmed_asset_ids(future) -> list:
+        """
+        :param future: future of ConfirmationTracker.track()
+        :return: IDs of assets minted by the transaction or empty list if it wasn't confirmed
+        """
+        try:
+            return list(future.result().asset_ids)
+        except TimeoutError as error:
+            logger.error(error)
+            return []
+        except CancelledError:
+            # The tracker was closed before the transaction was found
+            logger.error("Confirmation of the minting transaction was cancelled")
+            return []
+
+    @staticmethod
+    def _apply_confirmed_ids(
+        output_list: list, pending: Dict[int, tuple], confirmed_ids: Dict[str, list]
+    ):
+        """
+        Puts IDs of assets found in the account history into the output list and removes them from pending
+        :param output_list: result of mint_assets() which is updated in place
+        :param pending: result of _pending_minted_assets()
+        :param confirmed_ids: transaction ID -> IDs of assets minted by it in the order of actions
+        """
+        # IDs which were already in the transaction traces are skipped
+        known_ids = {
+            asset[0][0] for asset in output_list if asset[0][0] not in (None, "None")
+        }
+        confirmed_ids = {
+            tx_id: deque(asset_id for asset_id in ids if asset_id not in known_ids)
+            for tx_id, ids in confirmed_ids.items()
+        }
+        for asset_number in sorted(pending):
+            asset = pending[asset_number]
+            ids = confirmed_ids.get(asset[1])
+            if not ids:
+                continue
+            output_list[asset_number] = (
+                (ids.popleft(), asset[0][1], asset[0][2]),
+                asset[1],
+            )
+            del pending[asset_number]
+
+    def _try_get_right_asset_id(self, tx_id: str):
+        """
+        Requests the minting transaction again with backoff within the "network" retry budget
+        of the rate controller, since the history API may not have indexed it yet
+        :param tx_id: id of the transaction
+        :return: asset ID found in the provided minting transaction or None if the transaction wasn't found
+        """
+        retries = self.rate_controller.retry_budget()
+        while True:
+            try:
+                return self._get_right_asset_id(tx_id)
+            except (KeyError, requests.RequestException) as error:
+                wait_time = self.rate_controller.next_retry(retries, "network")
+                if wait_time is None:
+                    logger.error(f"Couldn't find transaction {tx_id}: {error!r}")
+                    return None
+                self.metrics.retry("get_right_asset_id", "network")
+                logger.warning(
+                    f"Transaction {tx_id} wasn't found. Will retry in {wait_time} seconds..."
+                )
+                time.sleep(wait_time)